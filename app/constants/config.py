@@ -15,8 +15,29 @@ APP_TUTORIAL_URL = "https://www.youtube.com/@random.information.random"
 PACKAGE_NAME = "appynest" # Nombre que va a tener el paquete generado, ya sea .exe o .appimage
 CONFIG_DIR_NAME = ".appynest"
 CONFIG_FILE_NAME = "config.json"
+INVENTORY_DB_NAME = "inventory.db"
+CONFIG_RELOAD_INTERVAL = 2 # Segundos entre comprobaciones de si config.json se modificó fuera de la aplicación
+CONFIG_SAVE_DELAY = 0.5 # Segundos que se agrupan los cambios de configuración antes de escribirlos
+APK_LIBRARY_DIR_NAME = "apk-library" # APKs extraídos, guardados por su sha256 dentro de CONFIG_DIR_NAME
+APK_LIBRARY_MAX_BYTES = 4 * 1024 * 1024 * 1024 # Al superarse se borran los APKs usados hace más tiempo
+ICON_CACHE_DIR_NAME = "icon-cache" # Íconos ya rasterizados (PNG) dentro de CONFIG_DIR_NAME
+ICON_CACHE_MAX_ENTRIES = 128 # Íconos rasterizados que se conservan en memoria
+ICON_CACHE_PERSIST = True # Guardar los íconos rasterizados en disco para los siguientes arranques
+ADB_SERVER_HOST = "127.0.0.1"
+ADB_SERVER_PORT = 5037
+JOB_MAX_WORKERS = 8 # Trabajos en paralelo del planificador (uno por dispositivo como máximo)
+INSTALL_MAX_PARALLEL_DEVICES = 6 # Dispositivos instalando a la vez; deja hilos libres para la interfaz
+INSTALL_BASE_TIMEOUT = 60 # Segundos de margen fijo de cada paso de una instalación
+INSTALL_MIN_TRANSFER_RATE = 2 * 1024 * 1024 # Bytes/s supuestos mientras no se haya medido el enlace
+INSTALL_STAGING_DIR = "/data/local/tmp/appynest-staging" # APKs copiados a la espera de instalarse
+INSTALL_STAGING_MAX_BYTES = 2 * 1024 * 1024 * 1024 # Espacio máximo ocupado en el dispositivo por la copia anticipada
+INSTALL_CACHE_DIR = "/data/local/tmp/appynest-cache" # APKs ya enviados, nombrados por su sha256
+INSTALL_CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024 # Al superarse se borran los APKs usados hace más tiempo
+EXTRACT_MAX_PARALLEL_PULLS = 3 # Archivos que se descargan a la vez de un mismo dispositivo al extraer en lote
 
 ENVIRONMENT = Environment(os.getenv("ENV", "prod"))
 DEBUG_MODE = ENVIRONMENT != "prod"
+STARTUP_PROFILE = ENVIRONMENT == Environment.DEV # Medir importaciones y construcción de la interfaz al arrancar
+STARTUP_PROFILE_TOP = 15 # Módulos más lentos que se muestran en el perfil de arranque
 
 PLATFORM = Platform(sys.platform)
\ No newline at end of file
@@ -1,5 +1,6 @@
 GLOBAL_ACTION_DELAY = 200
 SEARCH_DEBOUNCE_DELAY = 350
+APP_DETAILS_UPDATE_DELAY = 40  # Agrupa los cambios de selección al recorrer la lista con el teclado
 OPEN_LINK_REPEAT_DELAY = 3000
 SPLASH_SCREEN_DELAY = 1500
-POST_SPLASH_DELAY = 500
\ No newline at end of file
+SPLASH_MAX_DURATION = 6000  # El splash se cierra al estar lista la interfaz o, como mucho, pasado este tiempo
\ No newline at end of file
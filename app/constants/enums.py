@@ -1,4 +1,4 @@
-from enum import Enum
+from enum import Enum, IntEnum
 
 class Platform(Enum):
     LINUX = "linux"
@@ -9,3 +9,21 @@ class Environment(Enum):
     DEV = "dev"
     STAGING = "staging"
     PROD = "prod"
+
+class ADBBackend(Enum):
+    PROCESS = "process"  # Binario adb (con sesión de shell persistente)
+    SOCKET = "socket"    # Cliente Python del protocolo del servidor ADB (puerto 5037)
+
+class JobPriority(IntEnum):
+    HIGH = 0    # Consultas interactivas (escaneo, detalles, verificación de ADB)
+    NORMAL = 1  # Operaciones sobre aplicaciones
+    LOW = 2     # Trabajo en segundo plano
+
+class ExtractFormat(Enum):
+    DIRECTORY = "directory"  # Carpeta <paquete>/ con base.apk y sus splits
+    APKS = "apks"            # Archivo <paquete>.apks con todos los APKs
+
+class JobState(Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    FINISHED = "finished"
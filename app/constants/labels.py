@@ -3,6 +3,7 @@ from app.constants.config import APP_DISPLAY_NAME
 OPERATION_LABELS = {
     "uninstall": "desinstalar",
     "extract": "extraer",
+    "batch_extract": "extraer",
     "load": "cargar",
 }
 APP_DESCRIPTION = f"{APP_DISPLAY_NAME} es una aplicación de escritorio que facilita la gestión de dispositivos y aplicaciones Android. Permite realizar tareas comunes como instalar, desinstalar o extraer aplicaciones de forma sencilla mediante ADB."
\ No newline at end of file
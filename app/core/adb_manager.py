@@ -3,9 +3,12 @@ import os
 import shutil
 from pathlib import Path
 from .config_manager import ConfigManager
+from .shell_session import ShellSessionPool
+from .adb_socket_client import ADBSocketClient
+from .device_tracker import DeviceTracker
 from app.utils.helpers import get_subprocess_kwargs
 from app.constants.config import PLATFORM
-from app.constants.enums import Platform
+from app.constants.enums import Platform, ADBBackend
 from app.utils.print_in_debug_mode import print_in_debug_mode
 
 class ADBManager:
@@ -13,10 +16,49 @@ class ADBManager:
         self.config_manager = config_manager
         self.local_platform_tools_dir = self.config_manager.config_dir / "platform-tools"
         self._adb_filename = "adb.exe" if PLATFORM == Platform.WIN32 else "adb"
+        # Sesiones 'adb shell' persistentes, una por dispositivo
+        self.shell_sessions = ShellSessionPool(self)
+        # Cliente en proceso del protocolo del servidor ADB (backend opcional)
+        self.socket_client = ADBSocketClient()
+        # Tabla de dispositivos mantenida por el stream track-devices
+        self.device_tracker = DeviceTracker(self)
     
     def get_adb_path(self): 
         """Retorna la ruta del ADB local (copia)"""
         return self.config_manager.get_adb_path()
+
+    def get_backend(self):
+        """Retorna el backend configurado (binario o socket)"""
+        return self.config_manager.get_adb_backend()
+
+    def is_device_online(self, device_id):
+        """
+        Consulta la tabla del seguimiento de dispositivos.
+
+        Returns:
+            bool | None: Presencia del dispositivo, o None si el seguimiento no
+            está activo y se debe consultar a ADB con un proceso.
+        """
+        return self.device_tracker.is_device_online(device_id)
+
+    def execute_without_process(self, device_id, command_args, timeout=30):
+        """
+        Intenta ejecutar un comando adb sin lanzar un proceso nuevo: por el cliente
+        de socket si ese backend está activo, o por la sesión de shell persistente.
+
+        Returns:
+            dict | None: Resultado con el formato de execute_adb_command, o None si
+            el comando debe ejecutarse con el binario de adb.
+        """
+        if self.get_backend() == ADBBackend.SOCKET:
+            result = self.socket_client.execute_command(device_id, command_args, timeout)
+            if result is not None:
+                return result
+
+        if len(command_args) > 1 and command_args[0] == "shell":
+            return self.shell_sessions.execute(device_id, command_args[1:], timeout)
+
+        return None
     
     def _validate_adb_file(self, file_path):
         """Valida si dentro de la carpeta seleccionada existe el ADB correspondiente a la plataforma."""
@@ -242,6 +284,9 @@ class ADBManager:
                     "junto con todos los archivos que componen platform-tools."
                 )
 
+            # Las sesiones abiertas usan el ADB anterior
+            self.close_connections()
+
             # Copiar toda la carpeta platform-tools
             if not self.copy_platform_tools(source_adb_path):
                 return False, "Error al copiar la carpeta platform-tools"
@@ -268,6 +313,7 @@ class ADBManager:
     def kill_adb_server(self):
         """Cierra el servidor ADB si está ejecutándose"""
         try:
+            self.close_connections()
             adb_path = self.get_adb_path()
             if not os.path.exists(adb_path):
                 return False, "ADB no disponible"
@@ -286,6 +332,11 @@ class ADBManager:
         except Exception as e:
             return False, f"Error al cerrar servidor ADB: {str(e)}"
     
+    def close_connections(self):
+        """Cierra las sesiones de shell y los sockets reutilizados"""
+        self.shell_sessions.close_all()
+        self.socket_client.close()
+
     def cleanup_local_adb(self):
         """Elimina la copia local de platform-tools"""
         try:
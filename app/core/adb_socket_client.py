@@ -0,0 +1,487 @@
+import os
+import socket
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from app.constants.config import ADB_SERVER_HOST, ADB_SERVER_PORT
+from app.core.process_runner import on_current_cancel, raise_if_cancelled
+from app.utils.print_in_debug_mode import print_in_debug_mode
+
+# Identificadores de paquete del shell protocol v2
+SHELL_ID_STDIN = 0
+SHELL_ID_STDOUT = 1
+SHELL_ID_STDERR = 2
+SHELL_ID_EXIT = 3
+
+SYNC_DATA_MAX = 64 * 1024
+
+
+class ADBProtocolError(Exception):
+    """Error devuelto por el servidor ADB (respuesta FAIL) o protocolo inesperado"""
+
+
+class ADBServiceInterrupted(Exception):
+    """
+    La conexión se cortó o venció el tiempo con el servicio ya enviado: el comando
+    pudo ejecutarse en el dispositivo, así que no debe repetirse con el binario.
+    """
+
+
+@contextmanager
+def _service_sent():
+    """Los errores de red dentro del bloque ocurren con el servicio ya enviado"""
+    try:
+        yield
+    except OSError as e:
+        raise ADBServiceInterrupted(e) from e
+
+
+def _read_exact(sock, size):
+    """Lee exactamente 'size' bytes del socket"""
+    chunks = []
+    remaining = size
+    while remaining > 0:
+        chunk = sock.recv(remaining)
+        if not chunk:
+            raise ConnectionError("Conexión cerrada por el servidor ADB")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b''.join(chunks)
+
+
+def _abort_socket(sock):
+    """Corta la conexión desde otro hilo: desbloquea cualquier recv() pendiente"""
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+
+
+def _read_until_eof(sock):
+    chunks = []
+    while True:
+        chunk = sock.recv(65536)
+        if not chunk:
+            return b''.join(chunks)
+        chunks.append(chunk)
+
+
+class SyncConnection:
+    """Conexión 'sync:' reutilizable para STAT, pull (RECV) y push (SEND)"""
+
+    def __init__(self, sock, device_id):
+        self.sock = sock
+        self.device_id = device_id
+        self.lock = threading.Lock()
+
+    def _send_request(self, command_id, data):
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self.sock.sendall(command_id + struct.pack("<I", len(data)) + data)
+
+    def _read_fail_message(self, length):
+        return _read_exact(self.sock, length).decode("utf-8", errors="replace")
+
+    def stat(self, remote_path):
+        """Devuelve (mode, size, mtime). mode == 0 si la ruta no existe"""
+        with self.lock:
+            self._send_request(b"STAT", remote_path)
+            response = _read_exact(self.sock, 16)
+            if response[:4] != b"STAT":
+                raise ADBProtocolError(f"Respuesta STAT inesperada: {response[:4]!r}")
+            return struct.unpack("<III", response[4:])
+
+    def pull(self, remote_path, local_path, progress_callback=None):
+        """Descarga un archivo del dispositivo. Devuelve los bytes transferidos"""
+        with self.lock:
+            self._send_request(b"RECV", remote_path)
+            transferred = 0
+            with open(local_path, "wb") as output:
+                while True:
+                    header = _read_exact(self.sock, 8)
+                    command_id, length = header[:4], struct.unpack("<I", header[4:])[0]
+                    if command_id == b"DATA":
+                        output.write(_read_exact(self.sock, length))
+                        transferred += length
+                        if progress_callback:
+                            progress_callback(transferred)
+                    elif command_id == b"DONE":
+                        return transferred
+                    elif command_id == b"FAIL":
+                        raise ADBProtocolError(self._read_fail_message(length))
+                    else:
+                        raise ADBProtocolError(f"Respuesta RECV inesperada: {command_id!r}")
+
+    def push(self, local_path, remote_path, mode=0o644, progress_callback=None):
+        """Sube un archivo al dispositivo. Devuelve los bytes transferidos"""
+        with open(local_path, "rb") as source:
+            return self.push_stream(source, remote_path, mode, progress_callback)
+
+    def push_stream(self, source, remote_path, mode=0o644, progress_callback=None):
+        """Sube el contenido de un objeto binario (p. ej. una entrada de un zip)"""
+        with self.lock:
+            self._send_request(b"SEND", f"{remote_path},{0o100000 | mode}")
+            transferred = 0
+            while True:
+                chunk = source.read(SYNC_DATA_MAX)
+                if not chunk:
+                    break
+                self._send_request(b"DATA", chunk)
+                transferred += len(chunk)
+                if progress_callback:
+                    progress_callback(transferred)
+
+            self.sock.sendall(b"DONE" + struct.pack("<I", int(time.time())))
+            header = _read_exact(self.sock, 8)
+            command_id, length = header[:4], struct.unpack("<I", header[4:])[0]
+            if command_id == b"FAIL":
+                raise ADBProtocolError(self._read_fail_message(length))
+            if command_id != b"OKAY":
+                raise ADBProtocolError(f"Respuesta SEND inesperada: {command_id!r}")
+            return transferred
+
+    def close(self):
+        try:
+            self._send_request(b"QUIT", b"")
+        except Exception:
+            pass
+        try:
+            self.sock.close()
+        except Exception:
+            pass
+
+
+class ADBSocketClient:
+    """
+    Cliente en Python del protocolo smart-socket del servidor ADB.
+
+    Habla directamente con el servidor (por defecto 127.0.0.1:5037) sin lanzar
+    procesos: consultas host:*, selección de transporte, shell:, exec: y sync:.
+    Las conexiones sync: se mantienen abiertas y se reutilizan por dispositivo.
+    """
+
+    def __init__(self, host=ADB_SERVER_HOST, port=ADB_SERVER_PORT, timeout=10):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._sync_connections = {}
+        self._sync_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Primitivas del protocolo
+    # ------------------------------------------------------------------
+    def _connect(self, timeout=None):
+        sock = socket.create_connection((self.host, self.port), timeout=timeout or self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return sock
+
+    def _send_service(self, sock, service):
+        """Envía una petición '<longitud hex><servicio>' y valida OKAY/FAIL"""
+        payload = service.encode("utf-8")
+        sock.sendall(b"%04x" % len(payload) + payload)
+        status = _read_exact(sock, 4)
+        if status == b"OKAY":
+            return
+        if status == b"FAIL":
+            raise ADBProtocolError(self._read_length_prefixed(sock))
+        raise ADBProtocolError(f"Estado inesperado del servidor ADB: {status!r}")
+
+    @staticmethod
+    def _read_length_prefixed(sock):
+        length = int(_read_exact(sock, 4), 16)
+        return _read_exact(sock, length).decode("utf-8", errors="replace")
+
+    def is_server_available(self):
+        """Comprueba si hay un servidor ADB escuchando"""
+        try:
+            self.host_request("host:version")
+            return True
+        except (OSError, ADBProtocolError):
+            return False
+
+    def host_request(self, service):
+        """Ejecuta una consulta host:* y devuelve su respuesta"""
+        with self._connect() as sock:
+            self._send_service(sock, service)
+            return self._read_length_prefixed(sock)
+
+    def open_transport(self, device_id, timeout=None):
+        """Abre un socket ya conectado al dispositivo indicado"""
+        sock = self._connect(timeout)
+        try:
+            self._send_service(sock, f"host:transport:{device_id}")
+        except Exception:
+            sock.close()
+            raise
+        return sock
+
+    # ------------------------------------------------------------------
+    # Servicios
+    # ------------------------------------------------------------------
+    def devices(self):
+        """Equivalente a 'adb devices -l': lista de diccionarios con serial, estado y atributos"""
+        return self.parse_devices(self.host_request("host:devices-l"))
+
+    @staticmethod
+    def parse_devices(output):
+        devices = []
+        for line in output.splitlines():
+            parts = line.split()
+            if len(parts) < 2:
+                continue
+            device = {'device': parts[0], 'status': parts[1]}
+            for part in parts[2:]:
+                key, sep, value = part.partition(':')
+                if not sep:
+                    continue
+                # 'device:<nombre>' no debe pisar el serial
+                device['device_name' if key == 'device' else key] = value
+            devices.append(device)
+        return devices
+
+    def track_devices(self):
+        """
+        Abre el stream 'host:track-devices-l'. El servidor envía el listado completo
+        al abrirlo y de nuevo en cada cambio; cada listado se lee con read_message().
+        """
+        sock = self._connect()
+        sock.settimeout(None)
+        try:
+            self._send_service(sock, "host:track-devices-l")
+        except Exception:
+            sock.close()
+            raise
+        return sock
+
+    @staticmethod
+    def read_message(sock):
+        """Lee un mensaje '<longitud hex><datos>' de un stream abierto"""
+        return ADBSocketClient._read_length_prefixed(sock)
+
+    def shell(self, device_id, command, timeout=30):
+        """
+        Ejecuta un comando de shell. Usa shell protocol v2 (stdout, stderr y código
+        de salida separados) y recurre a 'shell:' clásico si el dispositivo no lo soporta.
+        """
+        sock = self.open_transport(device_id, timeout)
+        unregister = on_current_cancel(lambda: _abort_socket(sock))
+        try:
+            try:
+                with _service_sent():
+                    self._send_service(sock, f"shell,v2,raw:{command}")
+            except ADBProtocolError:
+                sock.close()
+                unregister()
+                sock = self.open_transport(device_id, timeout)
+                unregister = on_current_cancel(lambda: _abort_socket(sock))
+                with _service_sent():
+                    self._send_service(sock, f"shell:{command}")
+                    output = _read_until_eof(sock).decode("utf-8", errors="replace")
+                raise_if_cancelled()
+                return {'success': True, 'stdout': output, 'stderr': '', 'returncode': 0}
+
+            with _service_sent():
+                stdout, stderr, returncode = self._read_shell_v2(sock)
+
+            raise_if_cancelled()
+            returncode = 255 if returncode is None else returncode
+            return {
+                'success': returncode == 0,
+                'stdout': b''.join(stdout).decode("utf-8", errors="replace"),
+                'stderr': b''.join(stderr).decode("utf-8", errors="replace"),
+                'returncode': returncode
+            }
+        finally:
+            unregister()
+            sock.close()
+
+    @staticmethod
+    def _read_shell_v2(sock):
+        """Lee los paquetes del shell protocol v2 hasta el código de salida"""
+        stdout, stderr, returncode = [], [], None
+        while returncode is None:
+            header = sock.recv(5)
+            if not header:
+                break
+            if len(header) < 5:
+                header += _read_exact(sock, 5 - len(header))
+            packet_id, length = header[0], struct.unpack("<I", header[1:])[0]
+            data = _read_exact(sock, length)
+            if packet_id == SHELL_ID_STDOUT:
+                stdout.append(data)
+            elif packet_id == SHELL_ID_STDERR:
+                stderr.append(data)
+            elif packet_id == SHELL_ID_EXIT:
+                returncode = data[0] if data else 0
+        return stdout, stderr, returncode
+
+    def exec_out(self, device_id, command, timeout=30):
+        """Ejecuta 'exec:<comando>' y devuelve la salida binaria sin procesar"""
+        with self.open_transport(device_id, timeout) as sock:
+            unregister = on_current_cancel(lambda: _abort_socket(sock))
+            try:
+                self._send_service(sock, f"exec:{command}")
+                output = _read_until_eof(sock)
+                raise_if_cancelled()
+                return output
+            finally:
+                unregister()
+
+    def exec_in(self, device_id, command, input_stream, timeout=30):
+        """
+        Ejecuta 'exec:<comando>' enviando input_stream (objeto binario) a su entrada
+        por bloques y devuelve la salida. El comando debe saber cuántos bytes leer
+        (p. ej. 'pm install-write -S <tamaño> ...').
+        """
+        with self.open_transport(device_id, timeout) as sock:
+            unregister = on_current_cancel(lambda: _abort_socket(sock))
+            try:
+                self._send_service(sock, f"exec:{command}")
+                while True:
+                    chunk = input_stream.read(SYNC_DATA_MAX)
+                    if not chunk:
+                        break
+                    sock.sendall(chunk)
+                output = _read_until_eof(sock)
+                raise_if_cancelled()
+                return output
+            finally:
+                unregister()
+
+    def get_sync(self, device_id):
+        """Devuelve una conexión sync: reutilizable para el dispositivo"""
+        with self._sync_lock:
+            connection = self._sync_connections.get(device_id)
+            if connection:
+                return connection
+            connection = self.open_sync(device_id)
+            self._sync_connections[device_id] = connection
+            return connection
+
+    def open_sync(self, device_id):
+        """Abre una conexión sync: propia, no compartida (quien la abre la cierra)"""
+        sock = self.open_transport(device_id)
+        sock.settimeout(None)
+        self._send_service(sock, "sync:")
+        return SyncConnection(sock, device_id)
+
+    def drop_sync(self, device_id):
+        """Descarta la conexión sync: de un dispositivo (p. ej. tras un error)"""
+        with self._sync_lock:
+            connection = self._sync_connections.pop(device_id, None)
+        if connection:
+            connection.close()
+
+    def pull(self, device_id, remote_path, local_path, progress_callback=None):
+        connection = self.get_sync(device_id)
+        # Una transferencia cancelada deja la conexión a medias: se descarta
+        unregister = on_current_cancel(lambda: _abort_socket(connection.sock))
+        try:
+            with _service_sent():
+                return connection.pull(remote_path, local_path, progress_callback)
+        except Exception:
+            self.drop_sync(device_id)
+            raise
+        finally:
+            unregister()
+
+    def pull_concurrent(self, device_id, remote_path, local_path, progress_callback=None):
+        """
+        Como pull, pero por una conexión sync: propia: varias descargas del mismo
+        dispositivo avanzan a la vez en lugar de esperar a la conexión compartida.
+        """
+        connection = self.open_sync(device_id)
+        unregister = on_current_cancel(lambda: _abort_socket(connection.sock))
+        try:
+            return connection.pull(remote_path, local_path, progress_callback)
+        finally:
+            unregister()
+            connection.close()
+
+    def push(self, device_id, local_path, remote_path, progress_callback=None):
+        with open(local_path, "rb") as source:
+            return self.push_stream(device_id, source, remote_path, progress_callback)
+
+    def push_stream(self, device_id, source, remote_path, progress_callback=None):
+        connection = self.get_sync(device_id)
+        unregister = on_current_cancel(lambda: _abort_socket(connection.sock))
+        try:
+            return connection.push_stream(source, remote_path, progress_callback=progress_callback)
+        except Exception:
+            self.drop_sync(device_id)
+            raise
+        finally:
+            unregister()
+
+    def close(self):
+        """Cierra todas las conexiones reutilizadas"""
+        with self._sync_lock:
+            connections = list(self._sync_connections.values())
+            self._sync_connections.clear()
+        for connection in connections:
+            connection.close()
+
+    # ------------------------------------------------------------------
+    # Adaptador para execute_adb_command
+    # ------------------------------------------------------------------
+    def execute_command(self, device_id, command_args, timeout=30):
+        """
+        Traduce los argumentos de la línea de comandos de adb a servicios del protocolo.
+
+        Returns:
+            dict | None: Resultado con el formato de execute_adb_command, o None si el
+            comando no está soportado o no hay servidor y se debe usar el binario.
+            Si la conexión falla con el comando ya enviado se devuelve un fallo (sin
+            'returncode' si venció el tiempo, como la sesión de shell persistente).
+        """
+        if not command_args:
+            return None
+
+        command = command_args[0]
+        try:
+            raise_if_cancelled()
+            if command == "shell" and len(command_args) > 1:
+                return self.shell(device_id, ' '.join(command_args[1:]), timeout)
+
+            if command == "uninstall" and len(command_args) == 2:
+                result = self.shell(device_id, f"pm uninstall {command_args[1]}", timeout)
+                # pm devuelve 0 aunque falle: el resultado real está en el texto
+                result['success'] = result['success'] and "Success" in result['stdout']
+                return result
+
+            if command == "pull" and len(command_args) == 3:
+                remote_path, local_path = command_args[1], command_args[2]
+                if os.path.isdir(local_path):
+                    local_path = os.path.join(local_path, os.path.basename(remote_path))
+                size = self.pull(device_id, remote_path, local_path)
+                return {
+                    'success': True,
+                    'stdout': f"{remote_path}: 1 file pulled, {size} bytes",
+                    'stderr': '',
+                    'returncode': 0
+                }
+        except ADBServiceInterrupted as e:
+            # El comando pudo ejecutarse: repetirlo con el binario podría hacerlo dos veces
+            raise_if_cancelled()
+            if isinstance(e.__cause__, socket.timeout):
+                error_msg = "Tiempo de espera agotado"
+                print_in_debug_mode(error_msg)
+                return {'success': False, 'error': error_msg}
+            error_msg = f"Conexión con el servidor ADB interrumpida: {e.__cause__}"
+            print_in_debug_mode(error_msg)
+            return {'success': False, 'stdout': '', 'stderr': error_msg, 'error': error_msg, 'returncode': 1}
+        except (ConnectionRefusedError, socket.timeout) as e:
+            raise_if_cancelled()
+            print_in_debug_mode(f"Servidor ADB no disponible por socket: {e}")
+            return None
+        except ADBProtocolError as e:
+            print_in_debug_mode(f"Error del protocolo ADB: {e}")
+            return {'success': False, 'stdout': '', 'stderr': str(e), 'error': str(e), 'returncode': 1}
+        except OSError as e:
+            # Un socket cortado por cancelación no debe reintentarse con el binario
+            raise_if_cancelled()
+            print_in_debug_mode(f"Error de conexión con el servidor ADB: {e}")
+            return None
+
+        return None
@@ -0,0 +1,153 @@
+import os
+import re
+import zipfile
+
+# Archivos que contienen una aplicación dividida (Split APKs) empaquetada
+BUNDLE_EXTENSIONS = ('.apks', '.xapk')
+INSTALLABLE_EXTENSIONS = ('.apk',) + BUNDLE_EXTENSIONS
+
+# "config.arm64_v8a.apk", "split_config.x86_64.apk", "base-armeabi_v7a.apk"
+_ABI_SPLIT = re.compile(r'(?:^|[._-])(arm64_v8a|armeabi_v7a|armeabi|x86_64|x86|mips64|mips)\.apk$')
+# Nombres con los que se guardan las partes de una aplicación dividida
+_SPLIT_NAME = re.compile(r'^(split_.+|config\..+|.+\.config\..+|base-.+)\.apk$')
+
+
+def is_bundle(path):
+    return path.lower().endswith(BUNDLE_EXTENSIONS)
+
+
+def is_installable(path):
+    return path.lower().endswith(INSTALLABLE_EXTENSIONS)
+
+
+def get_split_abi(name):
+    """ABI de un split de código nativo ('arm64-v8a') o None si no es un split de ABI"""
+    match = _ABI_SPLIT.search(os.path.basename(name).lower())
+    return match.group(1).replace('_', '-') if match else None
+
+
+class SplitEntry:
+    """Un APK de la sesión de instalación: archivo suelto o entrada de un .apks/.xapk"""
+
+    def __init__(self, name, size, opener, path=None, key=None):
+        self.name = name
+        self.size = size
+        self._opener = opener
+        # Ruta local si el APK es un archivo suelto (None dentro de un zip)
+        self.path = path
+        # Identifica el contenido sin leerlo (cambia si el archivo se modifica)
+        self.key = key
+
+    def open(self):
+        """Devuelve un objeto binario de solo lectura; en un zip se descomprime al leer"""
+        return self._opener()
+
+    @classmethod
+    def from_file(cls, path):
+        stat = os.stat(path)
+        return cls(
+            os.path.basename(path), stat.st_size, lambda: open(path, 'rb'), path,
+            key=(os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        )
+
+    @classmethod
+    def from_zip(cls, archive, info):
+        return cls(
+            os.path.basename(info.filename), info.file_size, lambda: archive.open(info),
+            key=(os.path.abspath(archive.filename or ''), info.filename, info.CRC, info.file_size)
+        )
+
+
+class InstallUnit:
+    """
+    Lo que se instala en una sola operación: un APK, un conjunto de splits
+    sueltos de la misma aplicación o un archivo .apks/.xapk.
+    """
+
+    def __init__(self, name, paths, is_bundle=False):
+        self.name = name
+        self.paths = list(paths)
+        self.is_bundle = is_bundle
+
+    @property
+    def is_split_set(self):
+        return self.is_bundle or len(self.paths) > 1
+
+    @property
+    def size(self):
+        """Bytes en disco (en un .apks/.xapk, el del archivo comprimido)"""
+        return sum(os.path.getsize(path) for path in self.paths)
+
+
+def group_install_units(paths):
+    """
+    Agrupa los archivos seleccionados en unidades de instalación.
+
+    Los APKs de una misma carpeta que forman una aplicación dividida (un base.apk
+    junto a split_*.apk / config.*.apk, como los extrae 'adb pull') se instalan
+    juntos; el resto se instala por separado.
+    """
+    units = []
+    by_folder = {}
+    for path in paths:
+        if is_bundle(path):
+            units.append(InstallUnit(os.path.basename(path), [path], is_bundle=True))
+        else:
+            by_folder.setdefault(os.path.dirname(path), []).append(path)
+
+    for folder, folder_paths in by_folder.items():
+        names = {os.path.basename(path).lower(): path for path in folder_paths}
+        splits = [path for name, path in names.items() if _SPLIT_NAME.match(name)]
+        if 'base.apk' in names and splits:
+            split_set = [names['base.apk']] + sorted(splits)
+            units.append(InstallUnit(
+                f"{os.path.basename(folder) or 'base'} ({len(split_set)} splits)", split_set
+            ))
+            folder_paths = [path for path in folder_paths if path not in split_set]
+        units.extend(InstallUnit(os.path.basename(path), [path]) for path in folder_paths)
+    return units
+
+
+def list_bundle_entries(archive):
+    """
+    APKs que hay que instalar de un .apks/.xapk abierto.
+
+    - .xapk y .apks de SAI: todos los .apk del archivo (los .obb no se instalan).
+    - .apks de bundletool: los de 'splits/'; 'standalones/' solo si no hay splits.
+    """
+    apk_infos = [
+        info for info in archive.infolist()
+        if not info.is_dir() and info.filename.lower().endswith('.apk')
+    ]
+    splits = [info for info in apk_infos if not info.filename.startswith('standalones/')]
+    if splits:
+        return [SplitEntry.from_zip(archive, info) for info in splits]
+    # Sin splits solo hay APKs completos alternativos: basta con uno
+    return [SplitEntry.from_zip(archive, info) for info in apk_infos[:1]]
+
+
+def select_abi_splits(entries, device_abis):
+    """
+    Descarta los splits de código nativo que el dispositivo no necesita.
+
+    Se conserva solo el ABI preferido (primero de ro.product.cpu.abilist) entre los
+    que trae la aplicación; si ninguno coincide se envían todos y el gestor de
+    paquetes informa del error.
+    """
+    abi_entries = [entry for entry in entries if get_split_abi(entry.name)]
+    if not abi_entries or not device_abis:
+        return entries
+
+    available = {get_split_abi(entry.name) for entry in abi_entries}
+    preferred = next((abi for abi in device_abis if abi in available), None)
+    if preferred is None:
+        return entries
+    return [
+        entry for entry in entries
+        if get_split_abi(entry.name) in (None, preferred)
+    ]
+
+
+def open_bundle(path):
+    """Abre un .apks/.xapk sin extraerlo (las entradas se leen bajo demanda)"""
+    return zipfile.ZipFile(path)
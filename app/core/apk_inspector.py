@@ -0,0 +1,383 @@
+import hashlib
+import struct
+import threading
+import zipfile
+from collections import OrderedDict
+from app.utils.print_in_debug_mode import print_in_debug_mode
+
+# Tipos de bloque del XML binario de Android (ResourceTypes.h)
+RES_STRING_POOL_TYPE = 0x0001
+RES_XML_TYPE = 0x0003
+RES_XML_START_ELEMENT_TYPE = 0x0102
+RES_XML_RESOURCE_MAP_TYPE = 0x0180
+
+UTF8_FLAG = 1 << 8
+
+# Tipos de valor de los atributos
+TYPE_STRING = 0x03
+TYPE_INT_DEC = 0x10
+TYPE_INT_HEX = 0x11
+TYPE_INT_BOOLEAN = 0x12
+
+# Identificadores de los atributos android:* (por si el manifiesto está ofuscado y sin nombres)
+_ATTRIBUTE_IDS = {
+    0x0101020c: 'minSdkVersion',
+    0x0101021b: 'versionCode',
+    0x0101021c: 'versionName',
+    0x01010270: 'targetSdkVersion',
+    0x0101055b: 'isFeatureSplit',
+}
+
+# Bloque de firmas APK v2/v3 (entre los datos del zip y el directorio central)
+APK_SIG_BLOCK_MAGIC = b"APK Sig Block 42"
+APK_SIGNATURE_SCHEME_V2_ID = 0x7109871a
+APK_SIGNATURE_SCHEME_V3_ID = 0xf05368c0
+_EOCD_MAGIC = b"PK\x05\x06"
+_EOCD_MAX_SEARCH = 22 + 0xFFFF  # registro final más el comentario máximo
+
+# Inspecciones guardadas por huella del contenido
+CACHE_SIZE = 256
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+class ApkInspectionError(Exception):
+    """El archivo no es un APK válido o su manifiesto no se puede leer"""
+
+
+def _read_string_pool(data, offset):
+    """Devuelve la lista de cadenas de un bloque RES_STRING_POOL_TYPE"""
+    header_size, chunk_size = struct.unpack_from('<HI', data, offset + 2)
+    string_count, _, flags, strings_start = struct.unpack_from('<IIII', data, offset + 8)
+    offsets = struct.unpack_from(f'<{string_count}I', data, offset + header_size)
+    is_utf8 = bool(flags & UTF8_FLAG)
+    base = offset + strings_start
+
+    strings = []
+    for string_offset in offsets:
+        position = base + string_offset
+        if is_utf8:
+            # Longitud en caracteres y en bytes, cada una de 1 o 2 bytes
+            position += 2 if data[position] & 0x80 else 1
+            length = data[position]
+            if length & 0x80:
+                length = ((length & 0x7F) << 8) | data[position + 1]
+                position += 2
+            else:
+                position += 1
+            strings.append(data[position:position + length].decode('utf-8', errors='replace'))
+        else:
+            length = struct.unpack_from('<H', data, position)[0]
+            position += 2
+            if length & 0x8000:
+                length = ((length & 0x7FFF) << 16) | struct.unpack_from('<H', data, position)[0]
+                position += 2
+            strings.append(data[position:position + length * 2].decode('utf-16-le', errors='replace'))
+    return strings
+
+
+def _attribute_value(strings, raw_value, data_type, value):
+    if data_type == TYPE_STRING:
+        return strings[value] if value < len(strings) else None
+    if data_type in (TYPE_INT_DEC, TYPE_INT_HEX):
+        return value
+    if data_type == TYPE_INT_BOOLEAN:
+        return value != 0
+    if raw_value != 0xFFFFFFFF and raw_value < len(strings):
+        return strings[raw_value]
+    return None  # Referencias a recursos: no se resuelven sin resources.arsc
+
+
+def parse_binary_xml(data, wanted_elements=None):
+    """
+    Decodifica un XML binario de Android (AndroidManifest.xml compilado).
+
+    Returns:
+        list: [(nombre_elemento, {atributo: valor})] en orden de aparición,
+        limitado a wanted_elements si se indica
+    """
+    if len(data) < 8 or struct.unpack_from('<H', data, 0)[0] != RES_XML_TYPE:
+        raise ApkInspectionError("AndroidManifest.xml no es un XML binario")
+
+    strings, resource_ids, elements = [], [], []
+    offset = struct.unpack_from('<H', data, 2)[0]
+    while offset + 8 <= len(data):
+        chunk_type, header_size, chunk_size = struct.unpack_from('<HHI', data, offset)
+        if chunk_size < 8:
+            break
+
+        if chunk_type == RES_STRING_POOL_TYPE:
+            strings = _read_string_pool(data, offset)
+        elif chunk_type == RES_XML_RESOURCE_MAP_TYPE:
+            count = (chunk_size - header_size) // 4
+            resource_ids = struct.unpack_from(f'<{count}I', data, offset + header_size)
+        elif chunk_type == RES_XML_START_ELEMENT_TYPE:
+            name_index = struct.unpack_from('<I', data, offset + 20)[0]
+            name = strings[name_index] if name_index < len(strings) else ''
+            if wanted_elements is None or name in wanted_elements:
+                attribute_start, attribute_size, attribute_count = struct.unpack_from('<HHH', data, offset + 24)
+                attributes = {}
+                position = offset + 16 + attribute_start
+                for _ in range(attribute_count):
+                    _, attr_name, raw_value, _, _, data_type, value = struct.unpack_from(
+                        '<IIIHBBI', data, position
+                    )
+                    key = strings[attr_name] if attr_name < len(strings) else ''
+                    if attr_name < len(resource_ids) and resource_ids[attr_name] in _ATTRIBUTE_IDS:
+                        key = _ATTRIBUTE_IDS[resource_ids[attr_name]]
+                    if key:
+                        attributes[key] = _attribute_value(strings, raw_value, data_type, value)
+                    position += attribute_size
+                elements.append((name, attributes))
+
+        offset += chunk_size
+    return elements
+
+
+def java_array_hash(data):
+    """
+    Equivalente a Arrays.hashCode(byte[]) de Java en hexadecimal: es el valor
+    que muestra 'dumpsys package' para cada certificado firmante.
+    """
+    value = 1
+    for byte in data:
+        value = (31 * value + (byte - 256 if byte > 127 else byte)) & 0xFFFFFFFF
+    return format(value, 'x')
+
+
+def _length_prefixed(data, offset):
+    """Lee un bloque '<uint32 longitud><datos>' y devuelve (datos, siguiente offset)"""
+    length = struct.unpack_from('<I', data, offset)[0]
+    start = offset + 4
+    if start + length > len(data):
+        raise ApkInspectionError("Bloque de firmas truncado")
+    return data[start:start + length], start + length
+
+
+def _read_signing_block(stream):
+    """Bytes del APK Signing Block, o b'' si el APK solo tiene firma v1"""
+    stream.seek(0, 2)
+    file_size = stream.tell()
+    tail_size = min(file_size, _EOCD_MAX_SEARCH)
+    stream.seek(file_size - tail_size)
+    tail = stream.read(tail_size)
+    eocd = tail.rfind(_EOCD_MAGIC)
+    if eocd < 0 or eocd + 20 > len(tail):
+        return b''
+
+    central_directory_offset = struct.unpack_from('<I', tail, eocd + 16)[0]
+    if central_directory_offset < 32:
+        return b''
+    stream.seek(central_directory_offset - 24)
+    footer = stream.read(24)
+    if footer[8:] != APK_SIG_BLOCK_MAGIC:
+        return b''
+
+    block_size = struct.unpack_from('<Q', footer, 0)[0]
+    stream.seek(central_directory_offset - block_size - 8)
+    return stream.read(block_size + 8)
+
+
+def _read_source_signing_block(source):
+    """_read_signing_block de una ruta o de un objeto binario con acceso aleatorio"""
+    if isinstance(source, (str, bytes)) or hasattr(source, '__fspath__'):
+        with open(source, 'rb') as stream:
+            return _read_signing_block(stream)
+    return _read_signing_block(source)
+
+
+def _signing_block_pairs(block):
+    """Devuelve {id: valor} de los pares del APK Signing Block"""
+    pairs = {}
+    offset, end = 8, len(block) - 24
+    while offset + 12 <= end:
+        pair_length, pair_id = struct.unpack_from('<QI', block, offset)
+        pairs[pair_id] = block[offset + 12:offset + 8 + pair_length]
+        offset += 8 + pair_length
+    return pairs
+
+
+def _signing_block_certificates(scheme_value):
+    """Primer certificado de cada firmante de un bloque v2/v3"""
+    certificates = []
+    signers, _ = _length_prefixed(scheme_value, 0)
+    offset = 0
+    while offset < len(signers):
+        signer, offset = _length_prefixed(signers, offset)
+        signed_data, _ = _length_prefixed(signer, 0)
+        _, position = _length_prefixed(signed_data, 0)  # digests
+        signer_certificates, _ = _length_prefixed(signed_data, position)
+        if signer_certificates:
+            certificate, _ = _length_prefixed(signer_certificates, 0)
+            certificates.append(certificate)
+    return certificates
+
+
+def _der_element(data, offset):
+    """Lee un elemento DER y devuelve (etiqueta, inicio del contenido, fin del elemento)"""
+    tag = data[offset]
+    length = data[offset + 1]
+    offset += 2
+    if length & 0x80:
+        size = length & 0x7F
+        length = int.from_bytes(data[offset:offset + size], 'big')
+        offset += size
+    return tag, offset, offset + length
+
+
+def _der_children(data, start, end):
+    children = []
+    while start < end:
+        tag, content_start, element_end = _der_element(data, start)
+        children.append((tag, start, content_start, element_end))
+        start = element_end
+    return children
+
+
+def _pkcs7_first_certificate(data):
+    """Certificado firmante de un PKCS#7 (META-INF/*.RSA) de la firma v1"""
+    _, content_start, end = _der_element(data, 0)  # ContentInfo
+    content_info = _der_children(data, content_start, end)
+    _, _, explicit_start, explicit_end = content_info[1]  # [0] EXPLICIT
+    _, signed_start, signed_end = _der_element(data, explicit_start)  # SignedData
+    for tag, element_start, child_start, child_end in _der_children(data, signed_start, signed_end):
+        if tag == 0xA0:  # [0] IMPLICIT certificates
+            _, certificate_start, _, certificate_end = _der_children(data, child_start, child_end)[0]
+            return data[certificate_start:certificate_end]
+    return None
+
+
+def _read_signer_hashes(signing_block, archive):
+    """Hashes de los certificados firmantes: v3, si no v2 y si no la firma v1 (JAR)"""
+    pairs = _signing_block_pairs(signing_block) if signing_block else {}
+    for scheme_id in (APK_SIGNATURE_SCHEME_V3_ID, APK_SIGNATURE_SCHEME_V2_ID):
+        if scheme_id in pairs:
+            return [java_array_hash(certificate) for certificate in _signing_block_certificates(pairs[scheme_id])]
+
+    for name in archive.namelist():
+        upper = name.upper()
+        if upper.startswith('META-INF/') and upper.endswith(('.RSA', '.DSA', '.EC')):
+            certificate = _pkcs7_first_certificate(archive.read(name))
+            return [java_array_hash(certificate)] if certificate else []
+    return []
+
+
+def _content_fingerprint(archive, signing_block):
+    """
+    Huella del contenido del APK a partir del directorio central del zip: nombre,
+    CRC32 y tamaño de cada entrada. Cambia con cualquier cambio del contenido y
+    se calcula sin leer los datos comprimidos (instantáneo aunque el APK pese GB).
+    Incluye el APK Signing Block: el mismo contenido firmado con otra clave (v2/v3)
+    tiene otros firmantes.
+    """
+    digest = hashlib.sha256(signing_block)
+    for info in archive.infolist():
+        digest.update(f"{info.filename}\0{info.CRC:08x}\0{info.file_size}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _inspect_archive(archive):
+    try:
+        manifest = archive.read('AndroidManifest.xml')
+    except KeyError:
+        raise ApkInspectionError("El APK no contiene AndroidManifest.xml")
+
+    elements = dict(
+        (name, attributes) for name, attributes in reversed(
+            parse_binary_xml(manifest, wanted_elements=('manifest', 'uses-sdk'))
+        )
+    )
+    manifest_attrs = elements.get('manifest', {})
+    sdk_attrs = elements.get('uses-sdk', {})
+
+    # Código nativo: lib/<abi>/*.so
+    abis = sorted({
+        info.filename.split('/')[1] for info in archive.infolist()
+        if info.filename.startswith('lib/') and info.filename.endswith('.so') and info.filename.count('/') >= 2
+    })
+
+    min_sdk = sdk_attrs.get('minSdkVersion')
+    return {
+        'package_name': manifest_attrs.get('package'),
+        'version_code': manifest_attrs.get('versionCode'),
+        'version_name': manifest_attrs.get('versionName'),
+        'split': manifest_attrs.get('split'),
+        'is_feature_split': bool(manifest_attrs.get('isFeatureSplit')),
+        # Sin uses-sdk Android asume la API 1; las vistas previas usan un nombre en clave
+        'min_sdk': min_sdk if min_sdk is not None else 1,
+        'target_sdk': sdk_attrs.get('targetSdkVersion'),
+        'abis': abis,
+    }
+
+
+def inspect_apk(source):
+    """
+    Lee el manifiesto de un APK sin instalarlo ni extraerlo.
+
+    Args:
+        source: Ruta del APK u objeto binario con acceso aleatorio (p. ej. una
+            entrada abierta de un .apks/.xapk)
+
+    Returns:
+        dict: package_name, version_code, version_name, split, is_feature_split,
+        min_sdk, target_sdk, abis (ABIs con librerías nativas) y signer_hashes
+        (hash de cada certificado firmante, como lo muestra 'dumpsys package')
+
+    Raises:
+        ApkInspectionError: Si no es un APK válido
+    """
+    try:
+        with zipfile.ZipFile(source) as archive:
+            signing_block = _read_source_signing_block(source)
+            fingerprint = _content_fingerprint(archive, signing_block)
+            with _cache_lock:
+                if fingerprint in _cache:
+                    _cache.move_to_end(fingerprint)
+                    return dict(_cache[fingerprint])
+
+            info = _inspect_archive(archive)
+            info['signer_hashes'] = _read_signer_hashes(signing_block, archive)
+    except zipfile.BadZipFile:
+        raise ApkInspectionError("El archivo no es un APK válido")
+    except (struct.error, IndexError, ValueError) as e:
+        raise ApkInspectionError(f"No se pudo leer AndroidManifest.xml: {e}")
+
+    with _cache_lock:
+        _cache[fingerprint] = info
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return dict(info)
+
+
+def check_device_compatibility(apk_info, device_sdk, device_abis):
+    """
+    Comprueba un APK contra la API y los ABIs del dispositivo.
+
+    Returns:
+        tuple: (compatible, mensaje)
+    """
+    min_sdk = apk_info.get('min_sdk')
+    if isinstance(min_sdk, str):
+        return False, f"La aplicación requiere una versión preliminar de Android ({min_sdk})."
+    if device_sdk and isinstance(min_sdk, int) and min_sdk > device_sdk:
+        return False, (
+            f"La aplicación requiere Android API {min_sdk} o superior "
+            f"y el dispositivo tiene API {device_sdk}."
+        )
+
+    abis = apk_info.get('abis') or []
+    if abis and device_abis and not set(abis) & set(device_abis):
+        return False, (
+            f"La aplicación solo incluye código nativo para {', '.join(abis)} "
+            f"y el dispositivo usa {', '.join(device_abis)}."
+        )
+    return True, ""
+
+
+def try_inspect_apk(source):
+    """Como inspect_apk, pero devuelve None si el APK no se puede analizar"""
+    try:
+        return inspect_apk(source)
+    except ApkInspectionError as e:
+        print_in_debug_mode(f"No se pudo inspeccionar el APK: {e}")
+        return None
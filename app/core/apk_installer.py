@@ -1,13 +1,58 @@
+import hashlib
+import itertools
 import subprocess
 import os
 import re
+import threading
+import zipfile
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
 from .adb_manager import ADBManager
+from .adb_socket_client import ADBProtocolError
+from .apk_bundle import (SplitEntry, get_split_abi, group_install_units, is_bundle, list_bundle_entries,
+                         open_bundle, select_abi_splits)
+from .apk_inspector import check_device_compatibility, try_inspect_apk
+from .package_dump_parser import build_package_index
+from .process_runner import OperationCancelled, cancel_scope, run_cancellable
+from .transfer_progress import ProgressReader, TransferProgress, estimate_transfer_timeout
+from app.constants.config import INSTALL_BASE_TIMEOUT, INSTALL_CACHE_DIR, INSTALL_CACHE_MAX_BYTES
+from app.constants.enums import ADBBackend
 from app.utils.helpers import get_subprocess_kwargs
+from app.utils.print_in_debug_mode import print_in_debug_mode
+
+# "Success: created install session [1234567]"
+_SESSION_ID = re.compile(r'\[(\d+)\]')
+
+# Firma v4 que acompaña al APK en las instalaciones incrementales
+IDSIG_EXTENSION = ".idsig"
+# Tamaño mínimo de una transferencia para tomarla como medida de la velocidad del enlace
+RATE_SAMPLE_MIN_SIZE = 4 * 1024 * 1024
+# sha256 de APKs locales recordados (se reinstalan los mismos archivos una y otra vez)
+DIGEST_CACHE_SIZE = 512
+
+
+def _safe_name(name):
+    """Nombre de archivo utilizable en una sesión de pm o en una ruta del dispositivo"""
+    return re.sub(r'[^A-Za-z0-9._-]', '_', name)
+
 
 class APKInstaller:
     def __init__(self, adb_manager: ADBManager):
         self.adb_manager = adb_manager
         self.kwargs = get_subprocess_kwargs()
+        # Velocidad medida del enlace por dispositivo (bytes/s) y soporte de instalación incremental
+        self._link_rates = {}
+        self._incremental_support = {}
+        # API y ABIs de cada dispositivo para las comprobaciones previas
+        self._device_profiles = {}
+        # Numeración de los APKs copiados al directorio de espera (evita colisiones de nombres)
+        self._staging_sequence = itertools.count()
+        # sha256 por SplitEntry.key y APKs de la caché del dispositivo que no se pueden borrar aún
+        self._digests = OrderedDict()
+        self._cache_pins = Counter()
+        self._cache_lock = threading.Lock()
+        # SplitEntry.key -> Event de los sha256 que otro carril está calculando
+        self._digests_in_progress = {}
     
     def _parse_adb_error(self, error_message):
         """Convierte mensajes de error técnicos de ADB en mensajes entendibles para el usuario"""
@@ -66,8 +111,53 @@ class APKInstaller:
         # Si no, parsear toda la salida
         return self._parse_adb_error(error_output)
 
-    def install_apk(self, apk_path, device_id):
-        """Instala un APK en el dispositivo especificado con mensajes de error amigables"""
+    def _is_device_ready(self, adb_path, device_id):
+        """Comprueba que el dispositivo responde, reutilizando la sesión de shell si existe"""
+        online = self.adb_manager.is_device_online(device_id)
+        if online is not None:
+            return online
+
+        probe = self.adb_manager.execute_without_process(device_id, ["shell", "echo", "ok"], timeout=10)
+        if probe is not None:
+            return probe.get('success', False)
+
+        check_result = subprocess.run(
+            [adb_path, "-s", device_id, "get-state"],
+            **self.kwargs
+        )
+        return check_result.returncode == 0
+
+    def install_unit(self, unit, device_id, progress_callback=None):
+        """Instala una unidad de group_install_units (APK, splits sueltos o .apks/.xapk)"""
+        if self.is_device_cache_enabled() and self.can_stage(unit, device_id):
+            # Si el dispositivo ya tiene los APKs en su caché no se transfiere nada
+            try:
+                files, error = self.stage_unit(unit, device_id, progress_callback=progress_callback)
+            except OperationCancelled:
+                return False, "Instalación cancelada"
+            if files is not None:
+                try:
+                    return self.install_staged(unit, files, device_id)
+                finally:
+                    self.release_staged(files, device_id)
+            if error:
+                return False, error
+
+        if unit.is_split_set and not unit.is_bundle:
+            return self.install_split_apks(unit.paths, device_id, unit.name, progress_callback)
+        return self.install_apk(unit.paths[0], device_id, progress_callback)
+
+    def install_apk(self, apk_path, device_id, progress_callback=None):
+        """
+        Instala un APK en el dispositivo especificado con mensajes de error amigables.
+
+        El APK se envía por streaming a una sesión del gestor de paquetes (como
+        'adb install --streaming') y progress_callback(enviados, total, velocidad, eta)
+        recibe el avance de la transferencia. Si junto al APK hay una firma v4
+        (.idsig) y el dispositivo lo soporta, se intenta antes una instalación incremental.
+        """
+        if is_bundle(apk_path):
+            return self.install_bundle(apk_path, device_id, progress_callback)
         try:
             if not os.path.exists(apk_path):
                 return False, "El archivo APK no existe o no se puede acceder a él."
@@ -76,20 +166,28 @@ class APKInstaller:
             adb_path = self.adb_manager.get_adb_path()
             
             # Verificar que el dispositivo sigue conectado
-            check_result = subprocess.run(
-                [adb_path, "-s", device_id, "get-state"],
-                **self.kwargs
-            )
-            
-            if check_result.returncode != 0:
+            if not self._is_device_ready(adb_path, device_id):
                 return False, "Dispositivo no disponible. Verifica que esté conectado y con depuración USB activada."
 
-            # Instalar el APK
-            kwargs = get_subprocess_kwargs(timeout=60)
-            install_result = subprocess.run(
-                [adb_path, "-s", device_id, "install", "-r", apk_path],
-                **kwargs
-            )
+            # Rechazar APKs incompatibles antes de transferir un solo byte
+            compatible, reason = self._check_compatibility(try_inspect_apk(apk_path), device_id)
+            if not compatible:
+                return False, f"No se puede instalar {apk_name}:\n{reason}"
+
+            if os.path.exists(apk_path + IDSIG_EXTENSION) and self._supports_incremental(device_id):
+                install_result = self._run_adb_install(adb_path, device_id, apk_path, ["--incremental"])
+                if install_result.returncode == 0:
+                    return True, f"{apk_name} instalado correctamente (instalación incremental)"
+                print_in_debug_mode(f"Instalación incremental fallida, se envía el APK completo: {install_result.stderr}")
+
+            success, output = self._install_session([SplitEntry.from_file(apk_path)], device_id, progress_callback)
+            if success:
+                return True, f"{apk_name} instalado correctamente"
+            if success is not None:
+                return False, f"Error instalando {apk_name}:\n{self._get_simple_error_message('', output)}"
+
+            # Sin sesiones del gestor de paquetes (Android antiguo): 'adb install' clásico
+            install_result = self._run_adb_install(adb_path, device_id, apk_path)
             
             if install_result.returncode == 0:
                 return True, f"{apk_name} instalado correctamente"
@@ -102,6 +200,8 @@ class APKInstaller:
                 
         except subprocess.TimeoutExpired:
             return False, "Tiempo de espera agotado. La instalación tardó demasiado."
+        except OperationCancelled:
+            return False, "Instalación cancelada"
         except FileNotFoundError:
             return False, "ADB no encontrado. Verifica la configuración del programa."
         except PermissionError:
@@ -109,16 +209,587 @@ class APKInstaller:
         except Exception as e:
             return False, f"Error inesperado: {str(e)}"
 
+    def _run_adb_install(self, adb_path, device_id, apk_path, extra_args=()):
+        """'adb install -r' con un timeout proporcional al tamaño del APK"""
+        timeout = estimate_transfer_timeout(os.path.getsize(apk_path), self._link_rates.get(device_id))
+        return run_cancellable(
+            [adb_path, "-s", device_id, "install", "-r", *extra_args, apk_path],
+            timeout=timeout
+        )
+
+    def install_split_apks(self, apk_paths, device_id, display_name=None, progress_callback=None):
+        """Instala los splits sueltos de una aplicación en una sola sesión"""
+        display_name = display_name or os.path.basename(apk_paths[0])
+        try:
+            if not all(os.path.exists(path) for path in apk_paths):
+                return False, "Alguno de los archivos APK no existe o no se puede acceder a él."
+            entries = [SplitEntry.from_file(path) for path in apk_paths]
+            return self._install_split_entries(entries, device_id, display_name, progress_callback)
+        except PermissionError:
+            return False, "Permisos insuficientes para acceder al archivo APK."
+        except Exception as e:
+            return False, f"Error inesperado: {str(e)}"
+
+    def install_bundle(self, bundle_path, device_id, progress_callback=None):
+        """
+        Instala un .apks/.xapk. Las entradas se leen directamente del zip y se envían
+        al dispositivo sin extraerlas a disco.
+        """
+        bundle_name = os.path.basename(bundle_path)
+        try:
+            if not os.path.exists(bundle_path):
+                return False, "El archivo no existe o no se puede acceder a él."
+            with open_bundle(bundle_path) as archive:
+                entries = list_bundle_entries(archive)
+                if not entries:
+                    return False, f"{bundle_name} no contiene ningún APK."
+                return self._install_split_entries(entries, device_id, bundle_name, progress_callback)
+        except zipfile.BadZipFile:
+            return False, f"{bundle_name} no es un archivo .apks/.xapk válido."
+        except PermissionError:
+            return False, "Permisos insuficientes para acceder al archivo."
+        except Exception as e:
+            return False, f"Error inesperado: {str(e)}"
+
+    def _install_split_entries(self, entries, device_id, display_name, progress_callback=None):
+        """Comprueba el dispositivo, filtra los splits por ABI y los instala en una sesión"""
+        try:
+            adb_path = self.adb_manager.get_adb_path()
+            if not self._is_device_ready(adb_path, device_id):
+                return False, "Dispositivo no disponible. Verifica que esté conectado y con depuración USB activada."
+
+            compatible, reason = self._check_split_compatibility(entries, device_id)
+            if not compatible:
+                return False, f"No se puede instalar {display_name}:\n{reason}"
+
+            entries = select_abi_splits(entries, self._get_device_profile(device_id)[1])
+            success, output = self._install_session(entries, device_id, progress_callback)
+            if success:
+                return True, f"{display_name} instalado correctamente ({len(entries)} APKs)"
+            return False, f"Error instalando {display_name}:\n{self._get_simple_error_message('', output)}"
+
+        except subprocess.TimeoutExpired:
+            return False, "Tiempo de espera agotado. La instalación tardó demasiado."
+        except OperationCancelled:
+            return False, "Instalación cancelada"
+        except FileNotFoundError:
+            return False, "ADB no encontrado. Verifica la configuración del programa."
+
+    def can_stage(self, unit, device_id):
+        """
+        True si la unidad se puede copiar antes al dispositivo (ver stage_unit).
+        Los APKs con firma v4 se dejan a la instalación incremental.
+        """
+        has_idsig = not unit.is_split_set and os.path.exists(unit.paths[0] + IDSIG_EXTENSION)
+        return not (has_idsig and self._supports_incremental(device_id))
+
+    def prepare_staging(self, device_id, staging_dir):
+        """Crea (vacío) el directorio de espera. Devuelve False si no se pudo"""
+        try:
+            self._run_shell_command(device_id, f"rm -rf {staging_dir}; mkdir -p {staging_dir}", own_connection=True)
+            return True
+        except (subprocess.TimeoutExpired, OSError) as e:
+            print_in_debug_mode(f"No se pudo preparar {staging_dir} en {device_id}: {e}")
+            return False
+
+    def remove_staging(self, device_id, staging_dir):
+        """Borra el directorio de espera, aunque la operación se haya cancelado"""
+        with cancel_scope(None):
+            try:
+                self._run_shell_command(device_id, f"rm -rf {staging_dir}", own_connection=True)
+            except Exception as e:
+                print_in_debug_mode(f"No se pudo borrar {staging_dir} en {device_id}: {e}")
+
+    def stage_unit(self, unit, device_id, staging_dir=None, progress_callback=None):
+        """
+        Copia los APKs de la unidad al dispositivo sin instalarlos, tras las mismas
+        comprobaciones previas que install_unit.
+
+        Con la caché del dispositivo activada los APKs se guardan en INSTALL_CACHE_DIR
+        con su sha256 como nombre y solo se envían los que no estén ya allí; si no,
+        se copian a staging_dir y release_staged los borra.
+
+        Returns:
+            tuple: (archivos, error). archivos es una lista de (nombre, tamaño, ruta
+            remota) para install_staged; si es None y error también, la copia no
+            fue posible y la unidad debe instalarse con install_unit.
+        """
+        use_cache = self.is_device_cache_enabled()
+        written, pinned = [], []
+        try:
+            with self._open_unit_entries(unit) as entries:
+                if not entries:
+                    return None, f"{unit.name} no contiene ningún APK."
+                if len(entries) > 1:
+                    compatible, reason = self._check_split_compatibility(entries, device_id)
+                    entries = select_abi_splits(entries, self._get_device_profile(device_id)[1])
+                else:
+                    with entries[0].open() as stream:
+                        compatible, reason = self._check_compatibility(try_inspect_apk(stream), device_id)
+                if not compatible:
+                    return None, f"No se puede instalar {unit.name}:\n{reason}"
+
+                if use_cache:
+                    remote_paths = [f"{INSTALL_CACHE_DIR}/{self._entry_digest(entry)}.apk" for entry in entries]
+                    pinned = self._pin_cached(device_id, remote_paths)
+                    cached_sizes = self._stat_cached(device_id, remote_paths)
+                else:
+                    remote_paths = [
+                        f"{staging_dir}/{next(self._staging_sequence)}_{_safe_name(entry.name)}" for entry in entries
+                    ]
+                    cached_sizes = {}
+
+                missing = [
+                    (entry, remote_path) for entry, remote_path in zip(entries, remote_paths)
+                    if cached_sizes.get(remote_path) != entry.size
+                ]
+                progress = TransferProgress(sum(entry.size for entry, _ in missing), progress_callback)
+                for entry, remote_path in missing:
+                    # En la caché se sube con otro nombre: un envío cortado no pasa por APK válido
+                    target = f"{remote_path}.part" if use_cache else remote_path
+                    written.append(target)
+                    self._push_entry(device_id, entry, target, progress)
+                files = [(entry.name, entry.size, remote_path) for entry, remote_path in zip(entries, remote_paths)]
+
+            if use_cache:
+                # Publica los nuevos y marca todos como usados ahora (orden LRU)
+                renames = [f"mv {remote_path}.part {remote_path}" for _, remote_path in missing]
+                self._run_shell_command(
+                    device_id, "; ".join(renames + ["touch -c " + " ".join(remote_paths)]), own_connection=True
+                )
+                print_in_debug_mode(
+                    f"Caché de {device_id}: {len(entries) - len(missing)} de {len(entries)} APKs de {unit.name} ya estaban"
+                )
+            self._record_link_rate(device_id, progress)
+            return files, None
+        except OperationCancelled:
+            self._discard_staged_paths(written, device_id)
+            self._unpin_cached(device_id, pinned)
+            raise
+        except (OSError, zipfile.BadZipFile, ADBProtocolError, subprocess.TimeoutExpired) as e:
+            # Sin copia previa la unidad se instala igual, por streaming
+            print_in_debug_mode(f"No se pudo copiar {unit.name} al dispositivo: {e}")
+            self._discard_staged_paths(written, device_id)
+            self._unpin_cached(device_id, pinned)
+            return None, None
+
+    def install_staged(self, unit, files, device_id):
+        """Instala una unidad copiada con stage_unit (la confirmación no transfiere datos)"""
+        try:
+            entries = [SplitEntry(name, size, None) for name, size, _ in files]
+            remote_paths = [remote_path for _, _, remote_path in files]
+            success, output = self._install_session(entries, device_id, remote_paths=remote_paths)
+            if success is None and len(files) == 1:
+                # Sin sesiones del gestor de paquetes se instala directamente desde la copia
+                output = self._run_shell_command(
+                    device_id, f"pm install -r {remote_paths[0]}", timeout=estimate_transfer_timeout(files[0][1])
+                )
+                success = "Success" in output
+            if success:
+                if unit.is_split_set:
+                    return True, f"{unit.name} instalado correctamente ({len(files)} APKs)"
+                return True, f"{unit.name} instalado correctamente"
+            return False, f"Error instalando {unit.name}:\n{self._get_simple_error_message('', output)}"
+        except subprocess.TimeoutExpired:
+            return False, "Tiempo de espera agotado. La instalación tardó demasiado."
+        except OperationCancelled:
+            return False, "Instalación cancelada"
+        except Exception as e:
+            return False, f"Error inesperado: {str(e)}"
+
+    def release_staged(self, files, device_id):
+        """
+        Libera los APKs copiados de una unidad: las copias temporales se borran y las
+        de la caché se conservan, borrando las más antiguas si se supera su tamaño máximo.
+        """
+        remote_paths = [remote_path for _, _, remote_path in files]
+        cached = [remote_path for remote_path in remote_paths if remote_path.startswith(INSTALL_CACHE_DIR + "/")]
+        self._discard_staged_paths([path for path in remote_paths if path not in cached], device_id)
+        if cached:
+            self._unpin_cached(device_id, cached)
+            with cancel_scope(None):
+                self._evict_device_cache(device_id)
+
+    def _discard_staged_paths(self, remote_paths, device_id):
+        """Borra del dispositivo los APKs indicados"""
+        if not remote_paths:
+            return
+        with cancel_scope(None):
+            try:
+                self._run_shell_command(device_id, "rm -f " + " ".join(remote_paths), own_connection=True)
+            except Exception as e:
+                print_in_debug_mode(f"No se pudieron borrar los APKs copiados: {e}")
+
+    def is_device_cache_enabled(self):
+        return self.adb_manager.config_manager.get_install_device_cache()
+
+    def _entry_digest(self, entry):
+        """
+        sha256 del APK; se recuerda por SplitEntry.key para no releer archivos sin
+        cambios. Si otro carril ya está leyendo el mismo archivo se espera su resultado.
+        """
+        if entry.key is None:
+            return self._hash_entry(entry)
+
+        while True:
+            with self._cache_lock:
+                if entry.key in self._digests:
+                    self._digests.move_to_end(entry.key)
+                    return self._digests[entry.key]
+                in_progress = self._digests_in_progress.get(entry.key)
+                if in_progress is None:
+                    in_progress = self._digests_in_progress[entry.key] = threading.Event()
+                    break
+            # Si ese carril falla, se vuelve a intentar aquí
+            in_progress.wait()
+
+        try:
+            digest = self._hash_entry(entry)
+            with self._cache_lock:
+                self._digests[entry.key] = digest
+                while len(self._digests) > DIGEST_CACHE_SIZE:
+                    self._digests.popitem(last=False)
+            return digest
+        finally:
+            with self._cache_lock:
+                del self._digests_in_progress[entry.key]
+            in_progress.set()
+
+    @staticmethod
+    def _hash_entry(entry):
+        digest = hashlib.sha256()
+        with entry.open() as stream:
+            for chunk in iter(lambda: stream.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _stat_cached(self, device_id, remote_paths):
+        """
+        Comprueba con una sola llamada qué APKs tiene ya la caché del dispositivo.
+
+        Returns:
+            dict: {ruta remota: tamaño} de los que existen
+        """
+        output = self._run_shell_command(
+            device_id, f"mkdir -p {INSTALL_CACHE_DIR}; stat -c '%s %n' {' '.join(remote_paths)} 2>/dev/null",
+            own_connection=True
+        )
+        sizes = {}
+        for line in output.splitlines():
+            size, _, path = line.strip().partition(' ')
+            if size.isdigit() and path in remote_paths:
+                sizes[path] = int(size)
+        return sizes
+
+    def _pin_cached(self, device_id, remote_paths):
+        """Evita que se desalojen APKs que una instalación en curso va a usar"""
+        with self._cache_lock:
+            self._cache_pins.update((device_id, path) for path in remote_paths)
+        return list(remote_paths)
+
+    def _unpin_cached(self, device_id, remote_paths):
+        with self._cache_lock:
+            for path in remote_paths:
+                self._cache_pins[(device_id, path)] -= 1
+                if self._cache_pins[(device_id, path)] <= 0:
+                    del self._cache_pins[(device_id, path)]
+
+    def _evict_device_cache(self, device_id):
+        """Borra los APKs usados hace más tiempo hasta que la caché cabe en INSTALL_CACHE_MAX_BYTES"""
+        try:
+            output = self._run_shell_command(
+                device_id, f"stat -c '%Y %s %n' {INSTALL_CACHE_DIR}/*.apk 2>/dev/null", own_connection=True
+            )
+            cached = []
+            for line in output.splitlines():
+                parts = line.strip().split(' ', 2)
+                if len(parts) == 3 and parts[0].isdigit() and parts[1].isdigit():
+                    cached.append((int(parts[0]), int(parts[1]), parts[2]))
+
+            total = sum(size for _, size, _ in cached)
+            evicted = []
+            with self._cache_lock:
+                for _, size, path in sorted(cached):
+                    if total <= INSTALL_CACHE_MAX_BYTES:
+                        break
+                    if self._cache_pins[(device_id, path)] > 0:
+                        continue
+                    evicted.append(path)
+                    total -= size
+            if evicted:
+                print_in_debug_mode(f"Caché de {device_id}: se borran {len(evicted)} APKs sin usar")
+                self._run_shell_command(device_id, "rm -f " + " ".join(evicted), own_connection=True)
+        except Exception as e:
+            print_in_debug_mode(f"No se pudo limpiar la caché de {device_id}: {e}")
+
+    @contextmanager
+    def _open_unit_entries(self, unit):
+        """APKs de la unidad como SplitEntry (un .apks/.xapk permanece abierto mientras tanto)"""
+        if unit.is_bundle:
+            with open_bundle(unit.paths[0]) as archive:
+                yield list_bundle_entries(archive)
+        else:
+            yield [SplitEntry.from_file(path) for path in unit.paths]
+
+    def _push_entry(self, device_id, entry, remote_path, progress):
+        """Copia un APK al dispositivo (sync SEND por socket o 'adb exec-in') informando de los bytes"""
+        if self.adb_manager.get_backend() == ADBBackend.SOCKET:
+            try:
+                with entry.open() as stream:
+                    self.adb_manager.socket_client.push_stream(
+                        device_id, ProgressReader(stream, progress), remote_path
+                    )
+                return
+            except ConnectionRefusedError:
+                print_in_debug_mode("Servidor ADB no disponible por socket, usando el binario")
+
+        # 'adb push' no informa del avance fuera de una terminal: se envía por la
+        # entrada de 'cat' y se comprueba el tamaño escrito
+        adb_path = self.adb_manager.get_adb_path()
+        with entry.open() as stream:
+            completed = run_cancellable(
+                [adb_path, "-s", device_id, "exec-in", f"cat > {remote_path} && stat -c %s {remote_path}"],
+                timeout=estimate_transfer_timeout(entry.size, self._link_rates.get(device_id)),
+                input_stream=ProgressReader(stream, progress)
+            )
+        if completed.stdout.strip() != str(entry.size):
+            raise ADBProtocolError(
+                completed.stderr.strip() or completed.stdout.strip() or f"No se pudo copiar {entry.name}"
+            )
+
+    def _install_session(self, entries, device_id, progress_callback=None, remote_paths=None):
+        """
+        Equivalente a 'adb install-multiple --streaming': crea una sesión del gestor
+        de paquetes, escribe cada APK por streaming y la confirma de forma atómica.
+        Con remote_paths, los APKs ya están en el dispositivo y se escriben desde allí.
+
+        Returns:
+            tuple: (éxito, salida del gestor de paquetes). éxito es None si no se
+            pudo crear la sesión (el dispositivo no admite sesiones de instalación).
+        """
+        total_size = sum(entry.size for entry in entries)
+        output = self._run_shell_command(device_id, f"pm install-create -r -S {total_size}")
+        match = _SESSION_ID.search(output)
+        if "Success" not in output or not match:
+            return None, output
+        session_id = match.group(1)
+
+        progress = TransferProgress(total_size, progress_callback)
+        committed = False
+        try:
+            for index, entry in enumerate(entries):
+                split_name = f"{index}_{_safe_name(entry.name)}"
+                if remote_paths:
+                    # Copia local dentro del dispositivo: no depende de la velocidad del enlace
+                    output = self._run_shell_command(
+                        device_id,
+                        f"pm install-write -S {entry.size} {session_id} {split_name} {remote_paths[index]}",
+                        timeout=estimate_transfer_timeout(entry.size)
+                    )
+                    progress.advance(entry.size)
+                else:
+                    timeout = estimate_transfer_timeout(entry.size, self._link_rates.get(device_id))
+                    with entry.open() as stream:
+                        output = self._stream_to_pm(
+                            device_id,
+                            f"pm install-write -S {entry.size} {session_id} {split_name} -",
+                            ProgressReader(stream, progress),
+                            timeout
+                        )
+                if "Success" not in output:
+                    return False, output
+
+            if not remote_paths:
+                self._record_link_rate(device_id, progress)
+            # La confirmación verifica y optimiza el APK en el dispositivo: también escala con el tamaño
+            output = self._run_shell_command(
+                device_id, f"pm install-commit {session_id}", timeout=estimate_transfer_timeout(total_size)
+            )
+            committed = "Success" in output
+            return committed, output
+        finally:
+            if not committed:
+                # La sesión se abandona aunque la operación se haya cancelado
+                with cancel_scope(None):
+                    try:
+                        self._run_shell_command(device_id, f"pm install-abandon {session_id}")
+                    except Exception as e:
+                        print_in_debug_mode(f"No se pudo abandonar la sesión {session_id}: {e}")
+
+    def _record_link_rate(self, device_id, progress):
+        """Guarda la velocidad medida del enlace para ajustar los próximos timeouts"""
+        # Transferencias pequeñas miden sobre todo la latencia, no la velocidad
+        if progress.total >= RATE_SAMPLE_MIN_SIZE:
+            self._link_rates[device_id] = progress.average_rate()
+
+    def _run_shell_command(self, device_id, command, timeout=30, own_connection=False):
+        """
+        Ejecuta un comando de shell y devuelve su salida combinada (stdout y stderr).
+
+        Con own_connection no se usa la sesión persistente (por socket o con un
+        proceso propio): los comandos de la copia previa no esperan así a que
+        termine el 'pm install-write'/'pm install-commit' de otra unidad.
+        """
+        if not own_connection:
+            result = self.adb_manager.execute_without_process(device_id, ["shell", command], timeout)
+        elif self.adb_manager.get_backend() == ADBBackend.SOCKET:
+            result = self.adb_manager.socket_client.execute_command(device_id, ["shell", command], timeout)
+        else:
+            result = None
+        if result is not None and 'returncode' in result:
+            return f"{result['stdout']}{result['stderr']}"
+        if result is not None:
+            # El comando ya se envió: repetirlo con el binario lo ejecutaría dos veces
+            raise subprocess.TimeoutExpired(command, timeout)
+
+        adb_path = self.adb_manager.get_adb_path()
+        completed = run_cancellable([adb_path, "-s", device_id, "shell", command], timeout=timeout)
+        return f"{completed.stdout}{completed.stderr}"
+
+    def _stream_to_pm(self, device_id, command, stream, timeout=300):
+        """Envía un APK a la entrada de un comando pm ('exec:' por socket o 'adb exec-in')"""
+        if self.adb_manager.get_backend() == ADBBackend.SOCKET:
+            try:
+                # Por socket el timeout se aplica a cada bloque: detecta un enlace detenido
+                output = self.adb_manager.socket_client.exec_in(
+                    device_id, command, stream, min(timeout, INSTALL_BASE_TIMEOUT)
+                )
+                return output.decode("utf-8", errors="replace")
+            except ADBProtocolError as e:
+                return str(e)
+            except ConnectionRefusedError:
+                print_in_debug_mode("Servidor ADB no disponible por socket, usando el binario")
+
+        adb_path = self.adb_manager.get_adb_path()
+        completed = run_cancellable(
+            [adb_path, "-s", device_id, "exec-in"] + command.split(),
+            timeout=timeout,
+            input_stream=stream
+        )
+        return f"{completed.stdout}{completed.stderr}"
+
+    def _get_device_profile(self, device_id):
+        """
+        Returns:
+            tuple: (API del dispositivo o None, ABIs soportados en orden de preferencia)
+        """
+        if device_id not in self._device_profiles:
+            try:
+                output = self._run_shell_command(
+                    device_id, "getprop ro.build.version.sdk; getprop ro.product.cpu.abilist", timeout=10
+                )
+            except (subprocess.TimeoutExpired, OSError):
+                return None, []
+            lines = output.strip().splitlines()
+            sdk = lines[0].strip() if lines else ''
+            abis = lines[1].strip().split(',') if len(lines) > 1 else []
+            self._device_profiles[device_id] = (
+                int(sdk) if sdk.isdigit() else None,
+                [abi.strip() for abi in abis if abi.strip()]
+            )
+        return self._device_profiles[device_id]
+
+    def _check_compatibility(self, apk_info, device_id):
+        """Compara el manifiesto del APK con la API y los ABIs del dispositivo"""
+        if apk_info is None:
+            return True, ""  # Sin manifiesto legible decide el gestor de paquetes
+        device_sdk, device_abis = self._get_device_profile(device_id)
+        return check_device_compatibility(apk_info, device_sdk, device_abis)
+
+    def get_installed_state(self, device_id):
+        """
+        Versión, splits y firmas de todos los paquetes del dispositivo en una sola consulta.
+
+        Returns:
+            dict: {package_name: registro de package_dump_parser}, vacío si falla
+        """
+        try:
+            output = self._run_shell_command(device_id, "dumpsys package packages", timeout=60)
+        except (subprocess.TimeoutExpired, OSError) as e:
+            print_in_debug_mode(f"No se pudo obtener el estado instalado de {device_id}: {e}")
+            return {}
+        return build_package_index(output.splitlines())
+
+    def is_already_installed(self, unit, installed_state, device_id):
+        """
+        True si el dispositivo ya tiene exactamente esta compilación: mismo paquete,
+        versionCode y certificados firmantes, y (para splits) todos los splits que
+        se enviarían.
+        """
+        if not installed_state:
+            return False
+        try:
+            if unit.is_bundle:
+                with open_bundle(unit.paths[0]) as archive:
+                    return self._matches_installed(list_bundle_entries(archive), installed_state, device_id)
+            entries = [SplitEntry.from_file(path) for path in unit.paths]
+            return self._matches_installed(entries, installed_state, device_id)
+        except (OSError, zipfile.BadZipFile) as e:
+            print_in_debug_mode(f"No se pudo comparar {unit.name} con el dispositivo: {e}")
+            return False
+
+    def _matches_installed(self, entries, installed_state, device_id):
+        if len(entries) > 1:
+            entries = select_abi_splits(entries, self._get_device_profile(device_id)[1])
+
+        base_info, split_names = None, []
+        for entry in entries:
+            with entry.open() as stream:
+                apk_info = try_inspect_apk(stream)
+            if apk_info is None:
+                return False
+            if apk_info['split']:
+                split_names.append(apk_info['split'])
+            else:
+                base_info = apk_info
+        if base_info is None:
+            return False
+
+        record = installed_state.get(base_info['package_name'])
+        if not record or str(record.get('version_code')) != str(base_info['version_code']):
+            return False
+        # Sin firmas conocidas en alguno de los lados no se puede asegurar que sea la misma compilación
+        if not base_info['signer_hashes'] or set(base_info['signer_hashes']) != set(record.get('signatures', [])):
+            return False
+        return set(split_names) <= set(record.get('splits', []))
+
+    def _check_split_compatibility(self, entries, device_id):
+        """Comprueba el APK base de un conjunto de splits y que haya un split de ABI utilizable"""
+        for entry in entries:
+            with entry.open() as stream:
+                apk_info = try_inspect_apk(stream)
+            if apk_info and not apk_info['split']:
+                compatible, reason = self._check_compatibility(apk_info, device_id)
+                if not compatible:
+                    return False, reason
+                break
+
+        split_abis = sorted({get_split_abi(entry.name) for entry in entries} - {None})
+        return self._check_compatibility({'abis': split_abis}, device_id)
+
+    def _supports_incremental(self, device_id):
+        """True si el dispositivo admite instalaciones incrementales (Android 11+)"""
+        if device_id not in self._incremental_support:
+            try:
+                output = self._run_shell_command(
+                    device_id, "pm has-feature android.software.incremental_delivery", timeout=10
+                )
+                self._incremental_support[device_id] = output.strip() == "true"
+            except (subprocess.TimeoutExpired, OSError):
+                return False
+        return self._incremental_support[device_id]
+
     def install_multiple_apks(self, apk_paths, device_id):
         """Instala múltiples APKs y devuelve un resumen consolidado"""
         try:
             successful_installs = []
             failed_installs = []
-            total_apks = len(apk_paths)
+            units = group_install_units(apk_paths)
+            total_apks = len(units)
             
-            for i, apk_path in enumerate(apk_paths, 1):
-                apk_name = os.path.basename(apk_path)
-                success, message = self.install_apk(apk_path, device_id)
+            for unit in units:
+                apk_name = unit.name
+                success, message = self.install_unit(unit, device_id)
                 
                 if success:
                     successful_installs.append(apk_name)
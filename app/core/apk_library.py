@@ -0,0 +1,217 @@
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from app.constants.config import APK_LIBRARY_DIR_NAME, APK_LIBRARY_MAX_BYTES, CONFIG_DIR_NAME
+from app.core.apk_inspector import try_inspect_apk
+from app.utils.print_in_debug_mode import print_in_debug_mode
+
+INDEX_DB_NAME = "index.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    sha256 TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    package_name TEXT,
+    version_code TEXT,
+    split TEXT,
+    signers TEXT,
+    added_at REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS blobs_package ON blobs (package_name, version_code);
+"""
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as source:
+        for chunk in iter(lambda: source.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def link_or_copy(source, destination):
+    """Crea destination como enlace duro de source (o como copia si no es posible)"""
+    partial = f"{destination}.part"
+    if os.path.exists(partial):
+        os.remove(partial)
+    try:
+        os.link(source, partial)
+    except OSError:
+        # Otro sistema de archivos o sin soporte de enlaces duros
+        shutil.copyfile(source, partial)
+    os.replace(partial, destination)
+
+
+def copy_file(source, destination):
+    """Copia source en destination sin que destination quede nunca a medio escribir"""
+    partial = f"{destination}.part"
+    shutil.copyfile(source, partial)
+    os.replace(partial, destination)
+
+
+class APKLibrary:
+    """
+    Biblioteca local de APKs extraídos, direccionada por contenido.
+
+    Cada APK se guarda una sola vez como blobs/<sha256[:2]>/<sha256>.apk y un
+    índice SQLite registra su paquete, versionCode, split y firmantes. Antes de
+    descargar un APK, AppExtractor compara el sha256 calculado en el dispositivo
+    con el índice: si ya está, se enlaza o copia desde aquí sin pasar por el cable.
+
+    Los APKs entran en la biblioteca copiados (nunca enlazados al archivo del
+    usuario) y solo se enlazan hacia fuera. Si un blob se modificó después de
+    guardarlo (p. ej. editando un APK enlazado), se vuelve a comprobar su sha256
+    antes de usarlo.
+    """
+
+    def __init__(self, root_dir=None, max_bytes=APK_LIBRARY_MAX_BYTES):
+        self.root_dir = Path(root_dir) if root_dir else Path.home() / CONFIG_DIR_NAME / APK_LIBRARY_DIR_NAME
+        self.db_path = self.root_dir / INDEX_DB_NAME
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self):
+        if not self._initialized:
+            self.root_dir.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(str(self.db_path), timeout=5)
+        if not self._initialized:
+            connection.executescript(_SCHEMA)
+            self._initialized = True
+        return connection
+
+    @contextmanager
+    def _transaction(self):
+        """Conexión serializada que confirma al salir (o revierte si hay error) y se cierra"""
+        with self._lock:
+            connection = self._connect()
+            try:
+                with connection:
+                    yield connection
+            finally:
+                connection.close()
+
+    def blob_path(self, sha256):
+        return self.root_dir / "blobs" / sha256[:2] / f"{sha256}.apk"
+
+    def lookup(self, sha256):
+        """Ruta del APK guardado con ese sha256, o None si no está (o el archivo ya no existe)"""
+        try:
+            row = self._get_row(sha256)
+            if not row:
+                return None
+            # La comprobación (que puede leer el archivo entero) no bloquea a las demás extracciones
+            path = self.blob_path(sha256)
+            intact = self._is_intact(path, sha256, *row)
+            with self._transaction() as connection:
+                if not intact:
+                    connection.execute("DELETE FROM blobs WHERE sha256 = ?", (sha256,))
+                    path.unlink(missing_ok=True)
+                    return None
+                connection.execute(
+                    "UPDATE blobs SET last_used = ?, added_at = MAX(added_at, ?) WHERE sha256 = ?",
+                    (time.time(), path.stat().st_mtime, sha256)
+                )
+                return path
+        except (OSError, sqlite3.Error) as e:
+            print_in_debug_mode(f"Error consultando la biblioteca de APKs: {e}")
+            return None
+
+    def _get_row(self, sha256):
+        """(tamaño, added_at) del blob según el índice, o None si no está"""
+        with self._transaction() as connection:
+            return connection.execute("SELECT size, added_at FROM blobs WHERE sha256 = ?", (sha256,)).fetchone()
+
+    @staticmethod
+    def _is_unchanged(path, size, added_at):
+        """True si el blob existe y no se modificó desde que se guardó (sin leerlo)"""
+        try:
+            stat = path.stat()
+        except OSError:
+            return False
+        return stat.st_size == size and stat.st_mtime <= added_at
+
+    @classmethod
+    def _is_intact(cls, path, sha256, size, added_at):
+        """True si el blob sigue teniendo el contenido con el que se guardó"""
+        if cls._is_unchanged(path, size, added_at):
+            return True
+        try:
+            # Modificado después de guardarlo: solo vale si el contenido sigue siendo el mismo
+            return path.stat().st_size == size and file_sha256(path) == sha256
+        except OSError:
+            return False
+
+    def materialize(self, sha256, destination):
+        """Coloca en destination el APK guardado. Devuelve False si no está en la biblioteca"""
+        path = self.lookup(sha256)
+        if path is None:
+            return False
+        try:
+            link_or_copy(path, destination)
+            return True
+        except OSError as e:
+            print_in_debug_mode(f"No se pudo copiar {sha256} de la biblioteca: {e}")
+            return False
+
+    def add(self, local_path, sha256=None):
+        """
+        Guarda una copia de un APK recién extraído e indexa su manifiesto. Si se
+        conoce su sha256 (el calculado en el dispositivo) no se vuelve a leer el archivo.
+        Devuelve su sha256 o None si no se pudo guardar.
+        """
+        try:
+            sha256 = sha256 or file_sha256(local_path)
+            blob = self.blob_path(sha256)
+            row = self._get_row(sha256)
+            if row and self._is_unchanged(blob, *row):
+                # Ya estaba guardado y sin cambios: solo se marca como usado
+                with self._transaction() as connection:
+                    connection.execute("UPDATE blobs SET last_used = ? WHERE sha256 = ?", (time.time(), sha256))
+                return sha256
+
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            # Copia propia: el archivo del usuario puede editarse sin tocar la biblioteca
+            copy_file(local_path, blob)
+
+            apk_info = try_inspect_apk(str(blob)) or {}
+            now = time.time()
+            with self._transaction() as connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO blobs "
+                    "(sha256, size, package_name, version_code, split, signers, added_at, last_used) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        sha256, blob.stat().st_size, apk_info.get('package_name'),
+                        None if apk_info.get('version_code') is None else str(apk_info['version_code']),
+                        apk_info.get('split'), json.dumps(apk_info.get('signer_hashes') or []), now, now
+                    )
+                )
+                self._evict(connection, keep=sha256)
+            return sha256
+        except (OSError, sqlite3.Error) as e:
+            print_in_debug_mode(f"No se pudo guardar {local_path} en la biblioteca de APKs: {e}")
+            return None
+
+    def _evict(self, connection, keep):
+        """Borra los APKs usados hace más tiempo mientras la biblioteca supere max_bytes"""
+        rows = connection.execute("SELECT sha256, size FROM blobs ORDER BY last_used").fetchall()
+        total = sum(size for _, size in rows)
+        for sha256, size in rows:
+            if total <= self.max_bytes:
+                break
+            if sha256 == keep:
+                continue
+            connection.execute("DELETE FROM blobs WHERE sha256 = ?", (sha256,))
+            try:
+                self.blob_path(sha256).unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
@@ -1,12 +1,35 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from .adb_socket_client import ADBProtocolError
+from .apk_library import APKLibrary
 from .base_app_manager import BaseAppManager
+from .process_runner import OperationCancelled, cancel_scope, current_cancel_token, raise_if_cancelled, run_cancellable
+from .transfer_progress import TransferProgress, estimate_transfer_timeout
+from app.constants.config import EXTRACT_MAX_PARALLEL_PULLS
+from app.constants.enums import ADBBackend, ExtractFormat
 from app.utils.print_in_debug_mode import print_in_debug_mode
 
+# Rutas por llamada a 'stat'/'sha256sum' (evita líneas de comando demasiado largas)
+STAT_BATCH_SIZE = 100
+
 class AppExtractor(BaseAppManager):
     def __init__(self, adb_manager):
         super().__init__(adb_manager)
+        # APKs ya extraídos (de cualquier dispositivo), por sha256
+        self.apk_library = APKLibrary()
     def extract_app_apk(self, device_id, apk_path, app_name, output_path):
         """Extrae el APK de una aplicación instalada"""
         print_in_debug_mode(f"Extrayendo APK desde {apk_path} a {output_path}")
+
+        # Si ese mismo APK ya se extrajo antes no se vuelve a transferir
+        digest = self._get_remote_file_info(device_id, [apk_path])[1].get(apk_path)
+        if digest and self.apk_library.materialize(digest, output_path):
+            return True, f"APK guardado en: {output_path} (copiado de la biblioteca local)"
         
         result = self.execute_adb_command(
             device_id, 
@@ -15,24 +38,199 @@ class AppExtractor(BaseAppManager):
         )
         
         if result['success']:
+            self.apk_library.add(output_path, digest)
             return True, f"APK guardado en: {output_path}"
         else:      
             error_msg = result.get('error') or 'Error inesperado.'
             mensaje_error = f"No se pudo extraer {app_name} del dispositivo {device_id}. Error: {error_msg}"
             return False, mensaje_error
     
-    def batch_extract_apps(self, device_id, apps_list, output_dir):
-        """Extrae múltiples APKs en lote"""
+    def get_package_apk_paths(self, device_id, package_name):
+        """Rutas de todos los APKs de un paquete (base.apk y sus splits) según 'pm path'"""
+        result = self.execute_adb_command(device_id, ["shell", "pm", "path", package_name], timeout=15)
+        if not result.get('success'):
+            return []
+        return [
+            line.strip()[len("package:"):]
+            for line in result.get('stdout', '').splitlines()
+            if line.strip().startswith("package:")
+        ]
+
+    def batch_extract_apps(self, device_id, apps_list, output_dir, output_format=ExtractFormat.DIRECTORY,
+                           max_parallel=EXTRACT_MAX_PARALLEL_PULLS, progress_callback=None):
+        """
+        Extrae múltiples aplicaciones con todos sus APKs (base y splits).
+
+        Los archivos se descargan de max_parallel en max_parallel y
+        progress_callback(enviados, total, velocidad, eta) recibe el avance del
+        conjunto. Una aplicación con un solo APK se guarda como <paquete>.apk; una
+        dividida, como carpeta <paquete>/ o como <paquete>.apks según output_format.
+
+        Returns:
+            dict: {package_name: {'success', 'message', 'output_path'}}
+        """
         results = {}
+        plans = []  # (app, rutas remotas)
         for app in apps_list:
-            package_name = app['package_name']
-            apk_path = app['apk_path']
-            output_path = f"{output_dir}/{package_name}.apk"
-            
-            success, message = self.extract_app_apk(device_id, apk_path, output_path)
-            results[package_name] = {
-                'success': success, 
-                'message': message,
-                'output_path': output_path
-            }
-        return results
\ No newline at end of file
+            raise_if_cancelled()
+            remote_paths = self.get_package_apk_paths(device_id, app['package_name'])
+            if not remote_paths and app.get('apk_path'):
+                remote_paths = [app['apk_path']]
+            if remote_paths:
+                plans.append((app, remote_paths))
+            else:
+                results[app['package_name']] = self._extract_result(
+                    False, f"No se encontraron los APKs de {app.get('name') or app['package_name']}."
+                )
+
+        sizes, digests = self._get_remote_file_info(device_id, [path for _, paths in plans for path in paths])
+        progress_lock = threading.Lock()
+
+        def on_bytes(size):
+            with progress_lock:
+                progress.advance(size)
+
+        token = current_cancel_token()
+
+        def pull(remote_path, local_path):
+            # Los hilos del pool no heredan el token de la operación
+            with cancel_scope(token):
+                self._pull_file(device_id, remote_path, local_path, sizes.get(remote_path, 0), on_bytes)
+
+        os.makedirs(output_dir, exist_ok=True)
+        pool = ThreadPoolExecutor(max_workers=max(1, max_parallel), thread_name_prefix=f"extract-{device_id}")
+        pending = []
+        try:
+            # Los APKs que ya están en la biblioteca local no se descargan
+            for app, remote_paths in plans:
+                work_dir = tempfile.mkdtemp(prefix=f".{app['package_name']}-", dir=output_dir)
+                to_pull = [
+                    remote_path for remote_path in remote_paths
+                    if not (digests.get(remote_path) and self.apk_library.materialize(
+                        digests[remote_path], os.path.join(work_dir, os.path.basename(remote_path))
+                    ))
+                ]
+                pending.append([app, remote_paths, work_dir, to_pull])
+            progress = TransferProgress(
+                sum(sizes.get(path, 0) for _, _, _, to_pull in pending for path in to_pull), progress_callback
+            )
+
+            # Se encolan por aplicación: las primeras terminan antes y se guardan mientras sigue el resto
+            for entry in pending:
+                work_dir, to_pull = entry[2], entry[3]
+                entry.append([
+                    pool.submit(pull, remote_path, os.path.join(work_dir, os.path.basename(remote_path)))
+                    for remote_path in to_pull
+                ])
+
+            for app, remote_paths, work_dir, to_pull, futures in pending:
+                app_label = app.get('name') or app['package_name']
+                try:
+                    for future in futures:
+                        future.result()
+                    for remote_path in to_pull:
+                        self.apk_library.add(
+                            os.path.join(work_dir, os.path.basename(remote_path)), digests.get(remote_path)
+                        )
+                    output_path = self._save_extracted_app(
+                        app['package_name'], work_dir, remote_paths, output_dir, output_format
+                    )
+                    message = f"{len(remote_paths)} APK(s) guardados en: {output_path}"
+                    if len(to_pull) < len(remote_paths):
+                        message += f" ({len(remote_paths) - len(to_pull)} copiados de la biblioteca local)"
+                    results[app['package_name']] = self._extract_result(True, message, output_path)
+                except OperationCancelled:
+                    raise
+                except subprocess.TimeoutExpired:
+                    results[app['package_name']] = self._extract_result(
+                        False, f"No se pudo extraer {app_label} del dispositivo {device_id}: tiempo de espera agotado"
+                    )
+                except (OSError, ADBProtocolError, zipfile.BadZipFile) as e:
+                    results[app['package_name']] = self._extract_result(
+                        False, f"No se pudo extraer {app_label} del dispositivo {device_id}. Error: {e}"
+                    )
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+            for entry in pending:
+                shutil.rmtree(entry[2], ignore_errors=True)
+        return results
+
+    @staticmethod
+    def _extract_result(success, message, output_path=None):
+        return {'success': success, 'message': message, 'output_path': output_path}
+
+    def _get_remote_file_info(self, device_id, remote_paths):
+        """
+        Tamaño y sha256 (calculado en el dispositivo) de cada archivo remoto, con
+        una llamada por bloque de rutas.
+
+        Returns:
+            tuple: ({ruta: tamaño}, {ruta: sha256}); faltan las rutas que no se pudieron leer
+        """
+        sizes, digests = {}, {}
+        for start in range(0, len(remote_paths), STAT_BATCH_SIZE):
+            paths = ' '.join(remote_paths[start:start + STAT_BATCH_SIZE])
+            result = self.execute_adb_command(
+                device_id,
+                ["shell", f"stat -c '%s %n' {paths} 2>/dev/null; sha256sum {paths} 2>/dev/null"],
+                timeout=60
+            )
+            for line in result.get('stdout', '').splitlines():
+                value, _, path = line.strip().partition(' ')
+                path = path.strip()
+                if len(value) == 64 and all(char in '0123456789abcdef' for char in value):
+                    digests[path] = value
+                elif value.isdigit():
+                    sizes[path] = int(value)
+        return sizes, digests
+
+    def _pull_file(self, device_id, remote_path, local_path, size, on_bytes):
+        """Descarga un archivo (conexión sync: propia por socket o 'adb pull') informando de los bytes"""
+        if self.adb_manager.get_backend() == ADBBackend.SOCKET:
+            transferred = [0]
+
+            def on_transferred(total):
+                on_bytes(total - transferred[0])
+                transferred[0] = total
+            try:
+                self.adb_manager.socket_client.pull_concurrent(device_id, remote_path, local_path, on_transferred)
+                return
+            except ConnectionRefusedError:
+                print_in_debug_mode("Servidor ADB no disponible por socket, usando el binario")
+
+        adb_path = self.adb_manager.get_adb_path()
+        completed = run_cancellable(
+            [adb_path, "-s", device_id, "pull", remote_path, local_path],
+            timeout=estimate_transfer_timeout(size)
+        )
+        if completed.returncode != 0:
+            raise ADBProtocolError(completed.stderr.strip() or completed.stdout.strip() or "adb pull falló")
+        # 'adb pull' no informa del avance fuera de una terminal: se cuenta al terminar
+        on_bytes(size or os.path.getsize(local_path))
+
+    def _save_extracted_app(self, package_name, work_dir, remote_paths, output_dir, output_format):
+        """Mueve los APKs descargados a su destino final y devuelve su ruta"""
+        local_paths = [os.path.join(work_dir, os.path.basename(path)) for path in remote_paths]
+        if len(local_paths) == 1:
+            output_path = os.path.join(output_dir, f"{package_name}.apk")
+            os.replace(local_paths[0], output_path)
+            return output_path
+
+        if output_format == ExtractFormat.APKS:
+            output_path = os.path.join(output_dir, f"{package_name}.apks")
+            partial_path = output_path + ".part"
+            # Los APKs ya están comprimidos: se guardan sin volver a comprimir
+            with zipfile.ZipFile(partial_path, "w", zipfile.ZIP_STORED) as archive:
+                for local_path in local_paths:
+                    archive.write(local_path, os.path.basename(local_path))
+            os.replace(partial_path, output_path)
+            return output_path
+
+        # Carpeta con base.apk y split_*.apk: se instala de nuevo seleccionando sus archivos
+        output_path = os.path.join(output_dir, package_name)
+        if os.path.isdir(output_path):
+            shutil.rmtree(output_path)
+        os.makedirs(output_path)
+        for local_path in local_paths:
+            os.replace(local_path, os.path.join(output_path, os.path.basename(local_path)))
+        return output_path
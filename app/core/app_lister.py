@@ -3,6 +3,12 @@ from .base_app_manager import BaseAppManager
 from app.utils.print_in_debug_mode import print_in_debug_mode
 from app.utils.helpers import get_subprocess_kwargs
 from app.core.mocks.mock_app_manager import MockAppManager
+from app.core.package_dump_parser import build_package_index
+from app.core.inventory_store import InventoryStore, compute_delta, filter_apps_by_type
+
+# Con más paquetes cambiados que este límite se pide el volcado completo
+# en lugar de un 'dumpsys package <paquete>' por cada uno
+PER_PACKAGE_REVALIDATION_LIMIT = 25
 
 class AppLister(BaseAppManager):
     """Clase especializada en listar aplicaciones instaladas"""
@@ -11,9 +17,15 @@ class AppLister(BaseAppManager):
         self.use_mock = use_mock
         self.kwargs = get_subprocess_kwargs()
         self._mock_manager = MockAppManager() if use_mock else None
+        self.inventory_store = InventoryStore()
+        self._fingerprints = {}
     
     def is_device_connected(self, device_id):
         """Verifica si el dispositivo está conectado y disponible"""
+        online = self.adb_manager.is_device_online(device_id)
+        if online is not None:
+            return online
+
         try:
             adb_path = self.adb_manager.get_adb_path()
             
@@ -65,20 +77,10 @@ class AppLister(BaseAppManager):
             }
         
         try:
-            # Determinar comando según tipo
-            if app_type == "all":
-                cmd_args = ["shell", "pm", "list", "packages", "-f"]
-            elif app_type == "user":
-                cmd_args = ["shell", "pm", "list", "packages", "-f", "-3"]
-            elif app_type == "system":
-                cmd_args = ["shell", "pm", "list", "packages", "-f", "-s"]
-            else:
-                cmd_args = ["shell", "pm", "list", "packages", "-f"]
-            
-            result = self.execute_adb_command(device_id, cmd_args)
-            
-            if not result['success']:
-                error_msg = f"Error en comando ADB: {result.get('error')}"
+            fingerprint = self.get_build_fingerprint(device_id)
+            inventory, delta = self.revalidate_inventory(device_id, fingerprint)
+            if inventory is None:
+                error_msg = "Error en comando ADB: no se pudo obtener la lista de paquetes"
                 print_in_debug_mode(error_msg)
                 return {
                     'success': False,
@@ -87,37 +89,17 @@ class AppLister(BaseAppManager):
                         'apps': []
                     }
                 }
-            
-            apps = []
-            lines = result['stdout'].strip().split('\n')
-            print_in_debug_mode(f"Se encontraron {len(lines)} líneas en la salida")
-            
-            for line in lines:
-                if line.startswith('package:'):
-                    line_clean = line.replace('package:', '')
-                    last_equal_index = line_clean.rfind('=')
-                    
-                    if last_equal_index != -1:
-                        apk_path = line_clean[:last_equal_index]
-                        package_name = line_clean[last_equal_index + 1:]
-
-                        print_in_debug_mode(f"Procesando paquete: {package_name}, ruta: {apk_path}")
-
-                        app_info = self.get_app_info(device_id, package_name, apk_path)
-                        if app_info:
-                            apps.append(app_info)
-                    else:
-                        print_in_debug_mode(f"Línea sin '=': {line}")
-            
+
+            apps = self._sorted_apps(inventory, app_type)
             print_in_debug_mode(f"Se procesaron {len(apps)} aplicaciones correctamente")
-            apps.sort(key=lambda x: x['name'].lower())
             
             success_msg = f"Se obtuvieron {len(apps)} aplicaciones tipo '{app_type}' correctamente"
             return {
                 'success': True,
                 'message': success_msg,
                 'data': {
-                    'apps': apps
+                    'apps': apps,
+                    'delta': delta
                 }
             }
             
@@ -131,14 +113,202 @@ class AppLister(BaseAppManager):
                     'apps': []
                 }
             }
+
+    @staticmethod
+    def _sorted_apps(inventory, app_type):
+        apps = filter_apps_by_type(inventory.values(), app_type)
+        apps.sort(key=lambda x: x['name'].lower())
+        return apps
+
+    def get_cached_apps(self, device_id, app_type="all"):
+        """
+        Devuelve el inventario guardado en disco para mostrarlo al instante.
+
+        Returns:
+            dict | None: Mismo formato que get_installed_apps_by_type, o None si no hay
+            caché válida para el serial y la huella de compilación actuales.
+        """
+        if self.use_mock:
+            return None
+
+        fingerprint = self.get_build_fingerprint(device_id)
+        if not fingerprint:
+            return None
+
+        inventory = self.inventory_store.load(device_id, fingerprint)
+        if inventory is None:
+            return None
+
+        apps = self._sorted_apps(inventory, app_type)
+        return {
+            'success': True,
+            'message': f"Se obtuvieron {len(apps)} aplicaciones tipo '{app_type}' desde la caché",
+            'data': {
+                'apps': apps,
+                'from_cache': True
+            }
+        }
+
+    def get_build_fingerprint(self, device_id):
+        """Huella de compilación del dispositivo (ro.build.fingerprint), en memoria por serial"""
+        if device_id in self._fingerprints:
+            return self._fingerprints[device_id]
+
+        result = self.execute_adb_command(device_id, ["shell", "getprop", "ro.build.fingerprint"], timeout=10)
+        fingerprint = result.get('stdout', '').strip() if result['success'] else ''
+        if fingerprint:
+            self._fingerprints[device_id] = fingerprint
+        return fingerprint or None
+
+    def list_package_paths(self, device_id):
+        """
+        Lista todos los paquetes con su ruta y, si el sistema lo soporta, su versionCode.
+
+        Returns:
+            dict | None: {package_name: (apk_path, version_code | None)}
+        """
+        result = self.execute_adb_command(device_id, ["shell", "pm", "list", "packages", "-f", "--show-versioncode"])
+        if not result['success'] or 'versionCode:' not in result.get('stdout', ''):
+            # Android < 9 no conoce --show-versioncode
+            result = self.execute_adb_command(device_id, ["shell", "pm", "list", "packages", "-f"])
+            if not result['success']:
+                print_in_debug_mode(f"Error en comando ADB: {result.get('error') or result.get('stderr')}")
+                return None
+
+        packages = {}
+        lines = result['stdout'].strip().split('\n')
+        print_in_debug_mode(f"Se encontraron {len(lines)} líneas en la salida")
+        for line in lines:
+            line = line.strip()
+            if not line.startswith('package:'):
+                continue
+
+            line_clean = line.replace('package:', '', 1)
+            version_code = None
+            if ' versionCode:' in line_clean:
+                line_clean, _, version_code = line_clean.rpartition(' versionCode:')
+                version_code = version_code.strip()
+
+            last_equal_index = line_clean.rfind('=')
+            if last_equal_index == -1:
+                print_in_debug_mode(f"Línea sin '=': {line}")
+                continue
+            packages[line_clean[last_equal_index + 1:]] = (line_clean[:last_equal_index], version_code)
+        return packages
+
+    def revalidate_inventory(self, device_id, fingerprint):
+        """
+        Compara la lista de paquetes del dispositivo con el inventario guardado y
+        consulta solo los paquetes añadidos o actualizados (versionCode o ruta distinta).
+
+        Returns:
+            tuple: (inventario {package_name: app} | None, delta)
+        """
+        listing = self.list_package_paths(device_id)
+        if listing is None:
+            return None, None
+
+        cached = self.inventory_store.load(device_id, fingerprint) if fingerprint else None
+        has_version_codes = all(version_code is not None for _, version_code in listing.values())
+
+        if cached is not None and has_version_codes:
+            stale = [
+                package for package, (apk_path, version_code) in listing.items()
+                if package not in cached
+                or cached[package]['apk_path'] != apk_path
+                or cached[package]['version_code'] != version_code
+            ]
+        else:
+            stale = list(listing)
+
+        if not stale:
+            records = {}
+        elif cached is not None and len(stale) <= PER_PACKAGE_REVALIDATION_LIMIT:
+            records = self.get_package_records(device_id, stale)
+        else:
+            # Un único volcado con la información de todos los paquetes
+            records = self.get_package_inventory(device_id)
+
+        inventory = {}
+        for package_name, (apk_path, version_code) in listing.items():
+            if package_name not in stale:
+                inventory[package_name] = cached[package_name]
+                continue
+
+            print_in_debug_mode(f"Procesando paquete: {package_name}, ruta: {apk_path}")
+            record = records.get(package_name)
+            if record:
+                app_info = self.build_app_info(package_name, apk_path, record)
+            else:
+                # Fallback: el paquete no apareció en el volcado masivo
+                app_info = self.get_app_info(device_id, package_name, apk_path)
+                app_info.setdefault('version_code', version_code)
+                app_info.setdefault('is_system', not apk_path.startswith('/data/'))
+            inventory[package_name] = app_info
+
+        delta = compute_delta(cached or {}, inventory)
+        print_in_debug_mode(
+            f"Inventario de {device_id}: {len(delta['added'])} añadidos, "
+            f"{len(delta['removed'])} eliminados, {len(delta['changed'])} actualizados"
+        )
+
+        if fingerprint:
+            if cached is None:
+                self.inventory_store.save(device_id, fingerprint, inventory)
+            elif any(delta.values()):
+                self.inventory_store.apply_delta(device_id, fingerprint, delta)
+
+        return inventory, delta
+
+    def get_package_records(self, device_id, package_names):
+        """Obtiene el registro de dumpsys de unos pocos paquetes, uno por consulta"""
+        records = {}
+        for package_name in package_names:
+            result = self.execute_adb_command(device_id, ["shell", "dumpsys", "package", package_name], timeout=10)
+            if result['success']:
+                record = build_package_index(result['stdout'].splitlines()).get(package_name)
+                if record:
+                    records[package_name] = record
+        return records
     
     def get_installed_apps(self, device_id, include_system=False):
         """Método legacy - mantener para compatibilidad"""
         app_type = "all" if include_system else "user"
         return self.get_installed_apps_by_type(device_id, app_type)
     
+    def get_package_inventory(self, device_id):
+        """Obtiene en una sola llamada los datos de todos los paquetes del dispositivo"""
+        result = self.execute_adb_command(
+            device_id,
+            ["shell", "dumpsys", "package", "packages"],
+            timeout=60
+        )
+
+        if not result['success']:
+            print_in_debug_mode(f"No se pudo obtener el inventario de paquetes: {result.get('error') or result.get('stderr')}")
+            return {}
+
+        inventory = build_package_index(result['stdout'].splitlines())
+        print_in_debug_mode(f"Inventario de paquetes: {len(inventory)} registros")
+        return inventory
+
+    def build_app_info(self, package_name, apk_path, record):
+        """Construye la información de una aplicación a partir de su registro del inventario"""
+        return {
+            'package_name': package_name,
+            'name': self.extract_app_name_from_package(package_name),
+            'version': record.get('version_name') or "Desconocida",
+            'version_code': record.get('version_code'),
+            'apk_path': apk_path,
+            'code_path': record.get('code_path'),
+            'splits': record.get('splits', []),
+            'is_system': 'SYSTEM' in record.get('flags', []),
+            'first_install_time': record.get('first_install_time'),
+            'last_update_time': record.get('last_update_time'),
+        }
+
     def get_app_info(self, device_id, package_name, apk_path):
-        """Obtiene información detallada de una aplicación"""
+        """Obtiene información detallada de una aplicación (fallback, una llamada por paquete)"""
         print_in_debug_mode(f"Obteniendo información para: {package_name}")
         
         try:
@@ -10,3 +10,11 @@ class AppManager(AppLister, AppUninstaller, AppExtractor):
         AppLister.__init__(self, adb_manager)
         AppUninstaller.__init__(self, adb_manager)
         AppExtractor.__init__(self, adb_manager)
+
+    def uninstall_app(self, device_id, package_name, app_name):
+        """Desinstala una aplicación y la quita del inventario guardado del dispositivo"""
+        success, message = AppUninstaller.uninstall_app(self, device_id, package_name, app_name)
+        if success:
+            # Así la lista guardada que se muestra al recargar ya no la incluye
+            self.inventory_store.remove_package(device_id, package_name)
+        return success, message
@@ -0,0 +1,372 @@
+import bisect
+import functools
+import math
+import re
+import threading
+import unicodedata
+
+# Campos en los que se busca y el peso de una coincidencia en cada uno
+SEARCH_FIELDS = (('name', 1.0), ('package_name', 0.8), ('version', 0.5))
+# Fracción mínima de trigramas de la palabra buscada que debe tener un campo
+# para contar como coincidencia aproximada (tolera una letra cambiada o de más)
+FUZZY_MIN_SIMILARITY = 0.5
+# Fracción mínima para considerar siquiera una aplicación (y comprobar sus palabras)
+CANDIDATE_MIN_SIMILARITY = 0.25
+
+# Puntuación de cada tipo de coincidencia (antes de aplicar el peso del campo)
+_EXACT_SCORE = 100
+_PREFIX_SCORE = 80
+_WORD_PREFIX_SCORE = 65
+_SUBSTRING_SCORE = 50
+_FUZZY_SCORE = 40
+
+# Campos (los primeros de SEARCH_FIELDS) con índice de prefijos
+_PREFIX_FIELDS = 2
+# Con más de 1/REBUILD_FRACTION de aplicaciones cambiadas, sync() reconstruye el índice
+REBUILD_FRACTION = 4
+
+_WEIGHTS = tuple(weight for _, weight in SEARCH_FIELDS)
+_WORD_SEPARATORS = re.compile(r'[\s._\-:/]+')
+# Errores de escritura tolerados según la longitud de la palabra buscada
+_MAX_TYPOS = ((8, 2), (4, 1))
+# Con más tramos que estos, aplicar un ViewDiff cuesta más que reiniciar la vista
+MAX_DIFF_RANGES = 64
+
+
+def normalize_text(text):
+    """Minúsculas y sin acentos ('Cámara' -> 'camara'), para comparar sin distinguirlos"""
+    decomposed = unicodedata.normalize('NFKD', str(text or ''))
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).lower().strip()
+
+
+def trigrams(text):
+    """Trigramas de un texto ya normalizado; los de menos de tres letras son su propio trigrama"""
+    if len(text) < 3:
+        return {text} if text else set()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def typo_distance(a, b, limit):
+    """
+    Distancia de edición entre a y b contando como un solo error el intercambio de
+    dos letras vecinas. Devuelve limit + 1 en cuanto se sabe que la supera.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous_row, row = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(row[j] + 1, current[j - 1] + 1, row[j - 1] + cost)
+            if (previous_row is not None and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                current[j] = min(current[j], previous_row[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous_row, row = row, current
+    return row[-1]
+
+
+def _locked(method):
+    """Ejecuta el método con el cerrojo del índice"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class _IndexedApp:
+    __slots__ = ('app', 'fields', 'words', 'word_starts', 'grams', 'prefix_keys')
+
+    def __init__(self, app):
+        self.app = app
+        self.fields = [normalize_text(app.get(field)) for field, _ in SEARCH_FIELDS]
+        self.words = [[word for word in _WORD_SEPARATORS.split(value) if word] for value in self.fields]
+        # Posiciones donde empieza cada palabra ('com.whatsapp' -> 0 y 4)
+        self.word_starts = [
+            {0} | {match.end() for match in _WORD_SEPARATORS.finditer(value)} for value in self.fields
+        ]
+        self.grams = [trigrams(value) for value in self.fields]
+        package_name = app['package_name']
+        # Claves del índice de prefijos: (texto desde el inicio de una palabra, ¿es el campo entero?, paquete)
+        self.prefix_keys = [
+            [(value[start:], start == 0, package_name) for start in sorted(starts) if start < len(value)]
+            for value, starts in zip(self.fields[:_PREFIX_FIELDS], self.word_starts)
+        ]
+
+
+class AppSearchIndex:
+    """
+    Índice de búsqueda de las aplicaciones de un dispositivo.
+
+    Los textos de cada aplicación (nombre, paquete y versión) se normalizan una
+    sola vez al indexarla. Las coincidencias al inicio del nombre o del paquete
+    (o de una de sus palabras) se buscan por bisección en listas ordenadas y el
+    resto de candidatas sale de un índice invertido de trigramas, de modo que una
+    búsqueda no recorre todo el inventario. Los resultados se ordenan por
+    relevancia (coincidencia exacta, al inicio, al inicio de una palabra, en
+    medio o aproximada) y toleran errores de escritura.
+
+    sync() actualiza solo las aplicaciones añadidas, cambiadas o eliminadas. Se
+    puede buscar desde un hilo mientras otro actualiza el índice.
+    """
+
+    def __init__(self):
+        self._apps = {}      # package_name -> _IndexedApp
+        self._postings = {}  # trigrama -> {package_name}
+        self._prefixes = [[] for _ in range(_PREFIX_FIELDS)]  # claves ordenadas por campo
+        self._tiebreak = {}  # package_name -> (longitud del nombre, package_name)
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._apps)
+
+    def __contains__(self, package_name):
+        return package_name in self._apps
+
+    @_locked
+    def sync(self, apps):
+        """Deja en el índice exactamente las aplicaciones de apps, reindexando solo las que cambiaron"""
+        current = {app['package_name']: app for app in apps}
+        removed = [name for name in self._apps if name not in current]
+        changed = []
+        for package_name, app in current.items():
+            indexed = self._apps.get(package_name)
+            if indexed is None or any(indexed.app.get(field) != app.get(field) for field, _ in SEARCH_FIELDS):
+                changed.append(app)
+            else:
+                indexed.app = app
+
+        if len(removed) + len(changed) > max(len(self._apps), len(current)) // REBUILD_FRACTION:
+            # Con muchos cambios (o en la primera carga) es más rápido ordenar todo de una vez
+            self._rebuild(current.values())
+            return
+        for package_name in removed:
+            self.remove(package_name)
+        for app in changed:
+            self.add(app)
+
+    @_locked
+    def add(self, app):
+        """Indexa una aplicación (si ya estaba, la reemplaza)"""
+        self.remove(app['package_name'])
+        indexed = self._index(app)
+        for keys, prefixes in zip(indexed.prefix_keys, self._prefixes):
+            for key in keys:
+                bisect.insort(prefixes, key)
+
+    @_locked
+    def remove(self, package_name):
+        indexed = self._apps.pop(package_name, None)
+        if indexed is None:
+            return
+        del self._tiebreak[package_name]
+        for gram in set().union(*indexed.grams):
+            postings = self._postings.get(gram)
+            if postings is not None:
+                postings.discard(package_name)
+                if not postings:
+                    del self._postings[gram]
+        for keys, prefixes in zip(indexed.prefix_keys, self._prefixes):
+            for key in keys:
+                position = bisect.bisect_left(prefixes, key)
+                if position < len(prefixes) and prefixes[position] == key:
+                    del prefixes[position]
+
+    @_locked
+    def clear(self):
+        self._apps.clear()
+        self._postings.clear()
+        self._tiebreak.clear()
+        self._prefixes = [[] for _ in range(_PREFIX_FIELDS)]
+
+    def _index(self, app):
+        indexed = _IndexedApp(app)
+        self._apps[app['package_name']] = indexed
+        self._tiebreak[app['package_name']] = (len(indexed.fields[0]), app['package_name'])
+        for gram in set().union(*indexed.grams):
+            self._postings.setdefault(gram, set()).add(app['package_name'])
+        return indexed
+
+    def _rebuild(self, apps):
+        self.clear()
+        for app in apps:
+            indexed = self._index(app)
+            for keys, prefixes in zip(indexed.prefix_keys, self._prefixes):
+                prefixes.extend(keys)
+        for prefixes in self._prefixes:
+            prefixes.sort()
+
+    @_locked
+    def search(self, query, limit=None):
+        """
+        Paquetes que coinciden con query, del más al menos relevante.
+
+        Cada palabra de la búsqueda debe coincidir (exacta o aproximadamente) con
+        algún campo; la puntuación de la aplicación es la suma de la de sus palabras.
+        Con una búsqueda vacía devuelve None (no hay nada que filtrar).
+        """
+        words = normalize_text(query).split()
+        if not words:
+            return None
+
+        scores = None
+        for word in words:
+            word_scores = self._score_word(word, scores)
+            if scores is None:
+                scores = word_scores
+            else:
+                scores = {name: scores[name] + score for name, score in word_scores.items()}
+            if not scores:
+                return []
+
+        # A igual puntuación, primero los nombres más cortos (la ordenación es estable)
+        ranked = sorted(scores, key=self._tiebreak.__getitem__)
+        ranked.sort(key=scores.__getitem__, reverse=True)
+        return ranked[:limit] if limit else ranked
+
+    def _score_word(self, word, restrict_to=None):
+        """{paquete: puntuación} de las aplicaciones en las que coincide una palabra"""
+        scores = self._score_prefixes(word, restrict_to)
+
+        # Las demás coincidencias puntúan menos que cualquiera de prefijo: solo se
+        # comprueban las aplicaciones que aún no coinciden
+        word_grams = trigrams(word)
+        if len(word) < 3:
+            # Palabras de una o dos letras: sin trigramas útiles, se buscan como subcadena
+            candidates = restrict_to if restrict_to is not None else self._apps
+            fuzzy = False
+        else:
+            counts = {}
+            for gram in word_grams:
+                for package_name in self._postings.get(gram, ()):
+                    counts[package_name] = counts.get(package_name, 0) + 1
+            needed = max(1, math.ceil(len(word_grams) * CANDIDATE_MIN_SIMILARITY))
+            candidates = [name for name, count in counts.items() if count >= needed]
+            if restrict_to is not None:
+                candidates = [name for name in candidates if name in restrict_to]
+            fuzzy = True
+
+        close_words = {}  # memoria de _is_close_word durante esta búsqueda
+        for package_name in candidates:
+            if package_name in scores:
+                continue
+            score = self._score_app(self._apps[package_name], word, word_grams, fuzzy, close_words)
+            if score:
+                scores[package_name] = score
+        return scores
+
+    def _score_prefixes(self, word, restrict_to):
+        """Coincidencias al inicio del nombre o del paquete, o de una de sus palabras"""
+        scores = {}
+        for prefixes, weight in zip(self._prefixes, _WEIGHTS):
+            position = bisect.bisect_left(prefixes, (word,))
+            while position < len(prefixes):
+                text, whole, package_name = prefixes[position]
+                if not text.startswith(word):
+                    break
+                position += 1
+                if restrict_to is not None and package_name not in restrict_to:
+                    continue
+                if not whole:
+                    score = _WORD_PREFIX_SCORE
+                elif len(text) == len(word):
+                    score = _EXACT_SCORE
+                else:
+                    score = _PREFIX_SCORE
+                score *= weight
+                if score > scores.get(package_name, 0):
+                    scores[package_name] = score
+        return scores
+
+    @staticmethod
+    def _score_app(indexed, word, word_grams, fuzzy, close_words):
+        """Mejor coincidencia en medio de un campo, aproximada o en la versión"""
+        best = 0
+        for position, value in enumerate(indexed.fields):
+            weight = _WEIGHTS[position]
+            found = value.find(word)
+            if found >= 0:
+                if any(value.startswith(word, start) for start in indexed.word_starts[position]):
+                    score = _EXACT_SCORE if value == word else _PREFIX_SCORE if found == 0 else _WORD_PREFIX_SCORE
+                else:
+                    score = _SUBSTRING_SCORE
+            elif fuzzy:
+                similarity = len(word_grams & indexed.grams[position]) / len(word_grams)
+                if similarity >= FUZZY_MIN_SIMILARITY:
+                    score = _FUZZY_SCORE * similarity
+                elif similarity and _has_close_word(word, indexed.words[position], close_words):
+                    # Letras intercambiadas ('whtasapp') comparten pocos trigramas
+                    score = _FUZZY_SCORE * FUZZY_MIN_SIMILARITY
+                else:
+                    continue
+            else:
+                continue
+            score *= weight
+            if score > best:
+                best = score
+        return best
+
+
+def _has_close_word(word, words, memo):
+    """True si alguna de las palabras empieza por word con pocos errores de escritura"""
+    limit = next((typos for length, typos in _MAX_TYPOS if len(word) >= length), 0)
+    if not limit:
+        return False
+    for candidate in words:
+        prefix = candidate[:len(word)]
+        if prefix not in memo:
+            memo[prefix] = typo_distance(word, prefix, limit) <= limit
+        if memo[prefix]:
+            return True
+    return False
+
+
+class ViewDiff:
+    """
+    Cambios para pasar de las filas visibles 'old' a 'new' (índices de las
+    aplicaciones en el modelo), en tramos contiguos:
+
+    - removed: [(inicio, cantidad)] en posiciones de old; se aplican de atrás hacia delante.
+    - kept: orden de las filas que siguen visibles, o None si no cambia.
+    - inserted: [(inicio, filas)] en posiciones de new; se aplican de delante hacia atrás.
+    - reset: True si hay tantos tramos que es mejor reemplazar la vista entera.
+    """
+
+    __slots__ = ('rows', 'removed', 'kept', 'inserted', 'reset')
+
+    def __init__(self, rows, removed, kept, inserted, reset):
+        self.rows = rows
+        self.removed = removed
+        self.kept = kept
+        self.inserted = inserted
+        self.reset = reset
+
+    def is_empty(self):
+        return not (self.removed or self.kept is not None or self.inserted or self.reset)
+
+
+def diff_view_rows(old, new):
+    """ViewDiff entre dos listas de filas visibles (sin repetidos)"""
+    old_set, new_set = set(old), set(new)
+    removed = _ranges(position for position, row in enumerate(old) if row not in new_set)
+    inserted = [
+        (start, new[start:start + count])
+        for start, count in _ranges(position for position, row in enumerate(new) if row not in old_set)
+    ]
+    kept_old = [row for row in old if row in new_set]
+    kept_new = [row for row in new if row in old_set]
+    kept = kept_new if kept_old != kept_new else None
+    return ViewDiff(list(new), removed, kept, inserted, len(removed) + len(inserted) > MAX_DIFF_RANGES)
+
+
+def _ranges(positions):
+    """Agrupa posiciones crecientes en tramos [(inicio, cantidad)]"""
+    ranges = []
+    for position in positions:
+        if ranges and ranges[-1][0] + ranges[-1][1] == position:
+            ranges[-1] = (ranges[-1][0], ranges[-1][1] + 1)
+        else:
+            ranges.append((position, 1))
+    return ranges
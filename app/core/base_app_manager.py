@@ -1,7 +1,7 @@
 import subprocess
 from .adb_manager import ADBManager
 from app.utils.print_in_debug_mode import print_in_debug_mode
-from app.utils.helpers import get_subprocess_kwargs
+from app.core.process_runner import OperationCancelled, run_cancellable
 
 class BaseAppManager:
     def __init__(self, adb_manager: ADBManager):
@@ -28,12 +28,16 @@ class BaseAppManager:
     def execute_adb_command(self, device_id, command_args, timeout=30):
         """Ejecuta comandos ADB de forma segura"""
         try:
+            # Sesión de shell persistente o cliente de socket, sin lanzar procesos
+            result = self.adb_manager.execute_without_process(device_id, command_args, timeout)
+            if result is not None:
+                return result
+
             adb_path = self.adb_manager.get_adb_path()
             cmd = [adb_path, "-s", device_id] + command_args
             
             print_in_debug_mode(f"Ejecutando: {' '.join(cmd)}")
-            kwargs = get_subprocess_kwargs(timeout=timeout)
-            result = subprocess.run(cmd, **kwargs)
+            result = run_cancellable(cmd, timeout=timeout)
             
             print_in_debug_mode(f"Return code: {result.returncode}")
             print_in_debug_mode(f"STDOUT: {result.stdout}")
@@ -50,6 +54,9 @@ class BaseAppManager:
             error_msg = "Tiempo de espera agotado"
             print_in_debug_mode(error_msg)
             return {'success': False, 'error': error_msg}
+        except OperationCancelled as e:
+            print_in_debug_mode(str(e))
+            return {'success': False, 'error': str(e), 'cancelled': True}
         except Exception as e:
             error_msg = f"Error inesperado: {str(e)}"
             print_in_debug_mode(error_msg)
@@ -1,27 +1,61 @@
 import json
+import os
+import threading
+import time
 from pathlib import Path
-from app.constants.config import CONFIG_DIR_NAME, APP_DISPLAY_NAME, CONFIG_FILE_NAME
+from app.constants.config import (CONFIG_DIR_NAME, APP_DISPLAY_NAME, CONFIG_FILE_NAME,
+                                  CONFIG_RELOAD_INTERVAL, CONFIG_SAVE_DELAY)
+from app.constants.enums import ADBBackend
 from app.utils.print_in_debug_mode import print_in_debug_mode
 
 class ConfigManager:
+    """
+    Configuración de la aplicación (config.json).
 
-    def __init__(self):
-        self.config_dir = Path.home() / CONFIG_DIR_NAME
+    Se lee una vez y se sirve desde memoria: los getters no tocan el disco salvo
+    para comprobar, como mucho cada CONFIG_RELOAD_INTERVAL segundos, si el archivo
+    se modificó desde fuera. Los cambios se aplican en memoria al momento y se
+    escriben juntos CONFIG_SAVE_DELAY segundos después, de forma atómica.
+    """
+
+    def __init__(self, config_dir=None, load=True):
+        self.config_dir = Path(config_dir) if config_dir else Path.home() / CONFIG_DIR_NAME
         self.config_file = self.config_dir / CONFIG_FILE_NAME
         self.default_config = {
             "_comment": f"Configuracion basica de {APP_DISPLAY_NAME}",
-            "adb_path": ""
+            "adb_path": "",
+            "adb_backend": ADBBackend.PROCESS.value,
+            "install_device_cache": True
         }
-        self.ensure_config()
-    
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()  # Una escritura del archivo a la vez
+        self._config = self.default_config.copy()
+        self._file_stamp = None   # (mtime_ns, tamaño) de config.json al leerlo o escribirlo
+        self._checked_at = 0.0    # Última comprobación de cambios externos
+        self._pending = {}        # Cambios aún no escritos en el archivo
+        self._save_timer = None
+        self._loaded = False
+        # Con load=False el archivo se lee en load() (p. ej. en segundo plano al arrancar)
+        if load:
+            self.load()
+
+    def load(self):
+        """Lee (o crea) config.json. Si aún no se hizo, lo hace el primer getter"""
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            self.ensure_config()
+            self._reload()
+
     def ensure_config(self):
         """Asegura que el directorio de configuración y archivo existan"""
         try:
             self.config_dir.mkdir(exist_ok=True)
-            
+
             if not self.config_file.exists():
                 self.save_config(self.default_config)
-                
+
         except Exception as e:
             print_in_debug_mode(f"Error asegurando configuración: {e}")
             try:
@@ -29,45 +63,150 @@ class ConfigManager:
                 self.save_config(self.default_config)
             except Exception as final_error:
                 print_in_debug_mode(f"Error crítico recreando configuración: {final_error}")
-    
+
     def load_config(self):
-        """Carga la configuración desde el archivo"""
-        try:
-            self.ensure_config()
-            
-            with open(self.config_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-                
-        except (json.JSONDecodeError, FileNotFoundError, PermissionError) as e:
-            print_in_debug_mode(f"Error cargando configuración: {e}")
-            self.save_config(self.default_config)
-            return self.default_config.copy()
-        except Exception as e:
-            print_in_debug_mode(f"Error inesperado cargando configuración: {e}")
-            return self.default_config.copy()
-    
+        """Devuelve una copia de la configuración actual"""
+        return dict(self._snapshot())
+
     def save_config(self, config):
-        """Guarda la configuración en el archivo"""
+        """Reemplaza la configuración y la guarda en el archivo al momento"""
+        with self._lock:
+            self._config = {**self.default_config, **config}
+            self._pending.clear()
+            self._loaded = True
+        return self.flush(force=True)
+
+    def flush(self, force=False):
+        """
+        Escribe los cambios pendientes (o toda la configuración si force es True).
+        Se llama al cerrar la aplicación para no perder los últimos cambios.
+        """
+        with self._lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            if not self._pending and not force:
+                return True
+            pending = dict(self._pending)
+            self._pending.clear()
+
+        with self._write_lock:
+            with self._lock:
+                config = dict(self._config)
+            saved = self._write(config)
+            with self._lock:
+                if saved:
+                    self._file_stamp = self._stat()
+                else:
+                    # Se reintentará con el siguiente cambio o al cerrar
+                    self._pending = {**pending, **self._pending}
+        return saved
+
+    def _write(self, config):
+        """Escribe el archivo de forma atómica (nunca queda a medio escribir)"""
+        partial = self.config_file.with_name(f"{self.config_file.name}.{os.getpid()}.tmp")
         try:
-            self.config_dir.mkdir(exist_ok=True)
-            
-            with open(self.config_file, 'w', encoding='utf-8') as f:
+            self.config_dir.mkdir(parents=True, exist_ok=True)
+            with open(partial, 'w', encoding='utf-8') as f:
                 json.dump(config, f, indent=4, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(partial, self.config_file)
             return True
         except Exception as e:
             print_in_debug_mode(f"Error guardando configuración: {e}")
+            try:
+                partial.unlink(missing_ok=True)
+            except OSError:
+                pass
             return False
-    
+
+    def _set(self, key, value):
+        """Aplica un cambio en memoria y programa su escritura junto con los demás"""
+        with self._lock:
+            self._snapshot()
+            self._config[key] = value
+            self._pending[key] = value
+            self._schedule_save()
+        return True
+
+    def _snapshot(self):
+        """Configuración en memoria, recargada si el archivo cambió desde fuera"""
+        now = time.monotonic()
+        with self._lock:
+            if not self._loaded:
+                self.load()
+            elif now - self._checked_at >= CONFIG_RELOAD_INTERVAL:
+                self._checked_at = now
+                if self._stat() != self._file_stamp:
+                    self._reload()
+            return self._config
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.config_file)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _reload(self):
+        """Lee config.json (los cambios aún no escritos se conservan)"""
+        with self._lock:
+            self._checked_at = time.monotonic()
+            stamp = self._stat()
+            try:
+                with open(self.config_file, 'r', encoding='utf-8') as f:
+                    loaded = json.load(f)
+                if not isinstance(loaded, dict):
+                    raise ValueError("config.json no contiene un objeto")
+            except (json.JSONDecodeError, ValueError, FileNotFoundError, PermissionError) as e:
+                print_in_debug_mode(f"Error cargando configuración: {e}")
+                # Se vuelve a escribir la configuración que se tenía en memoria
+                self._file_stamp = stamp
+                self._pending.update(self._config)
+                self._schedule_save()
+                return
+            except Exception as e:
+                print_in_debug_mode(f"Error inesperado cargando configuración: {e}")
+                self._file_stamp = stamp
+                return
+
+            self._config = {**self.default_config, **loaded, **self._pending}
+            self._file_stamp = stamp
+
+    def _schedule_save(self):
+        """Programa la escritura de los cambios pendientes (una sola para todos)"""
+        if self._save_timer is None:
+            self._save_timer = threading.Timer(CONFIG_SAVE_DELAY, self.flush)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
     def get_adb_path(self):
-        config = self.load_config()
-        return config.get("adb_path", "")
-    
+        return self._snapshot().get("adb_path", "")
+
     def set_adb_path(self, path):
-        """Establece la ruta personalizada de ADB"""
-        config = self.load_config()
-        config["adb_path"] = path
-        return self.save_config(config)
-    
+        """Establece la ruta personalizada de ADB (se guarda al momento)"""
+        self._set("adb_path", path)
+        return self.flush()
+
+    def get_adb_backend(self):
+        """Retorna el backend configurado para comunicarse con ADB"""
+        try:
+            return ADBBackend(self._snapshot().get("adb_backend", ADBBackend.PROCESS.value))
+        except ValueError:
+            return ADBBackend.PROCESS
+
+    def set_adb_backend(self, backend: ADBBackend):
+        """Establece el backend para comunicarse con ADB"""
+        return self._set("adb_backend", backend.value)
+
+    def get_install_device_cache(self):
+        """True si los APKs enviados se conservan en el dispositivo para reinstalarlos sin transferirlos"""
+        return bool(self._snapshot().get("install_device_cache", True))
+
+    def set_install_device_cache(self, enabled):
+        return self._set("install_device_cache", bool(enabled))
+
     def get_local_platform_tools_dir(self):
         """Retorna el directorio local de platform-tools"""
         return self.config_dir / "platform-tools"
\ No newline at end of file
@@ -0,0 +1,124 @@
+import re
+
+# Línea que separa la salida de cada sonda dentro del script
+SECTION_MARKER = "__APPYNEST_SECTION__"
+
+# Sondas que se ejecutan en una sola invocación de 'adb shell'
+DEVICE_INFO_PROBES = (
+    ('getprop', "getprop"),
+    ('wm_size', "wm size"),
+    ('wm_density', "wm density"),
+    ('meminfo', "cat /proc/meminfo"),
+    ('storage', "df /data"),
+)
+
+# Propiedades del volcado de getprop que se copian al diccionario final
+_PROPERTY_FIELDS = {
+    'model': 'ro.product.model',
+    'brand': 'ro.product.brand',
+    'manufacturer': 'ro.product.manufacturer',
+    'android_version': 'ro.build.version.release',
+    'sdk_version': 'ro.build.version.sdk',
+    'cpu_arch': 'ro.product.cpu.abi',
+    'serial_number': 'ro.serialno',
+}
+
+# "[ro.product.model]: [Pixel 7]"
+_GETPROP_LINE = re.compile(r'^\[([^\]]+)\]:\s*\[(.*)\]$')
+_SECTION_LINE = re.compile(rf'^{SECTION_MARKER} (\w+)$')
+
+
+def build_device_info_script():
+    """Construye el script que ejecuta todas las sondas separadas por marcadores"""
+    return '; '.join(
+        f"echo {SECTION_MARKER} {name}; {command}" for name, command in DEVICE_INFO_PROBES
+    )
+
+
+def split_sections(output):
+    """Divide la salida del script en {nombre_sección: texto}"""
+    sections = {}
+    current = None
+    for raw_line in output.splitlines():
+        line = raw_line.rstrip('\r')
+        match = _SECTION_LINE.match(line.strip())
+        if match:
+            current = match.group(1)
+            sections[current] = []
+            continue
+        if current is not None:
+            sections[current].append(line)
+    return {name: '\n'.join(lines) for name, lines in sections.items()}
+
+
+def parse_getprop(output):
+    """Convierte el volcado completo de 'getprop' en un diccionario"""
+    properties = {}
+    for line in output.splitlines():
+        match = _GETPROP_LINE.match(line.strip())
+        if match:
+            properties[match.group(1)] = match.group(2)
+    return properties
+
+
+def _parse_total_ram(output):
+    for line in output.split('\n'):
+        if "MemTotal:" in line:
+            ram_kb = line.split()[1]
+            return f"{int(ram_kb) // 1024} MB"
+    return "Desconocida"
+
+
+def _parse_storage(output):
+    lines = output.strip().split('\n')
+    if len(lines) > 1:
+        storage_parts = lines[1].split()
+        if len(storage_parts) >= 4:
+            return f"{int(storage_parts[1]) // 1024 // 1024} GB"
+    return "Desconocido"
+
+
+def _parse_after_label(output, label, default):
+    output = output.strip()
+    if label in output:
+        # Con un valor forzado aparece además "Override ...": usar solo el físico
+        return output.split(label)[1].strip().split('\n')[0].strip()
+    return default
+
+
+def parse_device_info(output, device_id):
+    """
+    Analiza la salida del script de sondas y devuelve el mismo diccionario
+    que DeviceManager.get_device_info obtenía con una llamada por dato.
+    """
+    sections = split_sections(output)
+    properties = parse_getprop(sections.get('getprop', ''))
+
+    info = {}
+    for field, prop in _PROPERTY_FIELDS.items():
+        info[field] = properties.get(prop, '').strip() or "Desconocido"
+
+    try:
+        total_ram = _parse_total_ram(sections.get('meminfo', ''))
+    except (ValueError, IndexError):
+        total_ram = "Desconocida"
+
+    try:
+        storage = _parse_storage(sections.get('storage', ''))
+    except (ValueError, IndexError):
+        storage = "Desconocido"
+
+    return {
+        'model': info['model'],
+        'brand': info['brand'],
+        'manufacturer': info['manufacturer'],
+        'android_version': info['android_version'],
+        'sdk_version': info['sdk_version'],
+        'resolution': _parse_after_label(sections.get('wm_size', ''), "Physical size:", "Desconocida"),
+        'density': _parse_after_label(sections.get('wm_density', ''), "Physical density:", "Desconocida"),
+        'total_ram': total_ram,
+        'storage': storage,
+        'cpu_arch': info['cpu_arch'],
+        'serial_number': info['serial_number'],
+        'device_id': device_id,
+    }
@@ -1,5 +1,7 @@
 import subprocess
 from .adb_manager import ADBManager
+from .device_info_parser import build_device_info_script, parse_device_info
+from .process_runner import run_cancellable
 from app.utils.print_in_debug_mode import print_in_debug_mode
 from app.utils.helpers import get_subprocess_kwargs
 from app.core.mocks.mock_device_manager import MockDeviceManager
@@ -10,6 +12,23 @@ class DeviceManager:
         self.use_mock = use_mock
         self.kwargs = get_subprocess_kwargs()
         self._mock_manager = MockDeviceManager() if use_mock else None
+
+    def _run_shell(self, device_id, shell_args, timeout=10):
+        """
+        Ejecuta 'adb shell' usando la sesión persistente o el cliente de socket.
+        Si no hay sesión disponible se recurre a un proceso nuevo.
+        Devuelve un CompletedProcess para mantener la misma interfaz que subprocess.run.
+        """
+        result = self.adb_manager.execute_without_process(device_id, ["shell"] + shell_args, timeout)
+        if result is not None and 'returncode' in result:
+            return subprocess.CompletedProcess(
+                shell_args, result['returncode'], result['stdout'], result['stderr']
+            )
+        if result is not None:
+            raise subprocess.TimeoutExpired(shell_args, timeout)
+
+        adb_path = self.adb_manager.get_adb_path()
+        return run_cancellable([adb_path, "-s", device_id, "shell"] + shell_args, timeout=timeout)
         
     def get_connected_devices(self):
         """
@@ -27,6 +46,16 @@ class DeviceManager:
         if self.use_mock:
             return self._mock_manager.get_connected_devices()
         
+        # Con el seguimiento activo la lista ya está en memoria (con la marca en caché)
+        tracker = self.adb_manager.device_tracker
+        if tracker.is_tracking():
+            devices = tracker.get_devices()
+            return {
+                'success': True,
+                'devices': devices,
+                'message': f"Se encontraron {len(devices)} dispositivo(s)" if devices else "No hay dispositivos conectados"
+            }
+
         devices = []
         
         try:
@@ -84,10 +113,7 @@ class DeviceManager:
                 # Obtener marca con getprop
                 brand = "Desconocido"
                 try:
-                    brand_result = subprocess.run(
-                        [adb_path, "-s", device_id, "shell", "getprop", "ro.product.brand"],
-                        **self.kwargs
-                    )
+                    brand_result = self._run_shell(device_id, ["getprop", "ro.product.brand"])
                     if brand_result.returncode == 0 and brand_result.stdout.strip():
                         brand = brand_result.stdout.strip()
                 except Exception as prop_error:
@@ -129,111 +155,13 @@ class DeviceManager:
             return self._mock_manager.get_device_info(device_id)
     
         try:
-            adb_path = self.adb_manager.get_adb_path()
-            
-            model_result = subprocess.run(
-                [adb_path, "-s", device_id, "shell", "getprop", "ro.product.model"],
-                **self.kwargs
-            )
-            
-            brand_result = subprocess.run(
-                [adb_path, "-s", device_id, "shell", "getprop", "ro.product.brand"],
-                **self.kwargs
-            )
-            
-            manufacturer_result = subprocess.run(
-                [adb_path, "-s", device_id, "shell", "getprop", "ro.product.manufacturer"],
-                **self.kwargs
-            )
-            
-            android_version_result = subprocess.run(
-                [adb_path, "-s", device_id, "shell", "getprop", "ro.build.version.release"],
-                **self.kwargs
-            )
-            
-            sdk_version_result = subprocess.run(
-                [adb_path, "-s", device_id, "shell", "getprop", "ro.build.version.sdk"],
-                **self.kwargs
-            )
-            
-            resolution_result = subprocess.run(
-                [adb_path, "-s", device_id, "shell", "wm", "size"],
-                **self.kwargs
-            )
-            
-            density_result = subprocess.run(
-                [adb_path, "-s", device_id, "shell", "wm", "density"],
-                **self.kwargs
-            )
-            
-            memory_result = subprocess.run(
-                [adb_path, "-s", device_id, "shell", "cat", "/proc/meminfo"],
-                **self.kwargs
-            )
-            
-            storage_result = subprocess.run(
-                [adb_path, "-s", device_id, "shell", "df", "/data"],
-                **self.kwargs
-            )
-            
-            cpu_result = subprocess.run(
-                [adb_path, "-s", device_id, "shell", "getprop", "ro.product.cpu.abi"],
-                **self.kwargs
-            )
-            
-            serial_result = subprocess.run(
-                [adb_path, "-s", device_id, "shell", "getprop", "ro.serialno"],
-                **self.kwargs
-            )
-            
-            # Procesar memoria RAM
-            total_ram = "Desconocida"
-            if memory_result.returncode == 0:
-                for line in memory_result.stdout.split('\n'):
-                    if "MemTotal:" in line:
-                        ram_kb = line.split()[1]
-                        ram_mb = int(ram_kb) // 1024
-                        total_ram = f"{ram_mb} MB"
-                        break
-            
-            # Procesar almacenamiento
-            storage_info = "Desconocido"
-            if storage_result.returncode == 0:
-                lines = storage_result.stdout.strip().split('\n')
-                if len(lines) > 1:
-                    storage_parts = lines[1].split()
-                    if len(storage_parts) >= 4:
-                        storage_gb = int(storage_parts[1]) // 1024 // 1024
-                        storage_info = f"{storage_gb} GB"
-            
-            # Procesar resolución
-            resolution = "Desconocida"
-            if resolution_result.returncode == 0:
-                resolution_output = resolution_result.stdout.strip()
-                if "Physical size:" in resolution_output:
-                    resolution = resolution_output.split("Physical size:")[1].strip()
-            
-            # Procesar densidad
-            density = "Desconocida"
-            if density_result.returncode == 0:
-                density_output = density_result.stdout.strip()
-                if "Physical density:" in density_output:
-                    density = density_output.split("Physical density:")[1].strip()
-            
-            return {
-                'model': model_result.stdout.strip() if model_result.returncode == 0 and model_result.stdout.strip() else "Desconocido",
-                'brand': brand_result.stdout.strip() if brand_result.returncode == 0 and brand_result.stdout.strip() else "Desconocido",
-                'manufacturer': manufacturer_result.stdout.strip() if manufacturer_result.returncode == 0 and manufacturer_result.stdout.strip() else "Desconocido",
-                'android_version': android_version_result.stdout.strip() if android_version_result.returncode == 0 and android_version_result.stdout.strip() else "Desconocido",
-                'sdk_version': sdk_version_result.stdout.strip() if sdk_version_result.returncode == 0 and sdk_version_result.stdout.strip() else "Desconocido",
-                'resolution': resolution,
-                'density': density,
-                'total_ram': total_ram,
-                'storage': storage_info,
-                'cpu_arch': cpu_result.stdout.strip() if cpu_result.returncode == 0 and cpu_result.stdout.strip() else "Desconocido",
-                'serial_number': serial_result.stdout.strip() if serial_result.returncode == 0 and serial_result.stdout.strip() else "Desconocido",
-                'device_id': device_id,
-            }
+            # Todas las sondas en una sola invocación de shell, separadas por secciones
+            result = self._run_shell(device_id, [build_device_info_script()], timeout=15)
+            if not result.stdout:
+                print_in_debug_mode(f"Sin salida al consultar {device_id}: {result.stderr}")
+                return {}
+
+            return parse_device_info(result.stdout, device_id)
             
         except Exception as e:
             print_in_debug_mode(f"Error al obtener información del dispositivo: {e}")
@@ -253,6 +181,10 @@ class DeviceManager:
             if self.use_mock:
                 return self._mock_manager.is_device_available(device_id)
     
+            online = self.adb_manager.is_device_online(device_id)
+            if online is not None:
+                return online
+
             try:
                 adb_path = self.adb_manager.get_adb_path()
                 
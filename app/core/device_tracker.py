@@ -0,0 +1,253 @@
+import socket
+import subprocess
+import threading
+from PySide6.QtCore import QThread, Signal
+from app.core.adb_socket_client import ADBSocketClient, ADBProtocolError
+from app.utils.helpers import get_popen_kwargs, get_subprocess_kwargs
+from app.utils.print_in_debug_mode import print_in_debug_mode
+
+# Espera entre reconexiones del stream (segundos)
+RECONNECT_DELAYS = (1, 2, 5, 10)
+
+# Estados en los que el dispositivo acepta comandos
+ONLINE_STATES = ('device',)
+
+
+class DeviceTracker(QThread):
+    """
+    Seguimiento de dispositivos basado en eventos.
+
+    Mantiene abierto un único stream 'host:track-devices-l' contra el servidor ADB
+    (o el proceso 'adb track-devices -l' si no se puede hablar por socket) y una
+    tabla en memoria con estado, modelo y marca de cada dispositivo. Cada cambio
+    se notifica con señales; las comprobaciones de presencia son consultas a la
+    tabla en lugar de procesos.
+    """
+    devices_changed = Signal(list)       # lista de dispositivos en línea
+    device_added = Signal(str)           # serial
+    device_removed = Signal(str)         # serial
+    device_state_changed = Signal(str, str)  # serial, nuevo estado
+
+    def __init__(self, adb_manager):
+        super().__init__()
+        self.adb_manager = adb_manager
+        self._devices = {}
+        self._brand_cache = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._tracking = False
+        self._stream = None  # socket o proceso activo, para poder cerrarlo en stop()
+
+    # ------------------------------------------------------------------
+    # Consultas (seguras desde cualquier hilo)
+    # ------------------------------------------------------------------
+    def is_tracking(self):
+        """True si el stream está abierto y la tabla refleja el estado real"""
+        with self._lock:
+            return self._tracking
+
+    def get_devices(self):
+        """Devuelve los dispositivos en línea con el formato de get_connected_devices"""
+        with self._lock:
+            return [dict(device) for device in self._devices.values() if device['status'] in ONLINE_STATES]
+
+    def get_state(self, device_id):
+        """Estado actual del dispositivo o None si no está en la tabla"""
+        with self._lock:
+            device = self._devices.get(device_id)
+            return device['status'] if device else None
+
+    def is_device_online(self, device_id):
+        """
+        Returns:
+            bool | None: Presencia del dispositivo según la tabla, o None si el
+            seguimiento no está activo y se debe consultar a ADB.
+        """
+        with self._lock:
+            if not self._tracking:
+                return None
+            device = self._devices.get(device_id)
+            return bool(device and device['status'] in ONLINE_STATES)
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+    def start_tracking(self):
+        """Inicia el seguimiento si no está ya en marcha"""
+        if self.isRunning():
+            return
+        self._stop_event.clear()
+        self.start()
+
+    def stop(self):
+        """Detiene el seguimiento y cierra el stream abierto"""
+        self._stop_event.set()
+        self._close_stream()
+
+    def _close_stream(self):
+        stream = self._stream
+        if stream is None:
+            return
+        try:
+            if isinstance(stream, subprocess.Popen):
+                stream.kill()
+            else:
+                # shutdown() desbloquea el recv() pendiente en el hilo del tracker
+                stream.shutdown(socket.SHUT_RDWR)
+                stream.close()
+        except Exception:
+            pass
+
+    def run(self):
+        attempt = 0
+        while not self._stop_event.is_set():
+            received = False
+            for listing in self._open_listing_stream():
+                received = True
+                attempt = 0
+                self._apply_listing(listing)
+                if self._stop_event.is_set():
+                    break
+
+            self._set_tracking(False)
+            if self._stop_event.is_set():
+                break
+
+            delay = RECONNECT_DELAYS[min(attempt, len(RECONNECT_DELAYS) - 1)]
+            attempt = 0 if received else attempt + 1
+            print_in_debug_mode(f"Seguimiento de dispositivos interrumpido, reintentando en {delay}s")
+            self._stop_event.wait(delay)
+
+        self._stream = None
+
+    # ------------------------------------------------------------------
+    # Fuentes del stream
+    # ------------------------------------------------------------------
+    def _open_listing_stream(self):
+        """Genera cada listado completo recibido, por socket o por proceso"""
+        try:
+            sock = self.adb_manager.socket_client.track_devices()
+        except (OSError, ADBProtocolError) as e:
+            print_in_debug_mode(f"track-devices por socket no disponible ({e}), usando el binario")
+            yield from self._process_listings()
+            return
+
+        self._stream = sock
+        try:
+            while not self._stop_event.is_set():
+                yield ADBSocketClient.read_message(sock)
+        except (OSError, ValueError):
+            pass
+        finally:
+            self._stream = None
+            sock.close()
+
+    def _process_listings(self):
+        adb_path = self.adb_manager.get_adb_path()
+        if not adb_path:
+            return
+        try:
+            process = subprocess.Popen(
+                [adb_path, "track-devices", "-l"],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                stdin=subprocess.DEVNULL,
+                bufsize=0,
+                **get_popen_kwargs()
+            )
+        except OSError as e:
+            print_in_debug_mode(f"No se pudo lanzar adb track-devices: {e}")
+            return
+
+        self._stream = process
+        try:
+            while not self._stop_event.is_set():
+                # Misma trama que el socket: longitud en hexadecimal y listado
+                length = int(_read_pipe_exact(process.stdout, 4), 16)
+                yield _read_pipe_exact(process.stdout, length).decode("utf-8", errors="replace")
+        except (OSError, ValueError, EOFError):
+            pass
+        finally:
+            self._stream = None
+            if process.poll() is None:
+                process.kill()
+            process.wait()
+
+    # ------------------------------------------------------------------
+    # Tabla de dispositivos
+    # ------------------------------------------------------------------
+    def _set_tracking(self, tracking):
+        with self._lock:
+            self._tracking = tracking
+            if not tracking:
+                self._devices = {}
+
+    def _apply_listing(self, listing):
+        """Aplica un listado completo a la tabla y emite las señales de los cambios"""
+        new_devices = {}
+        for entry in ADBSocketClient.parse_devices(listing):
+            serial = entry['device']
+            device = {
+                'device': serial,
+                'model': entry.get('model', "Desconocido"),
+                'brand': self._brand_cache.get(serial, "Desconocido"),
+                'status': entry['status'],
+            }
+            if device['status'] in ONLINE_STATES and serial not in self._brand_cache:
+                device['brand'] = self._fetch_brand(serial)
+            new_devices[serial] = device
+
+        with self._lock:
+            old_devices = self._devices
+            self._devices = new_devices
+            was_tracking = self._tracking
+            self._tracking = True
+
+        changed = not was_tracking
+        for serial in old_devices.keys() - new_devices.keys():
+            self.device_removed.emit(serial)
+            changed = True
+        for serial, device in new_devices.items():
+            previous = old_devices.get(serial)
+            if previous is None:
+                self.device_added.emit(serial)
+                changed = True
+            elif previous['status'] != device['status']:
+                self.device_state_changed.emit(serial, device['status'])
+                changed = True
+
+        if changed:
+            self.devices_changed.emit(self.get_devices())
+
+    def _fetch_brand(self, device_id):
+        """Obtiene la marca una sola vez por dispositivo y la guarda en caché"""
+        brand = "Desconocido"
+        try:
+            result = self.adb_manager.execute_without_process(
+                device_id, ["shell", "getprop", "ro.product.brand"], timeout=10
+            )
+            if result is None:
+                adb_path = self.adb_manager.get_adb_path()
+                completed = subprocess.run(
+                    [adb_path, "-s", device_id, "shell", "getprop", "ro.product.brand"],
+                    **get_subprocess_kwargs()
+                )
+                result = {'success': completed.returncode == 0, 'stdout': completed.stdout}
+            if result.get('success') and result.get('stdout', '').strip():
+                brand = result['stdout'].strip()
+                self._brand_cache[device_id] = brand
+        except Exception as e:
+            print_in_debug_mode(f"Error al obtener marca para {device_id}: {e}")
+        return brand
+
+
+
+def _read_pipe_exact(stream, size):
+    """Lee exactamente 'size' bytes de la salida de un proceso"""
+    data = b''
+    while len(data) < size:
+        chunk = stream.read(size - len(data))
+        if not chunk:
+            raise EOFError("adb track-devices terminó")
+        data += chunk
+    return data
@@ -0,0 +1,159 @@
+import queue
+import threading
+from app.constants.config import INSTALL_STAGING_DIR, INSTALL_STAGING_MAX_BYTES
+from app.core.process_runner import OperationCancelled, cancel_scope, current_cancel_token
+from app.utils.print_in_debug_mode import print_in_debug_mode
+
+# Marca de fin de la cola de unidades copiadas
+_DONE = object()
+# Cada cuánto se comprueba si el consumidor se detuvo mientras se espera (segundos)
+_POLL_INTERVAL = 0.2
+
+
+class InstallPipeline:
+    """
+    Instala varias unidades en un dispositivo solapando la transferencia de la
+    siguiente con la confirmación en el gestor de paquetes de la actual.
+
+    Un hilo copia las unidades por orden al directorio de espera del dispositivo
+    (APKInstaller.stage_unit) mientras el hilo que recorre run() instala la ya
+    copiada (APKInstaller.install_staged). La copia no adelanta más de dos unidades
+    (una en cola y otra copiándose) ni ocupa más de max_staged_bytes en el
+    dispositivo; el directorio se borra al terminar, aunque la operación se cancele
+    (los APKs de la caché del dispositivo se conservan, ver stage_unit).
+    """
+
+    def __init__(self, apk_installer, device_id, staging_dir=INSTALL_STAGING_DIR,
+                 max_staged_bytes=INSTALL_STAGING_MAX_BYTES):
+        self.apk_installer = apk_installer
+        self.device_id = device_id
+        self.staging_dir = staging_dir
+        self.max_staged_bytes = max_staged_bytes
+        self._staged = queue.Queue(maxsize=1)
+        self._stopped = threading.Event()
+        self._budget = threading.Condition()
+        self._reserved_bytes = 0
+
+    def run(self, units, progress_factory=None, on_install=None):
+        """
+        Generador que instala las unidades en orden y devuelve (unidad, éxito, mensaje)
+        de cada una en cuanto termina.
+
+        Args:
+            progress_factory: progress_factory(unidad) devuelve el callback de
+                progreso de su transferencia (o None)
+            on_install: on_install(posición, unidad) se llama al empezar a instalarla
+        """
+        progress_factory = progress_factory or (lambda unit: None)
+        if not self.apk_installer.prepare_staging(self.device_id, self.staging_dir):
+            # Sin directorio de espera se instala una tras otra, sin solapar
+            for position, unit in enumerate(units):
+                if on_install:
+                    on_install(position, unit)
+                yield (unit, *self.apk_installer.install_unit(unit, self.device_id, progress_factory(unit)))
+            return
+
+        stager = threading.Thread(
+            target=self._stage_all,
+            args=(list(units), progress_factory, current_cancel_token()),
+            name=f"InstallPipeline-{self.device_id}",
+            daemon=True
+        )
+        stager.start()
+        try:
+            position = 0
+            while True:
+                item = self._staged.get()
+                if item is _DONE:
+                    break
+                unit, files, error, reserved = item
+                if on_install:
+                    on_install(position, unit)
+                yield (unit, *self._install(unit, files, error, reserved, progress_factory))
+                position += 1
+        finally:
+            self._stopped.set()
+            with self._budget:
+                self._budget.notify_all()
+            self._discard_pending()
+            stager.join()
+            self._discard_pending()
+            self.apk_installer.remove_staging(self.device_id, self.staging_dir)
+
+    def _install(self, unit, files, error, reserved, progress_factory):
+        if files is None and error is None:
+            return self.apk_installer.install_unit(unit, self.device_id, progress_factory(unit))
+        if files is None:
+            return False, error
+        try:
+            return self.apk_installer.install_staged(unit, files, self.device_id)
+        finally:
+            self.apk_installer.release_staged(files, self.device_id)
+            self._release(reserved)
+
+    def _stage_all(self, units, progress_factory, token):
+        """Hilo de copia: se ejecuta con el token de la operación para cancelarse con ella"""
+        try:
+            with cancel_scope(token):
+                for unit in units:
+                    if self._stopped.is_set():
+                        return
+                    if not self.apk_installer.can_stage(unit, self.device_id):
+                        self._put((unit, None, None, 0))
+                        continue
+                    reserved = unit.size
+                    if not self._reserve(reserved):
+                        return
+                    files, error = self.apk_installer.stage_unit(
+                        unit, self.device_id, self.staging_dir, progress_factory(unit)
+                    )
+                    if files is None:
+                        self._release(reserved)
+                        reserved = 0
+                    if not self._put((unit, files, error, reserved)) and files is not None:
+                        self.apk_installer.release_staged(files, self.device_id)
+        except OperationCancelled:
+            pass
+        except Exception as e:
+            print_in_debug_mode(f"Error copiando APKs a {self.device_id}: {e}")
+        finally:
+            self._put(_DONE)
+
+    def _put(self, item):
+        """Encola sin bloquear para siempre si el consumidor se detuvo. Devuelve True si se encoló"""
+        while not self._stopped.is_set():
+            try:
+                self._staged.put(item, timeout=_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _discard_pending(self):
+        """Borra las unidades copiadas que ya no se van a instalar"""
+        while True:
+            try:
+                item = self._staged.get_nowait()
+            except queue.Empty:
+                return
+            if item is not _DONE and item[1]:
+                self.apk_installer.release_staged(item[1], self.device_id)
+
+    def _reserve(self, size):
+        """
+        Espera a que haya espacio para copiar 'size' bytes. Una unidad mayor que el
+        límite se copia sola. Devuelve False si el consumidor se detuvo.
+        """
+        with self._budget:
+            while (self._reserved_bytes and self._reserved_bytes + size > self.max_staged_bytes
+                   and not self._stopped.is_set()):
+                self._budget.wait(_POLL_INTERVAL)
+            if self._stopped.is_set():
+                return False
+            self._reserved_bytes += size
+            return True
+
+    def _release(self, size):
+        with self._budget:
+            self._reserved_bytes -= size
+            self._budget.notify_all()
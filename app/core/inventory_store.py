@@ -0,0 +1,204 @@
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from app.constants.config import CONFIG_DIR_NAME, INVENTORY_DB_NAME
+from app.utils.print_in_debug_mode import print_in_debug_mode
+
+# Columnas guardadas por aplicación (mismo formato que AppLister.build_app_info)
+_APP_COLUMNS = (
+    'package_name', 'name', 'version', 'version_code', 'apk_path', 'code_path',
+    'splits', 'is_system', 'first_install_time', 'last_update_time',
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS devices (
+    serial TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS apps (
+    serial TEXT NOT NULL,
+    package_name TEXT NOT NULL,
+    name TEXT,
+    version TEXT,
+    version_code TEXT,
+    apk_path TEXT,
+    code_path TEXT,
+    splits TEXT,
+    is_system INTEGER,
+    first_install_time TEXT,
+    last_update_time TEXT,
+    PRIMARY KEY (serial, package_name)
+);
+"""
+
+
+def filter_apps_by_type(apps, app_type):
+    """Filtra una lista de aplicaciones por tipo ('all', 'user' o 'system')"""
+    if app_type == "user":
+        return [app for app in apps if not app.get('is_system')]
+    if app_type == "system":
+        return [app for app in apps if app.get('is_system')]
+    return list(apps)
+
+
+def compute_delta(old_apps, new_apps):
+    """
+    Compara dos inventarios {package_name: app} a nivel de paquete.
+
+    Returns:
+        dict: {'added': [app], 'removed': [package_name], 'changed': [app]}
+    """
+    added = [app for package, app in new_apps.items() if package not in old_apps]
+    removed = [package for package in old_apps if package not in new_apps]
+    changed = [
+        app for package, app in new_apps.items()
+        if package in old_apps and is_app_changed(old_apps[package], app)
+    ]
+    return {'added': added, 'removed': removed, 'changed': changed}
+
+
+def is_app_changed(old_app, new_app):
+    """Una actualización cambia versionCode, lastUpdateTime o la ruta del APK"""
+    return any(
+        new_app.get(key) is not None and old_app.get(key) != new_app.get(key)
+        for key in ('version_code', 'last_update_time', 'apk_path')
+    )
+
+
+class InventoryStore:
+    """
+    Caché en disco (SQLite) del inventario de aplicaciones por dispositivo.
+
+    Cada inventario se guarda con el serial y la huella de compilación
+    (ro.build.fingerprint); si la huella cambia (actualización del sistema,
+    restablecimiento) el inventario guardado se descarta.
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = Path(db_path) if db_path else Path.home() / CONFIG_DIR_NAME / INVENTORY_DB_NAME
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self):
+        if not self._initialized:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(str(self.db_path), timeout=5)
+        if not self._initialized:
+            connection.executescript(_SCHEMA)
+            self._initialized = True
+        return connection
+
+    @contextmanager
+    def _transaction(self):
+        """Conexión serializada que confirma al salir (o revierte si hay error) y se cierra"""
+        with self._lock:
+            connection = self._connect()
+            try:
+                with connection:
+                    yield connection
+            finally:
+                connection.close()
+
+    @staticmethod
+    def _row_to_app(row):
+        app = dict(zip(_APP_COLUMNS, row))
+        app['splits'] = json.loads(app['splits']) if app['splits'] else []
+        app['is_system'] = bool(app['is_system'])
+        return app
+
+    @staticmethod
+    def _app_to_row(serial, app):
+        values = [app.get(column) for column in _APP_COLUMNS]
+        values[_APP_COLUMNS.index('splits')] = json.dumps(app.get('splits') or [])
+        values[_APP_COLUMNS.index('is_system')] = 1 if app.get('is_system') else 0
+        return [serial] + values
+
+    def prepare(self):
+        """Abre la base de datos (creando sus tablas) antes de que haga falta"""
+        try:
+            with self._transaction():
+                pass
+        except sqlite3.Error as e:
+            print_in_debug_mode(f"Error abriendo el inventario en caché: {e}")
+
+    def load(self, serial, fingerprint):
+        """
+        Devuelve el inventario guardado {package_name: app} o None si no existe
+        o pertenece a otra compilación del sistema.
+        """
+        try:
+            with self._transaction() as connection:
+                row = connection.execute(
+                    "SELECT fingerprint FROM devices WHERE serial = ?", (serial,)
+                ).fetchone()
+                if not row:
+                    return None
+                if row[0] != fingerprint:
+                    print_in_debug_mode(f"Inventario de {serial} descartado: cambió la huella de compilación")
+                    self._delete(connection, serial)
+                    return None
+
+                rows = connection.execute(
+                    f"SELECT {', '.join(_APP_COLUMNS)} FROM apps WHERE serial = ?", (serial,)
+                ).fetchall()
+                return {row[0]: self._row_to_app(row) for row in rows}
+        except sqlite3.Error as e:
+            print_in_debug_mode(f"Error leyendo el inventario en caché: {e}")
+            return None
+
+    def save(self, serial, fingerprint, apps):
+        """Reemplaza el inventario completo del dispositivo"""
+        try:
+            with self._transaction() as connection:
+                self._delete(connection, serial)
+                self._touch(connection, serial, fingerprint)
+                self._upsert(connection, serial, apps.values())
+            return True
+        except sqlite3.Error as e:
+            print_in_debug_mode(f"Error guardando el inventario en caché: {e}")
+            return False
+
+    def apply_delta(self, serial, fingerprint, delta):
+        """Aplica solo los paquetes añadidos, eliminados o actualizados"""
+        try:
+            with self._transaction() as connection:
+                self._touch(connection, serial, fingerprint)
+                self._upsert(connection, serial, delta['added'] + delta['changed'])
+                connection.executemany(
+                    "DELETE FROM apps WHERE serial = ? AND package_name = ?",
+                    [(serial, package) for package in delta['removed']]
+                )
+            return True
+        except sqlite3.Error as e:
+            print_in_debug_mode(f"Error actualizando el inventario en caché: {e}")
+            return False
+
+    def remove_package(self, serial, package_name):
+        """Elimina un paquete del inventario (p. ej. tras desinstalarlo)"""
+        return self.apply_delta(serial, None, {'added': [], 'changed': [], 'removed': [package_name]})
+
+    @staticmethod
+    def _delete(connection, serial):
+        connection.execute("DELETE FROM apps WHERE serial = ?", (serial,))
+        connection.execute("DELETE FROM devices WHERE serial = ?", (serial,))
+
+    @staticmethod
+    def _touch(connection, serial, fingerprint):
+        if fingerprint is None:
+            connection.execute("UPDATE devices SET updated_at = ? WHERE serial = ?", (time.time(), serial))
+            return
+        connection.execute(
+            "INSERT OR REPLACE INTO devices (serial, fingerprint, updated_at) VALUES (?, ?, ?)",
+            (serial, fingerprint, time.time())
+        )
+
+    def _upsert(self, connection, serial, apps):
+        placeholders = ', '.join('?' * (len(_APP_COLUMNS) + 1))
+        connection.executemany(
+            f"INSERT OR REPLACE INTO apps (serial, {', '.join(_APP_COLUMNS)}) VALUES ({placeholders})",
+            [self._app_to_row(serial, app) for app in apps]
+        )
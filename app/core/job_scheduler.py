@@ -0,0 +1,213 @@
+import heapq
+import itertools
+import threading
+from PySide6.QtCore import QRunnable, QThreadPool
+from app.constants.config import JOB_MAX_WORKERS
+from app.constants.enums import JobPriority, JobState
+from app.utils.print_in_debug_mode import print_in_debug_mode
+
+
+class CancellationToken:
+    """Indicador de cancelación compartido entre quien lanza un trabajo y el trabajo"""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    def cancel(self):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print_in_debug_mode(f"Error al cancelar: {e}")
+
+    def is_cancelled(self):
+        return self._event.is_set()
+
+    def on_cancel(self, callback):
+        """
+        Registra un callback que se ejecuta al cancelar (en el hilo que cancela).
+        Si ya está cancelado se ejecuta al instante. Devuelve la función para anular el registro.
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._remove_callback(callback)
+        callback()
+        return lambda: None
+
+    def _remove_callback(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+
+class Job:
+    """
+    Unidad de trabajo del planificador.
+
+    Args:
+        func: Callable que se ejecuta en un hilo del pool
+        device_id: Si se indica, los trabajos del mismo dispositivo se ejecutan de uno en uno
+        priority: JobPriority; a igual prioridad se respeta el orden de llegada
+        token: CancellationToken compartido con el trabajo
+    """
+
+    def __init__(self, func, device_id=None, priority=JobPriority.NORMAL, token=None, name=None):
+        self.func = func
+        self.device_id = device_id
+        self.priority = priority
+        self.token = token or CancellationToken()
+        self.name = name or getattr(func, '__qualname__', 'job')
+        self.state = JobState.QUEUED
+        self._done = threading.Event()
+
+    def cancel(self):
+        self.token.cancel()
+
+    def is_done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """Espera a que termine. timeout en segundos; devuelve True si terminó"""
+        return self._done.wait(timeout)
+
+
+class _JobRunner(QRunnable):
+    """Hilo del pool: ejecuta trabajos de la cola mientras haya alguno disponible"""
+
+    def __init__(self, scheduler):
+        super().__init__()
+        self.scheduler = scheduler
+        self.setAutoDelete(True)
+
+    def run(self):
+        self.scheduler._run_available_jobs()
+
+
+class JobScheduler:
+    """
+    Planificador central de trabajos sobre un pool de hilos acotado.
+
+    - Cola con prioridades (JobPriority) y orden de llegada.
+    - Los trabajos de un mismo dispositivo se serializan; dispositivos distintos
+      avanzan en paralelo hasta el máximo de hilos del pool.
+    - La cancelación es cooperativa mediante CancellationToken.
+    """
+
+    def __init__(self, max_workers=JOB_MAX_WORKERS):
+        self.max_workers = max_workers
+        self._pool = QThreadPool()
+        self._pool.setMaxThreadCount(max_workers)
+        self._queue = []
+        self._sequence = itertools.count()
+        self._busy_devices = set()
+        self._active_runners = 0
+        self._detached_jobs = set()
+        self._lock = threading.Lock()
+
+    def submit(self, job):
+        """Encola un trabajo y lo lanza en cuanto haya un hilo y el dispositivo esté libre"""
+        with self._lock:
+            job.state = JobState.QUEUED
+            heapq.heappush(self._queue, (int(job.priority), next(self._sequence), job))
+        print_in_debug_mode(f"Trabajo encolado: {job.name} (dispositivo: {job.device_id}, prioridad: {job.priority.name})")
+        self._dispatch()
+        return job
+
+    def run_detached(self, job):
+        """
+        Ejecuta un trabajo en un hilo propio, fuera del pool y sin turno de dispositivo.
+        Es para coordinadores que solo esperan a otros trabajos del planificador:
+        dentro del pool ocuparían uno de los hilos que esos trabajos necesitan.
+        """
+        with self._lock:
+            job.state = JobState.RUNNING
+            self._detached_jobs.add(job)
+        print_in_debug_mode(f"Trabajo en hilo propio: {job.name}")
+        threading.Thread(target=self._run_job, args=(job,), name=job.name, daemon=True).start()
+        return job
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._queue)
+
+    def _dispatch(self):
+        with self._lock:
+            runners_needed = min(
+                self.max_workers - self._active_runners,
+                sum(1 for _, _, job in self._queue if self._can_run(job))
+            )
+            self._active_runners += max(runners_needed, 0)
+
+        for _ in range(max(runners_needed, 0)):
+            self._pool.start(_JobRunner(self))
+
+    def _can_run(self, job):
+        return job.device_id is None or job.device_id not in self._busy_devices
+
+    def _take_next_job(self):
+        """Saca de la cola el trabajo más prioritario cuyo dispositivo esté libre"""
+        for entry in sorted(self._queue):
+            job = entry[2]
+            if self._can_run(job):
+                self._queue.remove(entry)
+                heapq.heapify(self._queue)
+                if job.device_id is not None:
+                    self._busy_devices.add(job.device_id)
+                job.state = JobState.RUNNING
+                return job
+        return None
+
+    def _run_available_jobs(self):
+        while True:
+            with self._lock:
+                job = self._take_next_job()
+                if job is None:
+                    self._active_runners -= 1
+                    return
+
+            self._run_job(job)
+
+    def _run_job(self, job):
+        try:
+            job.func()
+        except Exception as e:
+            print_in_debug_mode(f"Error no controlado en el trabajo {job.name}: {e}")
+        finally:
+            with self._lock:
+                if job in self._detached_jobs:
+                    self._detached_jobs.discard(job)
+                else:
+                    self._busy_devices.discard(job.device_id)
+                job.state = JobState.FINISHED
+            job._done.set()
+
+    def shutdown(self, timeout_ms=2000):
+        """Cancela los trabajos pendientes y espera a los que están en ejecución"""
+        with self._lock:
+            pending = [job for _, _, job in self._queue]
+            detached = list(self._detached_jobs)
+        for job in pending:
+            job.cancel()
+        done = self._pool.waitForDone(timeout_ms)
+        return all(job.wait(timeout_ms / 1000) for job in detached) and done
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_job_scheduler():
+    """Devuelve el planificador compartido por toda la aplicación"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = JobScheduler()
+        return _scheduler
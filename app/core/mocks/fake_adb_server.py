@@ -0,0 +1,506 @@
+import fnmatch
+import hashlib
+import io
+import shlex
+import socket
+import socketserver
+import struct
+import threading
+import time
+from app.core.apk_inspector import try_inspect_apk
+from app.core.mocks.mock_app_manager import MockAppManager
+from app.core.mocks.mock_device_manager import MockDeviceManager
+
+
+class FakeDevice:
+    """
+    Dispositivo ficticio para el servidor ADB local.
+    Responde a los comandos de shell que usa la aplicación con datos de los mocks
+    y guarda los archivos subidos por sync: en memoria.
+    """
+
+    def __init__(self, serial, state="device", profile=None, apps=None):
+        self.serial = serial
+        self.state = state
+        self.profile = profile or {}
+        self.apps = apps or []
+        self.files = {}
+        self.file_times = {}
+        # Sesiones de instalación abiertas: {id: {nombre_split: bytes}}
+        self.install_sessions = {}
+        self.installed_splits = []
+        for app in self.apps:
+            self.files[app['apk_path']] = hashlib.sha256(app['package_name'].encode()).digest() * 2048
+
+    @property
+    def properties(self):
+        return {
+            'ro.product.model': self.profile.get('model', 'Fake'),
+            'ro.product.brand': self.profile.get('brand', 'Fake'),
+            'ro.product.manufacturer': self.profile.get('manufacturer', 'Fake'),
+            'ro.build.version.release': self.profile.get('android_version', '14'),
+            'ro.build.version.sdk': self.profile.get('sdk_version', '34'),
+            'ro.product.cpu.abi': self.profile.get('cpu_arch', 'arm64-v8a'),
+            'ro.product.cpu.abilist': self.profile.get('cpu_arch', 'arm64-v8a'),
+            'ro.serialno': self.serial,
+            'ro.build.fingerprint': f"fake/{self.serial}/1:14/FAKE/1:user/release-keys",
+        }
+
+    def devices_line(self):
+        model = self.profile.get('model', 'Fake')
+        return f"{self.serial}\t{self.state} product:fake model:{model} device:fake transport_id:1"
+
+    def run_shell(self, command):
+        """Ejecuta un comando (admite secuencias separadas por ';'). Devuelve (stdout, stderr, código)"""
+        stdout, stderr, code = [], [], 0
+        for part in command.split(';'):
+            part = part.strip()
+            if not part:
+                continue
+            out, err, code = self._run_single(part)
+            stdout.append(out)
+            stderr.append(err)
+        return ''.join(stdout), ''.join(stderr), code
+
+    def _run_single(self, command):
+        try:
+            args = shlex.split(command)
+        except ValueError:
+            return '', f"sh: syntax error: {command}\n", 2
+        # Las redirecciones de errores no cambian la salida simulada
+        args = [arg for arg in args if not arg.startswith('2>')]
+        name, params = args[0], args[1:]
+
+        if name == 'echo':
+            return ' '.join(params) + '\n', '', 0
+        if name == 'true':
+            return '', '', 0
+        if name == 'getprop':
+            if params:
+                return self.properties.get(params[0], '') + '\n', '', 0
+            return ''.join(f"[{key}]: [{value}]\n" for key, value in self.properties.items()), '', 0
+        if name == 'wm' and params[:1] == ['size']:
+            return f"Physical size: {self.profile.get('resolution', '1080x2400')}\n", '', 0
+        if name == 'wm' and params[:1] == ['density']:
+            return f"Physical density: {self.profile.get('density', '420 dpi').split()[0]}\n", '', 0
+        if name == 'cat' and params == ['/proc/meminfo']:
+            ram_kb = int(self.profile.get('total_ram', '8192 MB').split()[0]) * 1024
+            return f"MemTotal:       {ram_kb} kB\nMemFree:        1024 kB\n", '', 0
+        if name == 'df':
+            storage_kb = int(self.profile.get('storage', '128 GB').split()[0]) * 1024 * 1024
+            return ("Filesystem     1K-blocks    Used Available Use% Mounted on\n"
+                    f"/dev/block/dm-5 {storage_kb} 1024 {storage_kb - 1024} 1% /data\n"), '', 0
+        if name == 'pm' and params[:2] == ['list', 'packages']:
+            return self._pm_list_packages(params[2:]), '', 0
+        if name == 'pm' and params[:1] == ['path'] and len(params) > 1:
+            app = self._find_app(params[1])
+            if not app:
+                return '', '', 1
+            # base.apk y los splits instalados junto a él
+            folder = app['apk_path'].rsplit('/', 1)[0] + '/'
+            splits = sorted(
+                path for path in self.files
+                if path.startswith(folder) and path.endswith('.apk') and path != app['apk_path']
+            )
+            return ''.join(f"package:{path}\n" for path in [app['apk_path']] + splits), '', 0
+        if name == 'pm' and params[:1] == ['uninstall'] and len(params) > 1:
+            app = self._find_app(params[-1])
+            if app:
+                self.apps.remove(app)
+                return "Success\n", '', 0
+            return "Failure [DELETE_FAILED_INTERNAL_ERROR]\n", '', 1
+        if name == 'dumpsys' and params == ['package', 'packages']:
+            return self._dumpsys_packages(), '', 0
+        if name == 'dumpsys' and params[:1] == ['package'] and len(params) == 2:
+            return self._dumpsys_packages(params[1]), '', 0
+        if name == 'pm' and params[:1] == ['install-create']:
+            session_id = str(1000 + len(self.install_sessions) + len(self.installed_splits))
+            self.install_sessions[session_id] = {}
+            return f"Success: created install session [{session_id}]\n", '', 0
+        if name == 'pm' and params[:1] == ['install-commit'] and len(params) > 1:
+            splits = self.install_sessions.pop(params[1], None)
+            if splits is None:
+                return '', f"Failure [INSTALL_FAILED_INTERNAL_ERROR: invalid session {params[1]}]\n", 1
+            # Sin el APK base (solo 'split_*' / 'config.*') la instalación no es válida
+            if all('split_' in split or 'config.' in split for split in splits):
+                return "Failure [INSTALL_FAILED_MISSING_SPLIT: Missing split for base]\n", '', 1
+            self.installed_splits.append(splits)
+            self._register_installed(splits)
+            return "Success\n", '', 0
+        if name == 'pm' and params[:1] == ['install-abandon'] and len(params) > 1:
+            self.install_sessions.pop(params[1], None)
+            return "Success\n", '', 0
+        if name == 'pm' and params[:1] == ['install-write'] and len(params) == 6 and params[5] != '-':
+            # pm install-write -S <tamaño> <sesión> <nombre> <ruta en el dispositivo>
+            session = self.install_sessions.get(params[3])
+            data = self.files.get(params[5])
+            if session is None or data is None:
+                return '', f"Failure [INSTALL_FAILED_INTERNAL_ERROR: cannot write {params[5]}]\n", 1
+            session[params[4]] = data
+            return f"Success: streamed {len(data)} bytes\n", '', 0
+        if name in ('mkdir', 'touch'):
+            if name == 'touch':
+                now = time.time()
+                self.file_times.update((path, now) for path in params if path in self.files)
+            return '', '', 0
+        if name == 'mv' and len(params) == 2 and params[0] in self.files:
+            self.files[params[1]] = self.files.pop(params[0])
+            self.file_times[params[1]] = time.time()
+            return '', '', 0
+        if name == 'sha256sum':
+            present = [path for path in params if path in self.files]
+            lines = ''.join(f"{hashlib.sha256(self.files[path]).hexdigest()}  {path}\n" for path in present)
+            return lines, '', 0 if len(present) == len(params) else 1
+        if name == 'stat' and params[:1] == ['-c'] and len(params) > 2:
+            # Solo '%Y', '%s' y '%n'; admite comodines como el shell
+            lines, code = [], 0
+            for pattern in params[2:]:
+                matches = sorted(path for path in self.files if fnmatch.fnmatchcase(path, pattern))
+                if not matches:
+                    code = 1
+                for path in matches:
+                    lines.append(
+                        params[1].replace('%Y', str(int(self.file_times.get(path, 0))))
+                        .replace('%s', str(len(self.files[path]))).replace('%n', path)
+                    )
+            return ''.join(line + '\n' for line in lines), '', code
+        if name == 'rm':
+            recursive = any(flag.startswith('-') and 'r' in flag for flag in params)
+            for path in (param for param in params if not param.startswith('-')):
+                self.files.pop(path, None)
+                if recursive:
+                    for stored in [stored for stored in self.files if stored.startswith(path.rstrip('/') + '/')]:
+                        del self.files[stored]
+            return '', '', 0
+
+        return '', f"/system/bin/sh: {name}: inaccessible or not found\n", 127
+
+    def _register_installed(self, splits):
+        """Añade o actualiza la aplicación si los APKs de la sesión tienen un manifiesto legible"""
+        apks = [(info, data) for info, data in ((try_inspect_apk(io.BytesIO(data)), data) for data in splits.values()) if info]
+        infos = [info for info, _ in apks]
+        base = next((info for info in infos if not info['split']), None)
+        if base is None:
+            return
+        app = self._find_app(base['package_name'])
+        if app is None:
+            app = {
+                'package_name': base['package_name'],
+                'name': base['package_name'],
+                'apk_path': f"/data/app/{base['package_name']}-1/base.apk",
+                'is_system': False,
+            }
+            self.apps.append(app)
+        app.update({
+            'version': base['version_name'] or '1.0',
+            'version_code': base['version_code'],
+            'signatures': base['signer_hashes'],
+            'splits': ['base'] + [info['split'] for info in infos if info['split']],
+        })
+        # Los APKs quedan en el dispositivo como los deja el gestor de paquetes (para 'pm path' y pull)
+        folder = app['apk_path'].rsplit('/', 1)[0]
+        for info, data in apks:
+            self.files[f"{folder}/split_{info['split']}.apk" if info['split'] else app['apk_path']] = data
+
+    def _find_app(self, package_name):
+        return next((app for app in self.apps if app['package_name'] == package_name), None)
+
+    def _pm_list_packages(self, flags):
+        lines = []
+        for index, app in enumerate(self.apps):
+            if '-3' in flags and app['is_system']:
+                continue
+            if '-s' in flags and not app['is_system']:
+                continue
+            prefix = f"{app['apk_path']}=" if '-f' in flags else ''
+            suffix = f" versionCode:{self._version_code(app)}" if '--show-versioncode' in flags else ''
+            lines.append(f"package:{prefix}{app['package_name']}{suffix}\n")
+        return ''.join(lines)
+
+    @staticmethod
+    def _version_code(app):
+        # Estable aunque cambie la posición del paquete en la lista
+        return app.get('version_code') or int(hashlib.sha256(app['package_name'].encode()).hexdigest()[:5], 16)
+
+    def _dumpsys_packages(self, package_name=None):
+        lines = ["Packages:\n"]
+        for index, app in enumerate(self.apps):
+            if package_name and app['package_name'] != package_name:
+                continue
+            flags = "SYSTEM HAS_CODE" if app['is_system'] else "HAS_CODE"
+            lines.extend([
+                f"  Package [{app['package_name']}] ({index:07x}):\n",
+                f"    codePath={app['apk_path'].rsplit('/', 1)[0]}\n",
+                f"    versionCode={self._version_code(app)} minSdk=24 targetSdk=34\n",
+                f"    versionName={app['version']}\n",
+                f"    splits=[{', '.join(app.get('splits', ['base']))}]\n",
+                f"    signatures=PackageSignatures{{{index:06x} version:2, signatures:[{', '.join(app.get('signatures', []))}], past signatures:[]}}\n",
+                f"    flags=[ {flags} ]\n",
+                "    firstInstallTime=2024-01-01 10:00:00\n",
+                "    lastUpdateTime=2024-01-01 10:00:00\n",
+            ])
+        return ''.join(lines)
+
+
+class FakeADBServer:
+    """
+    Servidor local que habla el protocolo smart-socket del servidor ADB.
+
+    Permite usar ADBSocketClient (y medir su rendimiento) sin ningún dispositivo
+    conectado. Soporta host:version, host:devices(-l), host:track-devices(-l),
+    host:transport:<serial>, shell:, shell,v2,raw:, exec: y sync: (STAT/RECV/SEND).
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, devices=None):
+        self.devices = {device.serial: device for device in (devices or self.default_devices())}
+        self._changed = threading.Condition()
+        self._generation = 0
+        server = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                server._handle_connection(self.request)
+
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        self._server = socketserver.ThreadingTCPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self.host, self.port = self._server.server_address
+        self._thread = None
+
+    @staticmethod
+    def default_devices(count=2):
+        """Crea dispositivos con los mismos perfiles y catálogos que los mocks de la interfaz"""
+        mock_devices = MockDeviceManager()
+        mock_apps = MockAppManager()
+        devices = []
+        for entry in mock_devices.get_connected_devices()['devices'][:count]:
+            serial = entry['device']
+            profile = mock_devices.get_device_info(serial)
+            apps = mock_apps.get_installed_apps_by_type(serial, entry['brand'])['data']['apps']
+            devices.append(FakeDevice(serial, profile=profile, apps=apps))
+        return devices
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        with self._changed:
+            self._generation += 1
+            self._changed.notify_all()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ------------------------------------------------------------------
+    # Cambios de dispositivos (para probar track-devices)
+    # ------------------------------------------------------------------
+    def add_device(self, device):
+        self.devices[device.serial] = device
+        self._notify_change()
+
+    def remove_device(self, serial):
+        self.devices.pop(serial, None)
+        self._notify_change()
+
+    def set_device_state(self, serial, state):
+        self.devices[serial].state = state
+        self._notify_change()
+
+    def _notify_change(self):
+        with self._changed:
+            self._generation += 1
+            self._changed.notify_all()
+
+    # ------------------------------------------------------------------
+    # Protocolo
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _recv_exact(sock, size):
+        data = b''
+        while len(data) < size:
+            chunk = sock.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError()
+            data += chunk
+        return data
+
+    def _read_service(self, sock):
+        length = int(self._recv_exact(sock, 4), 16)
+        return self._recv_exact(sock, length).decode("utf-8")
+
+    @staticmethod
+    def _send_okay(sock, payload=None):
+        message = b"OKAY"
+        if payload is not None:
+            data = payload.encode("utf-8")
+            message += b"%04x" % len(data) + data
+        sock.sendall(message)
+
+    @staticmethod
+    def _send_fail(sock, reason):
+        data = reason.encode("utf-8")
+        sock.sendall(b"FAIL" + b"%04x" % len(data) + data)
+
+    def _devices_listing(self, long_format):
+        lines = []
+        for device in self.devices.values():
+            line = device.devices_line()
+            lines.append(line if long_format else '\t'.join(line.split()[:2]))
+        return ''.join(f"{line}\n" for line in lines)
+
+    def _handle_connection(self, sock):
+        try:
+            service = self._read_service(sock)
+            if service == "host:version":
+                self._send_okay(sock, "0029")
+            elif service in ("host:devices", "host:devices-l"):
+                self._send_okay(sock, self._devices_listing(service.endswith("-l")))
+            elif service in ("host:track-devices", "host:track-devices-l"):
+                self._track_devices(sock, service.endswith("-l"))
+            elif service.startswith("host:transport:"):
+                device = self.devices.get(service.split(":", 2)[2])
+                if not device:
+                    self._send_fail(sock, f"device '{service.split(':', 2)[2]}' not found")
+                    return
+                if device.state != "device":
+                    self._send_fail(sock, f"device {device.state}")
+                    return
+                self._send_okay(sock)
+                self._handle_device_service(sock, device, self._read_service(sock))
+            else:
+                self._send_fail(sock, f"unknown host service '{service}'")
+        except (ConnectionError, OSError, ValueError):
+            pass
+        finally:
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+    def _track_devices(self, sock, long_format):
+        sock.sendall(b"OKAY")
+        last_listing = None
+        while True:
+            with self._changed:
+                generation = self._generation
+                listing = self._devices_listing(long_format)
+            if listing != last_listing:
+                data = listing.encode("utf-8")
+                sock.sendall(b"%04x" % len(data) + data)
+                last_listing = listing
+            with self._changed:
+                if self._generation == generation:
+                    self._changed.wait(timeout=1)
+            if self._thread is None or not self._thread.is_alive():
+                return
+
+    def _handle_device_service(self, sock, device, service):
+        if service.startswith("shell,v2"):
+            stdout, stderr, code = device.run_shell(service.split(":", 1)[1])
+            self._send_okay(sock)
+            for packet_id, data in ((1, stdout.encode()), (2, stderr.encode())):
+                if data:
+                    sock.sendall(struct.pack("<BI", packet_id, len(data)) + data)
+            sock.sendall(struct.pack("<BI", 3, 1) + bytes([code & 0xFF]))
+        elif service.startswith("exec:pm install-write"):
+            # pm install-write -S <tamaño> <sesión> <nombre> -: lee exactamente <tamaño> bytes
+            args = service.split(":", 1)[1].split()
+            size, session_id, split_name = int(args[3]), args[4], args[5]
+            self._send_okay(sock)
+            data = self._recv_exact(sock, size) if size else b''
+            session = device.install_sessions.get(session_id)
+            if session is None:
+                sock.sendall(f"Failure [INSTALL_FAILED_INTERNAL_ERROR: invalid session {session_id}]\n".encode())
+            else:
+                session[split_name] = data
+                sock.sendall(f"Success: streamed {size} bytes\n".encode())
+        elif service.startswith("shell:") or service.startswith("exec:"):
+            stdout, stderr, _ = device.run_shell(service.split(":", 1)[1])
+            self._send_okay(sock)
+            sock.sendall((stdout + stderr).encode())
+        elif service == "sync:":
+            self._send_okay(sock)
+            self._handle_sync(sock, device)
+        else:
+            self._send_fail(sock, f"unknown service '{service}'")
+
+    def _handle_sync(self, sock, device):
+        while True:
+            header = self._recv_exact(sock, 8)
+            command_id, length = header[:4], struct.unpack("<I", header[4:])[0]
+            path = self._recv_exact(sock, length).decode("utf-8") if length else ''
+
+            if command_id == b"QUIT":
+                return
+            if command_id == b"STAT":
+                data = device.files.get(path)
+                mode, size = (0o100644, len(data)) if data is not None else (0, 0)
+                sock.sendall(b"STAT" + struct.pack("<III", mode, size, int(time.time())))
+            elif command_id == b"RECV":
+                data = device.files.get(path)
+                if data is None:
+                    reason = b"remote object does not exist"
+                    sock.sendall(b"FAIL" + struct.pack("<I", len(reason)) + reason)
+                    continue
+                for offset in range(0, len(data), 64 * 1024):
+                    chunk = data[offset:offset + 64 * 1024]
+                    sock.sendall(b"DATA" + struct.pack("<I", len(chunk)) + chunk)
+                sock.sendall(b"DONE" + struct.pack("<I", 0))
+            elif command_id == b"SEND":
+                remote_path = path.rsplit(',', 1)[0]
+                chunks = []
+                while True:
+                    header = self._recv_exact(sock, 8)
+                    chunk_id, chunk_length = header[:4], struct.unpack("<I", header[4:])[0]
+                    if chunk_id == b"DONE":
+                        break
+                    chunks.append(self._recv_exact(sock, chunk_length))
+                device.files[remote_path] = b''.join(chunks)
+                device.file_times[remote_path] = time.time()
+                sock.sendall(b"OKAY" + struct.pack("<I", 0))
+            else:
+                return
+
+
+def run_benchmark(iterations=200):
+    """Compara el coste por comando del cliente de socket contra el servidor ficticio"""
+    from app.core.adb_socket_client import ADBSocketClient
+
+    with FakeADBServer() as server:
+        client = ADBSocketClient(server.host, server.port)
+        serial = next(iter(server.devices))
+        apk_path = server.devices[serial].apps[0]['apk_path']
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            client.devices()
+        devices_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            client.shell(serial, "getprop ro.product.model")
+        shell_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            client.get_sync(serial).stat(apk_path)
+        stat_time = time.perf_counter() - start
+        client.close()
+
+    print(f"host:devices-l     {devices_time / iterations * 1000:.3f} ms/llamada")
+    print(f"shell,v2 getprop   {shell_time / iterations * 1000:.3f} ms/llamada")
+    print(f"sync STAT (reuso)  {stat_time / iterations * 1000:.3f} ms/llamada")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,145 @@
+import re
+
+# Cabecera de cada bloque: "  Package [com.ejemplo.app] (1a2b3c4):"
+_PACKAGE_HEADER = re.compile(r'^\s*Package \[([^\]]+)\]')
+
+# "PackageSignatures{9fe2b4 version:2, signatures:[a1b2c3d4], past signatures:[]}"
+# y en versiones antiguas "PackageSignatures{41e2a1 [a1b2c3d4]}"
+_SIGNATURES = re.compile(r'(?:\bsignatures:|^PackageSignatures\{\w+ )\[([^\]]*)\]')
+
+# Campos simples "clave=valor" que se copian tal cual al registro
+_SIMPLE_FIELDS = {
+    'versionName': 'version_name',
+    'codePath': 'code_path',
+    'resourcePath': 'resource_path',
+    'primaryCpuAbi': 'primary_cpu_abi',
+    'installerPackageName': 'installer',
+    'firstInstallTime': 'first_install_time',
+    'lastUpdateTime': 'last_update_time',
+    'timeStamp': 'timestamp',
+}
+
+
+def _new_record(package_name):
+    return {
+        'package_name': package_name,
+        'version_name': None,
+        'version_code': None,
+        'min_sdk': None,
+        'target_sdk': None,
+        'code_path': None,
+        'resource_path': None,
+        'primary_cpu_abi': None,
+        'installer': None,
+        'splits': [],
+        'signatures': [],
+        'flags': [],
+        'private_flags': [],
+        'first_install_time': None,
+        'last_update_time': None,
+        'timestamp': None,
+    }
+
+
+def _parse_bracket_list(value):
+    """Convierte '[ SYSTEM HAS_CODE ]' o '[base, config.en]' en una lista"""
+    value = value.strip()
+    if value.startswith('['):
+        value = value[1:]
+    if value.endswith(']'):
+        value = value[:-1]
+    return [item.strip() for item in re.split(r'[\s,]+', value) if item.strip()]
+
+
+def _parse_line(record, line):
+    """Actualiza el registro con la información de una línea del bloque"""
+    stripped = line.strip()
+
+    # "versionCode=123 minSdk=21 targetSdk=33" viene en una sola línea
+    if stripped.startswith('versionCode='):
+        for token in stripped.split():
+            key, _, value = token.partition('=')
+            if key == 'versionCode':
+                record['version_code'] = value
+            elif key == 'minSdk':
+                record['min_sdk'] = value
+            elif key == 'targetSdk':
+                record['target_sdk'] = value
+        return
+
+    key, sep, value = stripped.partition('=')
+    if not sep:
+        return
+
+    if key in _SIMPLE_FIELDS:
+        record[_SIMPLE_FIELDS[key]] = value.strip()
+    elif key in ('flags', 'pkgFlags'):
+        # En versiones antiguas solo existe pkgFlags; no duplicar si ya están ambos
+        for flag in _parse_bracket_list(value):
+            if flag not in record['flags']:
+                record['flags'].append(flag)
+    elif key in ('privateFlags', 'privatePkgFlags'):
+        for flag in _parse_bracket_list(value):
+            if flag not in record['private_flags']:
+                record['private_flags'].append(flag)
+    elif key == 'splits':
+        record['splits'] = _parse_bracket_list(value)
+    elif key == 'signatures':
+        # Hash de cada certificado firmante (Signature.hashCode() en hexadecimal)
+        match = _SIGNATURES.search(value.strip())
+        if match:
+            record['signatures'] = _parse_bracket_list(match.group(1))
+
+
+def parse_package_dump(lines):
+    """
+    Analiza en una sola pasada la salida de 'dumpsys package packages'.
+
+    Args:
+        lines: Cualquier iterable de líneas (lista, archivo o stdout de un proceso)
+
+    Yields:
+        dict: Un registro por paquete con versión, rutas, flags y fechas de instalación
+
+    Solo se procesa la sección "Packages:". Las secciones posteriores
+    (por ejemplo "Hidden system packages:") repiten paquetes con datos de
+    la versión de fábrica y se ignoran para no sobrescribir la versión real.
+    """
+    in_packages_section = False
+    record = None
+
+    for raw_line in lines:
+        line = raw_line.rstrip('\r\n')
+        if not line.strip():
+            continue
+
+        # Las cabeceras de sección no tienen sangría
+        if not line[0].isspace():
+            if record:
+                yield record
+                record = None
+            if in_packages_section:
+                return
+            in_packages_section = line.strip() == 'Packages:'
+            continue
+
+        if not in_packages_section:
+            continue
+
+        header = _PACKAGE_HEADER.match(line)
+        if header:
+            if record:
+                yield record
+            record = _new_record(header.group(1))
+            continue
+
+        if record:
+            _parse_line(record, line)
+
+    if record:
+        yield record
+
+
+def build_package_index(lines):
+    """Devuelve un diccionario {package_name: registro} a partir del volcado"""
+    return {record['package_name']: record for record in parse_package_dump(lines)}
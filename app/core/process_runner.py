@@ -0,0 +1,158 @@
+import os
+import signal
+import subprocess
+import threading
+from contextlib import contextmanager
+from app.constants.config import PLATFORM
+from app.constants.enums import Platform
+from app.utils.helpers import get_popen_kwargs
+from app.utils.print_in_debug_mode import print_in_debug_mode
+
+CANCELLED_MESSAGE = "Operación cancelada"
+
+_local = threading.local()
+
+
+class OperationCancelled(Exception):
+    """La operación se canceló mientras esperaba a un comando adb"""
+
+    def __init__(self, message=CANCELLED_MESSAGE):
+        super().__init__(message)
+
+
+@contextmanager
+def cancel_scope(token):
+    """Asocia un token de cancelación a los comandos lanzados desde el hilo actual"""
+    previous = getattr(_local, 'token', None)
+    _local.token = token
+    try:
+        yield token
+    finally:
+        _local.token = previous
+
+
+def current_cancel_token():
+    """Token de la operación que se está ejecutando en este hilo (o None)"""
+    return getattr(_local, 'token', None)
+
+
+def raise_if_cancelled(token=None):
+    token = token or current_cancel_token()
+    if token is not None and token.is_cancelled():
+        raise OperationCancelled()
+
+
+def on_current_cancel(callback):
+    """
+    Registra un callback en el token del hilo actual.
+    Devuelve la función para anular el registro (no hace nada si no hay token).
+    """
+    token = current_cancel_token()
+    if token is None:
+        return lambda: None
+    return token.on_cancel(callback)
+
+
+def kill_process_tree(process):
+    """Mata el proceso y todo su grupo (adb puede lanzar procesos hijos)"""
+    if process.poll() is not None:
+        return
+    try:
+        if PLATFORM == Platform.WIN32:
+            subprocess.run(
+                ["taskkill", "/F", "/T", "/PID", str(process.pid)],
+                capture_output=True,
+                creationflags=subprocess.CREATE_NO_WINDOW
+            )
+        else:
+            os.killpg(process.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError, OSError):
+        pass
+    try:
+        process.kill()
+    except OSError:
+        pass
+
+
+def get_new_group_popen_kwargs():
+    """kwargs de Popen para lanzar el proceso en su propio grupo (ver kill_process_tree)"""
+    kwargs = get_popen_kwargs()
+    if PLATFORM == Platform.WIN32:
+        kwargs["creationflags"] = kwargs.get("creationflags", 0) | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        kwargs["start_new_session"] = True
+    return kwargs
+
+
+def _feed_stdin(stdin, input_stream, chunk_size=64 * 1024):
+    """Copia un objeto binario a la entrada del proceso por bloques y la cierra"""
+    try:
+        while True:
+            chunk = input_stream.read(chunk_size)
+            if not chunk:
+                break
+            stdin.buffer.write(chunk)
+        stdin.buffer.flush()
+    except (BrokenPipeError, OSError, ValueError):
+        pass  # El proceso terminó (o se mató al cancelar o al vencer el timeout) antes de leerlo todo
+    finally:
+        try:
+            stdin.close()
+        except OSError:
+            pass
+
+
+def run_cancellable(cmd, timeout=10, token=None, encoding="utf-8", errors="replace", input_stream=None):
+    """
+    Equivalente a subprocess.run(cmd, **get_subprocess_kwargs(timeout)) que se puede cancelar.
+
+    El proceso se lanza en su propio grupo para poder matarlo junto con sus hijos
+    en cuanto se cancele el token (por defecto, el de la operación del hilo actual)
+    o venza el timeout. Si se indica input_stream (objeto binario), su contenido se
+    envía por bloques a la entrada estándar del proceso desde otro hilo: el timeout
+    cuenta también durante el envío (un dispositivo bloqueado no lo detiene).
+
+    Raises:
+        subprocess.TimeoutExpired: Si se supera el timeout
+        OperationCancelled: Si se canceló la operación
+    """
+    token = token or current_cancel_token()
+    raise_if_cancelled(token)
+
+    process = subprocess.Popen(
+        cmd,
+        stdin=subprocess.PIPE if input_stream is not None else subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        encoding=encoding,
+        errors=errors,
+        **get_new_group_popen_kwargs()
+    )
+
+    feeder = None
+    if input_stream is not None:
+        # El hilo es dueño de la entrada: communicate() solo lee la salida y espera
+        stdin, process.stdin = process.stdin, None
+        feeder = threading.Thread(target=_feed_stdin, args=(stdin, input_stream), daemon=True)
+        feeder.start()
+
+    unregister = token.on_cancel(lambda: kill_process_tree(process)) if token else (lambda: None)
+    try:
+        try:
+            stdout, stderr = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            # Matar el proceso también desbloquea al hilo que escribe su entrada
+            kill_process_tree(process)
+            process.communicate()
+            raise subprocess.TimeoutExpired(cmd, timeout)
+    finally:
+        unregister()
+        if feeder is not None:
+            feeder.join()
+
+    if token is not None and token.is_cancelled():
+        print_in_debug_mode(f"Comando cancelado: {' '.join(str(part) for part in cmd)}")
+        raise OperationCancelled()
+
+    return subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)
@@ -0,0 +1,301 @@
+import queue
+import re
+import subprocess
+import threading
+import time
+import uuid
+from app.core.process_runner import (get_new_group_popen_kwargs, kill_process_tree,
+                                     on_current_cancel, raise_if_cancelled)
+from app.utils.helpers import get_subprocess_kwargs
+from app.utils.print_in_debug_mode import print_in_debug_mode
+
+START_TIMEOUT = 10  # Segundos que se espera a que el shell v1 quede listo
+READY_PATTERN = re.compile(r"^.*__APPYNEST_READY__$")
+
+
+class ShellSession:
+    """
+    Sesión 'adb shell' persistente para un dispositivo.
+
+    Se mantiene abierto un único proceso 'adb -s <serial> shell' y cada comando
+    se envía por stdin seguido de un centinela único. La salida se lee hasta
+    encontrar el centinela, que además transporta el código de salida. Con
+    shell protocol v2 stdout y stderr llegan separados; en v1 stderr viene
+    mezclado con stdout.
+    """
+
+    def __init__(self, adb_path, device_id):
+        self.adb_path = adb_path
+        self.device_id = device_id
+        self.shell_v2 = False
+        self._process = None
+        self._stdout_queue = queue.Queue()
+        self._stderr_queue = queue.Queue()
+        self._lock = threading.Lock()
+
+    def _supports_shell_v2(self):
+        """Consulta las features del dispositivo para saber si soporta shell_v2"""
+        try:
+            result = subprocess.run(
+                [self.adb_path, "-s", self.device_id, "features"],
+                **get_subprocess_kwargs()
+            )
+            return result.returncode == 0 and "shell_v2" in result.stdout
+        except Exception as e:
+            print_in_debug_mode(f"No se pudieron obtener las features de {self.device_id}: {e}")
+            return False
+
+    def start(self):
+        """Lanza el proceso de shell y los hilos lectores"""
+        self.shell_v2 = self._supports_shell_v2()
+
+        cmd = [self.adb_path, "-s", self.device_id, "shell"]
+        if self.shell_v2:
+            cmd.append("-T")  # Sin PTY: stdout/stderr separados y sin eco
+
+        print_in_debug_mode(f"Abriendo sesión persistente: {' '.join(cmd)}")
+        self._process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            bufsize=0,
+            **get_new_group_popen_kwargs()
+        )
+
+        self._stdout_queue = queue.Queue()
+        self._stderr_queue = queue.Queue()
+        self._start_reader(self._process.stdout, self._stdout_queue)
+        self._start_reader(self._process.stderr, self._stderr_queue)
+
+        if not self.shell_v2:
+            # En v1 el shell remoto usa PTY: desactivar el eco de los comandos y los
+            # prompts (PS1 se antepondría a la primera línea de salida de cada comando)
+            self._write("stty -echo 2>/dev/null; PS1=''; PS2=''; echo '__APPYNEST_''READY__'\n")
+            # El prompt ya impreso termina en la línea del aviso: se descarta con ella
+            deadline = time.monotonic() + START_TIMEOUT
+            self._read_until(self._stdout_queue, READY_PATTERN, lambda: deadline - time.monotonic())
+
+    def _start_reader(self, stream, line_queue):
+        def reader():
+            try:
+                for raw_line in iter(stream.readline, b''):
+                    line_queue.put(raw_line.decode("utf-8", errors="replace").replace('\r\n', '\n'))
+            except Exception:
+                pass
+            finally:
+                line_queue.put(None)  # EOF
+
+        threading.Thread(target=reader, daemon=True).start()
+
+    def _write(self, text):
+        self._process.stdin.write(text.encode("utf-8"))
+        self._process.stdin.flush()
+
+    def is_alive(self):
+        return self._process is not None and self._process.poll() is None
+
+    @staticmethod
+    def _drain(line_queue):
+        """Descarta líneas pendientes de comandos anteriores"""
+        try:
+            while True:
+                line_queue.get_nowait()
+        except queue.Empty:
+            pass
+
+    @staticmethod
+    def _read_until(line_queue, pattern, remaining):
+        """Lee líneas hasta que una coincida con el centinela. Devuelve (líneas, match)"""
+        lines = []
+        while True:
+            timeout = remaining()
+            if timeout <= 0:
+                raise subprocess.TimeoutExpired("adb shell", 0)
+            try:
+                line = line_queue.get(timeout=timeout)
+            except queue.Empty:
+                raise subprocess.TimeoutExpired("adb shell", 0)
+
+            if line is None:
+                raise EOFError("La sesión de shell se cerró")
+
+            match = pattern.match(line.strip())
+            if match:
+                return lines, match
+            lines.append(line)
+
+    @staticmethod
+    def _strip_framing_newline(lines):
+        """Quita el salto de línea que el centinela antepone a su propia línea"""
+        output = ''.join(lines)
+        return output[:-1] if output.endswith('\n') else output
+
+    def execute(self, command, timeout=30):
+        """
+        Ejecuta un comando en la sesión y devuelve el mismo formato que execute_adb_command.
+        Lanza OperationCancelled si la operación del hilo actual se cancela mientras espera.
+        """
+        with self._lock:
+            if not self.is_alive():
+                raise EOFError("La sesión de shell no está activa")
+
+            self._drain(self._stdout_queue)
+            self._drain(self._stderr_queue)
+
+            token = uuid.uuid4().hex
+            # El centinela se escribe partido en el comando para que un eco no lo active
+            marker = f"__APPYNEST_{token}__"
+            split_marker = f"'__APPYNEST_''{token}__'"
+            pattern = re.compile(rf"^{marker} (-?\d+)$")
+            stderr_pattern = re.compile(rf"^{marker}$")
+
+            script = f"{{ {command}\n}} </dev/null\n"
+            script += f"__appynest_rc=$?; printf '\\n%s %d\\n' {split_marker} $__appynest_rc\n"
+            if self.shell_v2:
+                script += f"printf '\\n%s\\n' {split_marker} >&2\n"
+
+            deadline = time.monotonic() + timeout
+
+            def remaining():
+                return deadline - time.monotonic()
+
+            # Cancelar la operación cierra la sesión y desbloquea la lectura
+            unregister = on_current_cancel(self.close)
+            try:
+                self._write(script)
+                stdout_lines, match = self._read_until(self._stdout_queue, pattern, remaining)
+                stderr_lines = []
+                if self.shell_v2:
+                    stderr_lines, _ = self._read_until(self._stderr_queue, stderr_pattern, remaining)
+            except (subprocess.TimeoutExpired, EOFError, OSError):
+                # El estado de la sesión es desconocido: se descarta
+                self.close()
+                raise_if_cancelled()
+                raise
+            finally:
+                unregister()
+
+            returncode = int(match.group(1))
+            return {
+                'success': returncode == 0,
+                'stdout': self._strip_framing_newline(stdout_lines),
+                'stderr': self._strip_framing_newline(stderr_lines),
+                'returncode': returncode
+            }
+
+    def close(self):
+        """Cierra el proceso de la sesión"""
+        process = self._process
+        if process is None:
+            return
+        try:
+            if process.poll() is None:
+                try:
+                    process.stdin.write(b"exit\n")
+                    process.stdin.flush()
+                except Exception:
+                    pass
+                kill_process_tree(process)
+                process.wait(timeout=2)
+        except Exception as e:
+            print_in_debug_mode(f"Error cerrando sesión de {self.device_id}: {e}")
+        # Desbloquea de inmediato a quien esté esperando la salida de un comando
+        self._stdout_queue.put(None)
+        self._stderr_queue.put(None)
+
+
+class ShellSessionPool:
+    """Mantiene una sesión de shell persistente por dispositivo"""
+
+    def __init__(self, adb_manager):
+        self.adb_manager = adb_manager
+        self._sessions = {}
+        self._lock = threading.Lock()
+        # Uno por dispositivo: abrir una sesión solo hace esperar a quien pide el mismo
+        self._device_locks = {}
+
+    def _live_session(self, device_id, adb_path):
+        with self._lock:
+            session = self._sessions.get(device_id)
+        if session and session.is_alive() and session.adb_path == adb_path:
+            return session
+        return None
+
+    def get_session(self, device_id):
+        """Devuelve una sesión activa para el dispositivo, creándola si hace falta"""
+        adb_path = self.adb_manager.get_adb_path()
+        if not adb_path:
+            return None
+
+        session = self._live_session(device_id, adb_path)
+        if session:
+            return session
+
+        with self._lock:
+            device_lock = self._device_locks.setdefault(device_id, threading.Lock())
+
+        # start() ejecuta 'adb features': fuera del lock común, un dispositivo lento
+        # no retrasa las sesiones de los demás
+        with device_lock:
+            session = self._live_session(device_id, adb_path)
+            if session:
+                return session
+
+            with self._lock:
+                stale = self._sessions.pop(device_id, None)
+            if stale:
+                stale.close()
+
+            session = ShellSession(adb_path, device_id)
+            try:
+                session.start()
+            except Exception as e:
+                print_in_debug_mode(f"No se pudo abrir sesión de shell para {device_id}: {e}")
+                session.close()
+                return None
+
+            with self._lock:
+                self._sessions[device_id] = session
+            return session
+
+    def execute(self, device_id, command_args, timeout=30):
+        """
+        Ejecuta 'adb shell <command_args>' a través de la sesión persistente.
+
+        Returns:
+            dict | None: Resultado con el formato de execute_adb_command, o None si
+            no hay sesión disponible y el llamador debe usar un proceso nuevo.
+        """
+        session = self.get_session(device_id)
+        if session is None:
+            return None
+
+        # adb shell concatena los argumentos con espacios: mismo comportamiento
+        command = ' '.join(command_args)
+        print_in_debug_mode(f"[shell:{device_id}] {command}")
+
+        try:
+            return session.execute(command, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            error_msg = "Tiempo de espera agotado"
+            print_in_debug_mode(error_msg)
+            return {'success': False, 'error': error_msg}
+        except (EOFError, OSError) as e:
+            print_in_debug_mode(f"Sesión de shell de {device_id} perdida: {e}")
+            self.close_session(device_id)
+            return None
+
+    def close_session(self, device_id):
+        with self._lock:
+            session = self._sessions.pop(device_id, None)
+        if session:
+            session.close()
+
+    def close_all(self):
+        """Cierra todas las sesiones abiertas"""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
@@ -1,26 +1,97 @@
 import os
-from PySide6.QtCore import QThread, Signal, QMutex
+import queue
+import threading
+from contextlib import closing
+from PySide6.QtCore import QObject, Signal
+from app.constants.config import INSTALL_MAX_PARALLEL_DEVICES
+from app.constants.enums import ExtractFormat, JobPriority
+from app.core.apk_bundle import group_install_units
+from app.core.app_search_index import diff_view_rows
+from app.core.install_pipeline import InstallPipeline
+from app.core.transfer_progress import format_transfer_status
+from app.core.job_scheduler import CancellationToken, Job, get_job_scheduler
+from app.core.process_runner import OperationCancelled, cancel_scope
 from app.utils.print_in_debug_mode import print_in_debug_mode
 
-class BaseThread(QThread):
-    """Clase base para todos los threads con capacidad de interrupción"""
+class BaseThread(QObject):
+    """
+    Clase base para todas las operaciones en segundo plano con capacidad de interrupción.
+
+    Conserva la interfaz de QThread que usa la interfaz (start, isRunning, wait,
+    finished), pero cada instancia es un trabajo del planificador central: se
+    ejecuta en el pool compartido, con su prioridad y serializado por dispositivo.
+    """
+    finished = Signal()
+    progress_changed = Signal(int, int, str)  # actual, total, mensaje
+
+    priority = JobPriority.NORMAL
+    # Si es True, no se ejecuta a la vez que otro trabajo del mismo dispositivo
+    serialize_device = True
+    # Si es True, se ejecuta en un hilo propio fuera del pool (coordinadores que
+    # esperan a otros trabajos del planificador y no deben quitarles un hilo)
+    detached = False
+
     def __init__(self):
         super().__init__()
-        self._is_running = True
-        self._mutex = QMutex()
+        self.token = CancellationToken()
+        self._job = None
+    
+    def start(self):
+        """Envía la operación al planificador"""
+        if self.isRunning():
+            return
+        device_id = getattr(self, 'device_id', None) if self.serialize_device else None
+        self._job = Job(
+            self._execute,
+            device_id=device_id,
+            priority=self.priority,
+            token=self.token,
+            name=self.__class__.__name__
+        )
+        if self.detached:
+            get_job_scheduler().run_detached(self._job)
+        else:
+            get_job_scheduler().submit(self._job)
+
+    def _execute(self):
+        try:
+            if self.is_running():
+                # Los comandos adb lanzados desde run() se matan al llamar a stop()
+                with cancel_scope(self.token):
+                    self.run()
+        except OperationCancelled:
+            print_in_debug_mode(f"{self.__class__.__name__} cancelado")
+        except Exception as e:
+            print_in_debug_mode(f"Error en {self.__class__.__name__}: {e}")
+        finally:
+            self.finished.emit()
+
+    def run(self):
+        """Trabajo a realizar; se ejecuta en un hilo del pool"""
+        raise NotImplementedError
+
+    def isRunning(self):
+        """True mientras la operación está en cola o ejecutándose"""
+        return self._job is not None and not self._job.is_done()
+
+    def wait(self, msecs=None):
+        """Espera a que termine. Devuelve True si terminó antes del tiempo indicado"""
+        if self._job is None:
+            return True
+        return self._job.wait(None if msecs is None else msecs / 1000)
     
     def stop(self):
-        """Solicita la detención del thread"""
-        self._mutex.lock()
-        self._is_running = False
-        self._mutex.unlock()
+        """Cancela la operación y mata los comandos adb que tenga en curso"""
+        self.token.cancel()
     
     def is_running(self):
-        """Verifica si el thread debe continuar ejecutándose"""
-        self._mutex.lock()
-        running = self._is_running
-        self._mutex.unlock()
-        return running
+        """Verifica si la operación debe continuar ejecutándose"""
+        return not self.token.is_cancelled()
+
+    def report_progress(self, current, total, message=""):
+        """Publica el progreso de la operación si no fue cancelada"""
+        if self.is_running():
+            self.progress_changed.emit(current, total, message)
 
 class UninstallThread(BaseThread):
     finished_signal = Signal(bool, str)
@@ -70,58 +141,135 @@ class ExtractThread(BaseThread):
         if self.is_running():
             self.finished_signal.emit(success, message)
 
+class BatchExtractThread(BaseThread):
+    """Extrae varias aplicaciones (con sus splits) a una carpeta"""
+    progress_update = Signal(str)
+    finished_signal = Signal(bool, str)
+
+    def __init__(self, app_manager, device_id, apps_list, output_dir, output_format=ExtractFormat.DIRECTORY):
+        super().__init__()
+        self.app_manager = app_manager
+        self.device_id = device_id
+        self.apps_list = apps_list
+        self.output_dir = output_dir
+        self.output_format = output_format
+
+    def run(self):
+        if not self.is_running():
+            return
+
+        try:
+            results = self.app_manager.batch_extract_apps(
+                self.device_id,
+                self.apps_list,
+                self.output_dir,
+                self.output_format,
+                progress_callback=self._on_progress
+            )
+
+            if not self.is_running():
+                return
+
+            names = {app['package_name']: app.get('name') or app['package_name'] for app in self.apps_list}
+            extracted = [names[package] for package, result in results.items() if result['success']]
+            failed = [result['message'] for result in results.values() if not result['success']]
+            total = len(self.apps_list)
+
+            if not failed:
+                self.finished_signal.emit(True, f"{total} aplicaciones extraídas en:\n{self.output_dir}")
+            elif extracted:
+                message = f"{len(extracted)} de {total} aplicaciones extraídas en:\n{self.output_dir}"
+                message += "\n\nNo se pudieron extraer:\n" + "\n".join(failed)
+                self.finished_signal.emit(False, message)
+            else:
+                self.finished_signal.emit(False, "No se pudo extraer ninguna aplicación:\n" + "\n".join(failed))
+        except OperationCancelled:
+            raise
+        except Exception as e:
+            if self.is_running():
+                self.finished_signal.emit(False, f"Error general en la extracción: {str(e)}")
+
+    def _on_progress(self, sent, total, rate, eta):
+        if not self.is_running():
+            return
+        self.progress_update.emit(f"Extrayendo · {format_transfer_status(sent, total, rate, eta)}")
+        self.report_progress(int(sent * 100 / total) if total else 100, 100)
+
 class InstallationThread(BaseThread):
     progress_update = Signal(str)
     finished_signal = Signal(bool, str)
     
-    def __init__(self, apk_installer, apk_paths, device_id):
+    def __init__(self, apk_installer, apk_paths, device_id, force=False):
         super().__init__()
         self.apk_installer = apk_installer
         self.apk_paths = apk_paths
         self.device_id = device_id
+        # Si es False se omiten los APKs que el dispositivo ya tiene en la misma versión y firma
+        self.force = force
     
     def run(self):
         try:
-            total_apks = len(self.apk_paths)
+            # Los splits de una misma aplicación se instalan juntos en una sesión
+            units = group_install_units(self.apk_paths)
+            total_apks = len(units)
             success_count = 0
             failed_apks = []
             successful_apks = []  # ← Lista para los exitosos
+            skipped_apks = []
             
-            for i, apk_path in enumerate(self.apk_paths, 1):
+            if not self.force:
+                self.progress_update.emit("Comprobando aplicaciones instaladas...")
+            installed_state = {} if self.force else self.apk_installer.get_installed_state(self.device_id)
+            
+            pending = []  # (posición en la lista, unidad)
+            for i, unit in enumerate(units, 1):
                 # Verificar si debemos detenernos
                 if not self.is_running():
                     self.finished_signal.emit(False, "Instalación cancelada")
                     return
-                    
-                apk_name = os.path.basename(apk_path)
-                if self.is_running():  # Verificar antes de emitir
-                    self.progress_update.emit(f"Instalando {i}/{total_apks}: {apk_name}...")
-                
-                success, message = self.apk_installer.install_apk(apk_path, self.device_id)
-                
-                if not self.is_running():
-                    self.finished_signal.emit(False, "Instalación cancelada")
-                    return
-                
-                if success:
+                if self.apk_installer.is_already_installed(unit, installed_state, self.device_id):
                     success_count += 1
-                    successful_apks.append(apk_name)
-                    if self.is_running():  # Verificar antes de emitir
-                        self.progress_update.emit(f"{apk_name} instalado correctamente")
+                    skipped_apks.append(unit.name)
                 else:
-                    error_msg = f"{apk_name}: {message}"
-                    failed_apks.append(error_msg)
-                    if self.is_running():  # Verificar antes de emitir
-                        self.progress_update.emit(f"Error en {apk_name}")
-                    continue
+                    pending.append((i, unit))
+            
+            with closing(self._install_units(pending, total_apks)) as results:
+                for unit, success, message in results:
+                    apk_name = unit.name
+                    if not self.is_running():
+                        self.finished_signal.emit(False, "Instalación cancelada")
+                        return
+                    
+                    if success:
+                        success_count += 1
+                        successful_apks.append(apk_name)
+                        if self.is_running():  # Verificar antes de emitir
+                            self.progress_update.emit(f"{apk_name} instalado correctamente")
+                    else:
+                        error_msg = f"{apk_name}: {message}"
+                        failed_apks.append(error_msg)
+                        if self.is_running():  # Verificar antes de emitir
+                            self.progress_update.emit(f"Error en {apk_name}")
+            
+            if not self.is_running():
+                self.finished_signal.emit(False, "Instalación cancelada")
+                return
             
             # Solo emitir si no hemos sido detenidos
             if self.is_running():
-                if success_count == total_apks:
+                if skipped_apks and success_count == total_apks:
+                    result_message = (
+                        f"Todos los {total_apks} APKs están instalados. {len(skipped_apks)} se omitieron "
+                        "porque el dispositivo ya tenía la misma versión y firma:\n" + "\n".join(skipped_apks)
+                    )
+                    self.finished_signal.emit(True, result_message)
+                elif success_count == total_apks:
                     self.finished_signal.emit(True, f"Todos los {total_apks} APKs instalados correctamente. El proceso finalizó sin errores.")
                 elif success_count > 0:
                     result_message = f"{success_count} de {total_apks} APKs instalados correctamente"
                     result_message += f"\n\nAPK(s) instalados:\n" + "\n".join(successful_apks)
+                    if skipped_apks:
+                        result_message += f"\n\nAPK(s) omitidos (ya instalados):\n" + "\n".join(skipped_apks)
                     if failed_apks:
                         result_message += f"\n\nAPK(s) no instalados:\n" + "\n".join(failed_apks)
                     self.finished_signal.emit(False, result_message)
@@ -132,8 +280,207 @@ class InstallationThread(BaseThread):
         except Exception as e:
             if self.is_running():
                 self.finished_signal.emit(False, f"Error general en la instalación: {str(e)}")
+
+    def _install_units(self, pending, total_apks):
+        """
+        Genera (unidad, éxito, mensaje) de cada unidad pendiente. Con varias, la
+        copia de la siguiente se solapa con la instalación de la actual.
+        """
+        positions = {id(unit): i for i, unit in pending}
+
+        def on_install(_, unit):
+            if self.is_running():  # Verificar antes de emitir
+                self.progress_update.emit(f"Instalando {positions[id(unit)]}/{total_apks}: {unit.name}...")
+
+        def progress_factory(unit):
+            action = "Copiando" if len(pending) > 1 else "Instalando"
+            return self._transfer_callback(positions[id(unit)], total_apks, unit.name, action)
+
+        units = [unit for _, unit in pending]
+        if len(units) > 1:
+            yield from InstallPipeline(self.apk_installer, self.device_id).run(units, progress_factory, on_install)
+            return
+        for position, unit in enumerate(units):
+            on_install(position, unit)
+            yield (unit, *self.apk_installer.install_unit(unit, self.device_id, progress_factory(unit)))
+
+    def _transfer_callback(self, index, total_apks, apk_name, action="Instalando"):
+        """Publica el avance en bytes, la velocidad y el tiempo restante del APK actual"""
+        def on_progress(sent, total, rate, eta):
+            if not self.is_running():
+                return
+            self.progress_update.emit(
+                f"{action} {index}/{total_apks}: {apk_name} · {format_transfer_status(sent, total, rate, eta)}"
+            )
+            self.report_progress(int(sent * 100 / total) if total else 100, 100, apk_name)
+        return on_progress
             
+class MultiDeviceInstallationThread(BaseThread):
+    """
+    Instala los mismos APKs en varios dispositivos a la vez.
+
+    Cada dispositivo es un carril: un trabajo del planificador que instala los APKs
+    en orden. Los carriles avanzan en paralelo hasta max_parallel dispositivos y el
+    resultado se agrega por dispositivo y APK.
+    """
+    progress_update = Signal(str)
+    finished_signal = Signal(bool, str)  # Resumen de summarize_install_results
+
+    # El coordinador no ocupa ningún dispositivo ni hilo del pool: solo espera a sus carriles
+    serialize_device = False
+    detached = True
+
+    def __init__(self, apk_installer, apk_paths, device_ids, max_parallel=INSTALL_MAX_PARALLEL_DEVICES, force=False):
+        super().__init__()
+        self.force = force
+        self.apk_installer = apk_installer
+        self.apk_paths = list(apk_paths)
+        self.units = group_install_units(self.apk_paths)
+        self.device_ids = list(device_ids)
+        self.max_parallel = max(1, max_parallel)
+        self.results = {device_id: [] for device_id in self.device_ids}
+        self._completed_apks = 0
+        # Transferencia en curso de cada carril ('dispositivo: APK · avance')
+        self._lane_status = {}
+        self._lock = threading.Lock()
+
+    def run(self):
+        scheduler = get_job_scheduler()
+        pending = list(self.device_ids)
+        finished_lanes = queue.Queue()
+        running = 0
+
+        while pending or running:
+            while pending and running < self.max_parallel and self.is_running():
+                device_id = pending.pop(0)
+                scheduler.submit(Job(
+                    lambda device_id=device_id: self._run_lane(device_id, finished_lanes),
+                    device_id=device_id,
+                    token=self.token,
+                    name=f"Instalación en {device_id}"
+                ))
+                running += 1
+
+            if not running:
+                break  # Cancelado antes de lanzar los carriles restantes
+            finished_lanes.get()
+            running -= 1
+
+        # Dispositivos que no llegaron a empezar por cancelación
+        for device_id in pending:
+            self.results[device_id] = [
+                self._result(unit, False, "Instalación cancelada") for unit in self.units
+            ]
+
+        if self.is_running():
+            success, message = summarize_install_results(self.results)
+            self.finished_signal.emit(success, message)
+
+    def _run_lane(self, device_id, finished_lanes):
+        """Instala todos los APKs en un dispositivo (se ejecuta como trabajo del planificador)"""
+        try:
+            with cancel_scope(self.token):
+                try:
+                    installed_state = {} if self.force else self.apk_installer.get_installed_state(device_id)
+                except OperationCancelled:
+                    self._fail_lane(device_id, "Instalación cancelada")
+                    return
+                except Exception as e:
+                    self._fail_lane(device_id, f"No se pudo consultar el dispositivo: {str(e)}")
+                    return
+
+                for unit in self.units:
+                    if not self.is_running():
+                        self.results[device_id].append(self._result(unit, False, "Instalación cancelada"))
+                        continue
+                    try:
+                        if self.apk_installer.is_already_installed(unit, installed_state, device_id):
+                            success, message = True, "Ya instalado con la misma versión y firma (omitido)"
+                        else:
+                            success, message = self.apk_installer.install_unit(
+                                unit, device_id, self._lane_transfer_callback(device_id, unit)
+                            )
+                    except OperationCancelled:
+                        success, message = False, "Instalación cancelada"
+                    except Exception as e:
+                        success, message = False, f"Error inesperado: {str(e)}"
+                    self.results[device_id].append(self._result(unit, success, message))
+                    self._report_lane_progress(device_id)
+        finally:
+            finished_lanes.put(device_id)
+
+    def _fail_lane(self, device_id, message):
+        """Marca como fallidas todas las unidades de un carril que no pudo empezar"""
+        for unit in self.units:
+            self.results[device_id].append(self._result(unit, False, message))
+            self._report_lane_progress(device_id)
+
+    @staticmethod
+    def _result(unit, success, message):
+        return {'apk_name': unit.name, 'success': success, 'message': message}
+
+    def _lane_transfer_callback(self, device_id, unit):
+        """Publica el avance en bytes de la transferencia del carril junto al de los demás"""
+        def on_progress(sent, total, rate, eta):
+            if not self.is_running():
+                return
+            with self._lock:
+                self._lane_status[device_id] = (
+                    f"{device_id}: {unit.name} · {format_transfer_status(sent, total, rate, eta)}"
+                )
+            self._emit_lane_status()
+        return on_progress
+
+    def _report_lane_progress(self, device_id):
+        total = len(self.units) * len(self.device_ids)
+        with self._lock:
+            self._completed_apks += 1
+            completed = self._completed_apks
+            self._lane_status.pop(device_id, None)
+        self.report_progress(completed, total, self._progress_header(completed, total))
+        self._emit_lane_status()
+
+    def _progress_header(self, completed, total):
+        return f"Instalando en {len(self.device_ids)} dispositivos: {completed}/{total} instalaciones procesadas"
+
+    def _emit_lane_status(self):
+        """Resumen global seguido de una línea por carril que está transfiriendo"""
+        with self._lock:
+            lines = [self._progress_header(self._completed_apks, len(self.units) * len(self.device_ids))]
+            lines += [self._lane_status[device_id] for device_id in self.device_ids if device_id in self._lane_status]
+        if self.is_running():
+            self.progress_update.emit("\n".join(lines))
+
+
+def summarize_install_results(results):
+    """
+    Resume los resultados agregados por dispositivo y APK.
+
+    Returns:
+        tuple: (todo_correcto, mensaje)
+    """
+    lines = []
+    failures = []
+    devices_ok = 0
+    for device_id, device_results in results.items():
+        installed = sum(1 for result in device_results if result['success'])
+        if device_results and installed == len(device_results):
+            devices_ok += 1
+        lines.append(f"{device_id}: {installed}/{len(device_results)} APK(s) instalados")
+        failures.extend(
+            f"{device_id} · {result['apk_name']}: {result['message']}"
+            for result in device_results if not result['success']
+        )
+
+    all_ok = devices_ok == len(results) and bool(results)
+    message = f"Instalación completada en {devices_ok} de {len(results)} dispositivos."
+    message += "\n\n" + "\n".join(lines)
+    if failures:
+        message += "\n\nErrores:\n" + "\n".join(failures)
+    return all_ok, message
+
 class AppsLoadingThread(BaseThread):
+    cached_signal = Signal(dict)  # inventario guardado, antes de revalidar
     finished_signal = Signal(dict)
     
     def __init__(self, app_manager, device_id, app_type="all"):
@@ -146,6 +493,11 @@ class AppsLoadingThread(BaseThread):
         try:
             if not self.is_running():
                 return
+
+            # Mostrar primero la caché y revalidar después contra el dispositivo
+            cached = self.app_manager.get_cached_apps(self.device_id, self.app_type)
+            if cached and self.is_running():
+                self.cached_signal.emit(cached)
                 
             result = self.app_manager.get_installed_apps_by_type(self.device_id, self.app_type)
             
@@ -162,7 +514,45 @@ class AppsLoadingThread(BaseThread):
                     }
                 })
 
+class AppsSearchThread(BaseThread):
+    """
+    Busca en el índice de aplicaciones fuera del hilo de la interfaz y calcula qué
+    filas hay que quitar, reordenar o añadir a las visibles (ViewDiff).
+    """
+    priority = JobPriority.HIGH
+    serialize_device = False
+    finished_signal = Signal(int, object)  # search_id, ViewDiff
+    index_synced = Signal(object)  # Inventario con el que quedó actualizado el índice
+
+    def __init__(self, search_id, search_index, query, source_rows, visible_rows, apps=None):
+        super().__init__()
+        self.search_id = search_id
+        self.search_index = search_index
+        self.query = query
+        self.source_rows = source_rows
+        self.visible_rows = visible_rows
+        # Inventario nuevo con el que actualizar el índice antes de buscar
+        self.apps = apps
+
+    def run(self):
+        if self.apps is not None:
+            self.search_index.sync(self.apps)
+            # Aunque la búsqueda se cancele ya, el índice quedó al día
+            self.index_synced.emit(self.apps)
+        if not self.is_running():
+            return
+
+        ranked = self.search_index.search(self.query)
+        if ranked is None:
+            rows = list(range(len(self.source_rows)))
+        else:
+            rows = [self.source_rows[name] for name in ranked if name in self.source_rows]
+
+        if self.is_running():
+            self.finished_signal.emit(self.search_id, diff_view_rows(self.visible_rows, rows))
+
 class DevicesScanThread(BaseThread):
+    priority = JobPriority.HIGH
     finished_signal = Signal(dict)
     error_signal = Signal(str)
     
@@ -189,6 +579,8 @@ class DevicesScanThread(BaseThread):
                 self.error_signal.emit(f"Error al escanear dispositivos: {str(e)}")
 
 class DeviceDetailsThread(BaseThread):
+    priority = JobPriority.HIGH
+    serialize_device = False  # Solo lectura: no espera a las operaciones del dispositivo
     finished_signal = Signal(dict)  # device_info
     error_signal = Signal(str)
     
@@ -211,7 +603,35 @@ class DeviceDetailsThread(BaseThread):
             if self.is_running():
                 self.error_signal.emit(f"Error al obtener detalles: {str(e)}")
 
+class StartupCacheThread(BaseThread):
+    """
+    Carga la configuración y prepara las cachés (inventario e íconos) mientras el
+    hilo de la interfaz construye la ventana y ADB arranca su servidor.
+    """
+    priority = JobPriority.HIGH
+    finished_signal = Signal()
+
+    def __init__(self, config_manager, inventory_store, icon_cache):
+        super().__init__()
+        self.config_manager = config_manager
+        self.inventory_store = inventory_store
+        self.icon_cache = icon_cache
+
+    def run(self):
+        try:
+            self.config_manager.load()
+            if self.is_running():
+                self.inventory_store.prepare()
+            if self.is_running():
+                self.icon_cache.preload()
+        except Exception as e:
+            print_in_debug_mode(f"Error preparando las cachés del arranque: {e}")
+        finally:
+            if self.is_running():
+                self.finished_signal.emit()
+
 class ADBCheckThread(BaseThread):
+    priority = JobPriority.HIGH
     finished_signal = Signal(bool, str)  # success, message
     error_signal = Signal(str)
     
@@ -238,8 +658,9 @@ class ADBCheckThread(BaseThread):
             if self.is_running():
                 self.error_signal.emit(f"Error verificando ADB: {str(e)}")
 
-class CustomADBThread(QThread):
-    """Thread para configurar ADB personalizado sin bloquear la interfaz"""
+class CustomADBThread(BaseThread):
+    """Configura un ADB personalizado sin bloquear la interfaz"""
+    priority = JobPriority.HIGH
     
     finished_signal = Signal(bool, str)  # success, message
     error_signal = Signal(str)  # error_message
@@ -255,4 +676,4 @@ class CustomADBThread(QThread):
             success, message = self.adb_manager.set_custom_adb_path(self.folder_path)
             self.finished_signal.emit(success, message)
         except Exception as e:
-            self.error_signal.emit(str(e))
\ No newline at end of file
+            self.error_signal.emit(str(e))
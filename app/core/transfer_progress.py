@@ -0,0 +1,98 @@
+import time
+from app.constants.config import INSTALL_BASE_TIMEOUT, INSTALL_MIN_TRANSFER_RATE
+
+# Intervalo mínimo entre dos notificaciones de progreso (segundos)
+PROGRESS_INTERVAL = 0.25
+# Peso de la última muestra en la velocidad suavizada
+RATE_SMOOTHING = 0.3
+
+
+def format_size(size):
+    """1536 -> '1.5 KB'"""
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def format_duration(seconds):
+    seconds = int(seconds)
+    if seconds < 60:
+        return f"{seconds} s"
+    minutes, seconds = divmod(seconds, 60)
+    return f"{minutes} min {seconds:02d} s"
+
+
+def format_transfer_status(sent, total, rate, eta):
+    """'512.0 MB de 1.5 GB · 35.2 MB/s · 30 s restantes'"""
+    status = f"{format_size(sent)} de {format_size(total)}"
+    if rate > 0:
+        status += f" · {format_size(rate)}/s"
+    if eta >= 0 and sent < total:
+        status += f" · {format_duration(eta)} restantes"
+    return status
+
+
+def estimate_transfer_timeout(size, rate=None):
+    """
+    Timeout para enviar 'size' bytes: margen fijo más el tiempo de transferencia a
+    la mitad de la velocidad medida (o a la mínima supuesta si aún no se midió).
+    """
+    rate = rate / 2 if rate else INSTALL_MIN_TRANSFER_RATE
+    return INSTALL_BASE_TIMEOUT + size / max(rate, 1)
+
+
+class TransferProgress:
+    """
+    Acumula los bytes enviados de una transferencia y calcula velocidad y ETA.
+
+    callback(enviados, total, bytes_por_segundo, segundos_restantes) se llama como
+    mucho cada PROGRESS_INTERVAL segundos y siempre al completar la transferencia.
+    """
+
+    def __init__(self, total, callback=None):
+        self.total = total
+        self.sent = 0
+        self.callback = callback
+        self.started_at = time.monotonic()
+        self.rate = 0.0
+        self._last_time = self.started_at
+        self._last_sent = 0
+
+    def advance(self, size):
+        self.sent += size
+        now = time.monotonic()
+        elapsed = now - self._last_time
+        if elapsed < PROGRESS_INTERVAL and self.sent < self.total:
+            return
+
+        sample = (self.sent - self._last_sent) / elapsed if elapsed > 0 else 0.0
+        self.rate = sample if not self.rate else RATE_SMOOTHING * sample + (1 - RATE_SMOOTHING) * self.rate
+        self._last_time, self._last_sent = now, self.sent
+        if self.callback:
+            self.callback(self.sent, self.total, self.rate, self.eta())
+
+    def eta(self):
+        """Segundos restantes estimados (-1 si aún no se conoce la velocidad)"""
+        if not self.rate:
+            return -1.0
+        return max(self.total - self.sent, 0) / self.rate
+
+    def average_rate(self):
+        """Velocidad media de toda la transferencia en bytes/s"""
+        elapsed = time.monotonic() - self.started_at
+        return self.sent / elapsed if elapsed > 0 else 0.0
+
+
+class ProgressReader:
+    """Envuelve un objeto binario y notifica a TransferProgress cada bloque leído"""
+
+    def __init__(self, stream, progress):
+        self._stream = stream
+        self._progress = progress
+
+    def read(self, size=-1):
+        chunk = self._stream.read(size)
+        if chunk:
+            self._progress.advance(len(chunk))
+        return chunk
@@ -176,7 +176,7 @@ class AppTheme:
             }}
             
             /* ===== LISTAS ===== */
-            QListWidget#list_main_widget {{
+            QListView#list_main_widget {{
                 background-color: {colors['window']};
                 color: {colors['text']};
                 border: 1px solid {colors['border']};
@@ -186,44 +186,44 @@ class AppTheme:
                 font-size: 12px;
             }}
 
-            QListWidget#list_main_widget:disabled {{
+            QListView#list_main_widget:disabled {{
                 background-color: {colors['window']};
                 color: {colors['text_disabled']};
                 border: 1px solid {colors['border_disabled']};
             }}
 
-            QListWidget#list_main_widget::item {{
+            QListView#list_main_widget::item {{
                 padding: 8px;
                 border-bottom: 1px solid {colors['border']};
                 background-color: {colors['unselected_item']};
             }}
 
-            QListWidget#list_main_widget::item:disabled {{
+            QListView#list_main_widget::item:disabled {{
                 color: {colors['text_disabled']};
                 background-color: transparent;
                 border-bottom: 1px solid {colors['border_disabled']};
             }}
 
-            QListWidget#list_main_widget::item:selected {{
+            QListView#list_main_widget::item:selected {{
                 background-color: {colors['selected_item']};
                 color: {colors['text']};
                 border-radius: 3px;
                 border-bottom: 1px solid {colors['selected_item']};
             }}
 
-            QListWidget#list_main_widget::item:selected:disabled {{
+            QListView#list_main_widget::item:selected:disabled {{
                 background-color: {colors['selected_item_disabled']};
                 color: {colors['text_disabled']};
                 border-bottom: 1px solid {colors['border_disabled']};
             }}
 
-            QListWidget#list_main_widget::item:hover {{
+            QListView#list_main_widget::item:hover {{
                 background-color: {colors['unselected_item_hover']};
                 border-radius: 3px;
                 border-bottom: 1px solid {colors['unselected_item_hover']};
             }}
             
-            QListWidget#list_main_widget::item:selected:hover {{
+            QListView#list_main_widget::item:selected:hover {{
                 background-color: {colors['selected_item_hover']};
                 border-bottom: 1px solid {colors['selected_item_hover']};
             }}
@@ -552,6 +552,46 @@ class AppTheme:
                 background-color: {colors['highlight_disabled']};
             }}
             
+            /* ===== CHECKBOXES ===== */
+            QCheckBox#checkbox_default {{
+                color: {colors['text']};
+                background-color: transparent;
+                spacing: 8px;
+                font-size: 11px;
+                padding: 4px;
+            }}
+            
+            QCheckBox#checkbox_default::indicator {{
+                width: 14px;
+                height: 14px;
+                border-radius: 3px;
+                border: 2px solid {colors['border']};
+                background-color: {colors['window']};
+            }}
+            
+            QCheckBox#checkbox_default::indicator:hover {{
+                border: 2px solid {colors['highlight']};
+            }}
+            
+            QCheckBox#checkbox_default::indicator:checked {{
+                border: 2px solid {colors['highlight']};
+                background-color: {colors['highlight']};
+            }}
+            
+            QCheckBox#checkbox_default:disabled {{
+                color: {colors['text_disabled']};
+            }}
+            
+            QCheckBox#checkbox_default::indicator:disabled {{
+                border: 2px solid {colors['border_disabled']};
+                background-color: {colors['window']};
+            }}
+            
+            QCheckBox#checkbox_default::indicator:disabled:checked {{
+                border: 2px solid {colors['highlight_disabled']};
+                background-color: {colors['highlight_disabled']};
+            }}
+            
             /* ===== ESTILOS DE ESTADO ===== */
             QLabel#status_success_message {{
                 background-color: {colors['status_success_message']};
@@ -73,6 +73,18 @@ def get_subprocess_kwargs(timeout=10, encoding="utf-8", errors="replace") -> dic
 
     return kwargs
 
+def get_popen_kwargs() -> dict:
+    """
+    Devuelve los kwargs que se deben pasar a subprocess.Popen para procesos
+    de larga duración (sin captura automática ni timeout).
+    """
+    kwargs = {}
+
+    if PLATFORM == Platform.WIN32:
+        kwargs["creationflags"] = subprocess.CREATE_NO_WINDOW
+
+    return kwargs
+
 def resource_path(relative_path):
     """Devuelve la ruta absoluta de un asset, según si estamos en PyInstaller o en desarrollo."""
     # print_in_debug_mode(f"[resource_path] Solicitado: {relative_path}")
@@ -0,0 +1,182 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QGuiApplication, QIcon, QImage, QPainter, QPixmap
+from PySide6.QtSvg import QSvgRenderer
+from app.constants.config import CONFIG_DIR_NAME, ICON_CACHE_DIR_NAME, ICON_CACHE_MAX_ENTRIES, ICON_CACHE_PERSIST
+from app.utils.helpers import resource_path
+from app.utils.print_in_debug_mode import print_in_debug_mode
+
+
+class IconCache:
+    """
+    Íconos de la interfaz rasterizados una sola vez por tamaño y escala de pantalla.
+
+    Las imágenes se guardan en memoria (las usadas hace más tiempo se descartan al
+    superar max_entries) y, si persist es True, también en disco como PNG: en los
+    siguientes arranques se cargan de ahí sin volver a interpretar el SVG. El nombre
+    del PNG incluye el tamaño y la fecha del archivo original, así que un ícono
+    modificado se vuelve a rasterizar.
+    """
+
+    def __init__(self, max_entries=ICON_CACHE_MAX_ENTRIES, persist=ICON_CACHE_PERSIST, cache_dir=None):
+        self.max_entries = max_entries
+        self.persist = persist
+        self.cache_dir = Path(cache_dir) if cache_dir else Path.home() / CONFIG_DIR_NAME / ICON_CACHE_DIR_NAME
+        self._pixmaps = OrderedDict()  # (ruta, ancho, alto, escala) -> QPixmap
+        self._icons = OrderedDict()    # (ruta, ancho, alto, escala) -> QIcon
+        self._preloaded = {}           # PNG del disco -> QImage ya decodificada (ver preload)
+        self._lock = threading.Lock()
+
+    def pixmap(self, icon_path, width, height=None, scale=None):
+        """
+        QPixmap de un ícono de assets ('assets/icons/x.svg') que ocupa width x height
+        píxeles lógicos (conserva la proporción si es una imagen de mapa de bits)
+        """
+        height = height or width
+        scale = scale or self._screen_scale()
+        key = (icon_path, width, height, scale)
+        with self._lock:
+            pixmap = self._pixmaps.get(key)
+            if pixmap is not None:
+                self._pixmaps.move_to_end(key)
+                return pixmap
+
+        image = self._rasterize(icon_path, width, height, scale)
+        pixmap = QPixmap.fromImage(image)
+        pixmap.setDevicePixelRatio(scale)
+        with self._lock:
+            self._remember(self._pixmaps, key, pixmap)
+        return pixmap
+
+    def icon(self, icon_path, size, scale=None):
+        """QIcon cuadrado de size píxeles lógicos para botones y elementos de listas"""
+        scale = scale or self._screen_scale()
+        key = (icon_path, size, size, scale)
+        with self._lock:
+            icon = self._icons.get(key)
+            if icon is not None:
+                self._icons.move_to_end(key)
+                return icon
+        icon = QIcon(self.pixmap(icon_path, size, size, scale))
+        with self._lock:
+            self._remember(self._icons, key, icon)
+        return icon
+
+    def preload(self):
+        """
+        Decodifica los PNG guardados en disco (los más recientes, hasta max_entries).
+        Se puede llamar desde otro hilo: solo crea QImage, no QPixmap.
+        """
+        if not self.persist:
+            return 0
+        try:
+            paths = sorted(self.cache_dir.glob("*.png"), key=lambda path: path.stat().st_mtime, reverse=True)
+        except OSError:
+            return 0
+        images = {}
+        for path in paths[:self.max_entries]:
+            image = QImage(str(path))
+            if not image.isNull():
+                images[path] = image
+        with self._lock:
+            for path, image in images.items():
+                self._preloaded.setdefault(path, image)
+        return len(images)
+
+    def clear(self):
+        with self._lock:
+            self._pixmaps.clear()
+            self._icons.clear()
+            self._preloaded.clear()
+
+    def _remember(self, entries, key, value):
+        entries[key] = value
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+
+    @staticmethod
+    def _screen_scale():
+        screen = QGuiApplication.primaryScreen()
+        return screen.devicePixelRatio() if screen else 1.0
+
+    def _rasterize(self, icon_path, width, height, scale):
+        source = resource_path(icon_path)
+        pixel_width, pixel_height = round(width * scale), round(height * scale)
+        disk_path = self._disk_path(source, pixel_width, pixel_height)
+
+        if disk_path is not None:
+            with self._lock:
+                image = self._preloaded.pop(disk_path, None)
+            if image is not None:
+                return image
+
+        if disk_path is not None and disk_path.is_file():
+            image = QImage(str(disk_path))
+            if not image.isNull():
+                return image
+
+        if source.lower().endswith('.svg'):
+            image = QImage(pixel_width, pixel_height, QImage.Format.Format_ARGB32_Premultiplied)
+            image.fill(Qt.GlobalColor.transparent)
+            painter = QPainter(image)
+            QSvgRenderer(source).render(painter)
+            painter.end()
+        else:
+            image = QImage(source)
+            if not image.isNull():
+                image = image.scaled(
+                    pixel_width, pixel_height,
+                    Qt.AspectRatioMode.KeepAspectRatio,
+                    Qt.TransformationMode.SmoothTransformation
+                )
+
+        if disk_path is not None and not image.isNull():
+            self._save(image, disk_path)
+        return image
+
+    def _disk_path(self, source, pixel_width, pixel_height):
+        if not self.persist:
+            return None
+        try:
+            stat = os.stat(source)
+        except OSError:
+            return None
+        key = f"{os.path.abspath(source)}|{stat.st_size}|{stat.st_mtime_ns}|{pixel_width}x{pixel_height}"
+        name = os.path.splitext(os.path.basename(source))[0]
+        return self.cache_dir / f"{name}-{pixel_width}x{pixel_height}-{hashlib.sha1(key.encode()).hexdigest()[:16]}.png"
+
+    @staticmethod
+    def _save(image, disk_path):
+        """Guarda el PNG de forma atómica (otro proceso podría estar leyéndolo)"""
+        partial = disk_path.with_name(f"{disk_path.name}.{os.getpid()}.part")
+        try:
+            disk_path.parent.mkdir(parents=True, exist_ok=True)
+            if image.save(str(partial), "PNG"):
+                os.replace(partial, disk_path)
+                # Versiones anteriores del mismo ícono (el original cambió)
+                prefix = disk_path.name.rsplit('-', 1)[0]
+                for stale in disk_path.parent.glob(f"{prefix}-*.png"):
+                    if stale != disk_path:
+                        stale.unlink(missing_ok=True)
+        except OSError as e:
+            print_in_debug_mode(f"No se pudo guardar el ícono {disk_path.name}: {e}")
+        finally:
+            if partial.exists():
+                partial.unlink(missing_ok=True)
+
+
+_icon_cache = None
+_icon_cache_lock = threading.Lock()
+
+
+def get_icon_cache():
+    """Devuelve la caché de íconos compartida por todas las vistas"""
+    global _icon_cache
+    with _icon_cache_lock:
+        if _icon_cache is None:
+            _icon_cache = IconCache()
+        return _icon_cache
@@ -0,0 +1,209 @@
+import importlib.abc
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from app.constants.config import STARTUP_PROFILE, STARTUP_PROFILE_TOP
+from app.utils.print_in_debug_mode import print_in_debug_mode
+
+# Momento en que se importó este módulo: main.py lo importa antes que la interfaz
+_PROCESS_START = time.perf_counter()
+
+
+class _TimedLoader:
+    """Envuelve el loader de un módulo para medir cuánto tarda en cargarse"""
+
+    def __init__(self, profiler, spec, loader):
+        self._profiler = profiler
+        self._spec = spec
+        self._loader = loader
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        self._profiler.enter(spec.name)
+        try:
+            return self._loader.create_module(spec)
+        except BaseException:
+            self._profiler.leave(spec.name)
+            raise
+
+    def exec_module(self, module):
+        # El módulo queda con su loader real (hay librerías que lo consultan)
+        self._spec.loader = self._loader
+        module.__loader__ = self._loader
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler.leave(self._spec.name)
+
+
+class ImportProfiler(importlib.abc.MetaPathFinder):
+    """
+    Tiempo de importación de cada módulo, como 'python -X importtime': propio (sin
+    contar los módulos que importa) y acumulado (contándolos).
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._imports = []  # (módulo, propio ms, acumulado ms)
+
+    def install(self):
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, fullname, path=None, target=None):
+        if getattr(self._local, 'finding', False):
+            return None
+        self._local.finding = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, 'find_spec'):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._local.finding = False
+
+        loader = spec.loader
+        if loader is None or not hasattr(loader, 'exec_module') or not hasattr(loader, 'create_module'):
+            return spec
+        spec.loader = _TimedLoader(self, spec, loader)
+        return spec
+
+    def enter(self, name):
+        stack = self._stack()
+        stack.append([name, time.perf_counter(), 0.0])
+
+    def leave(self, name):
+        stack = self._stack()
+        if not stack or stack[-1][0] != name:
+            return
+        _, start, children = stack.pop()
+        total = (time.perf_counter() - start) * 1000
+        if stack:
+            stack[-1][2] += total
+        with self._lock:
+            self._imports.append((name, total - children, total))
+
+    def imports(self):
+        with self._lock:
+            return list(self._imports)
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+
+class StartupMetrics:
+    """
+    Hitos del arranque en milisegundos desde que empezó el proceso
+    ('window_built', 'adb_ready', 'first_device_list', 'window_shown'...).
+    Cada hito se registra una sola vez.
+
+    También guarda cuánto tardó cada construcción medida con measure() y, si se
+    activa el perfil de arranque, cuánto tardó en importarse cada módulo.
+    """
+
+    def __init__(self, start=None):
+        self._start = _PROCESS_START if start is None else start
+        self._marks = {}
+        self._durations = []  # (nombre, ms)
+        self._profiler = None
+        self._lock = threading.Lock()
+
+    def mark(self, name):
+        """Registra un hito (si no se había registrado ya) y devuelve su tiempo en ms"""
+        elapsed = self.elapsed_ms()
+        with self._lock:
+            if name in self._marks:
+                return self._marks[name]
+            self._marks[name] = elapsed
+        print_in_debug_mode(f"[arranque] {name}: {elapsed:.0f} ms")
+        return elapsed
+
+    def get(self, name):
+        with self._lock:
+            return self._marks.get(name)
+
+    def marks(self):
+        with self._lock:
+            return dict(self._marks)
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self._start) * 1000
+
+    @contextmanager
+    def measure(self, name):
+        """Mide lo que tarda el bloque ('sección install', 'diálogo AboutDialog'...)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            with self._lock:
+                self._durations.append((name, elapsed))
+            print_in_debug_mode(f"[arranque] {name}: {elapsed:.1f} ms")
+
+    def durations(self):
+        with self._lock:
+            return list(self._durations)
+
+    def start_import_profile(self):
+        """Empieza a medir las importaciones (las anteriores a esta llamada no se ven)"""
+        with self._lock:
+            if self._profiler is None:
+                self._profiler = ImportProfiler()
+                self._profiler.install()
+
+    def imports(self):
+        """(módulo, propio ms, acumulado ms) de cada módulo importado mientras se medía"""
+        with self._lock:
+            profiler = self._profiler
+        return profiler.imports() if profiler else []
+
+    def report(self, top=STARTUP_PROFILE_TOP):
+        """
+        Deja de medir las importaciones y muestra el perfil de arranque: hitos,
+        construcciones y los módulos que más tardaron en importarse.
+        """
+        with self._lock:
+            profiler = self._profiler
+        if profiler:
+            profiler.uninstall()
+
+        lines = ["[arranque] Perfil de arranque"]
+        lines += [f"  {name:<28} {elapsed:8.0f} ms" for name, elapsed in self.marks().items()]
+        durations = self.durations()
+        if durations:
+            lines.append("  Construcción:")
+            lines += [f"    {name:<26} {elapsed:8.1f} ms" for name, elapsed in durations]
+        imports = sorted(self.imports(), key=lambda item: item[2], reverse=True)
+        if imports:
+            lines.append(f"  Importaciones ({len(imports)} módulos, propio | acumulado):")
+            lines += [
+                f"    {name:<40} {own:8.1f} | {total:8.1f} ms" for name, own, total in imports[:top]
+            ]
+        print_in_debug_mode("\n".join(lines))
+        return lines
+
+
+_startup_metrics = StartupMetrics()
+if STARTUP_PROFILE:
+    _startup_metrics.start_import_profile()
+
+
+def get_startup_metrics():
+    """Devuelve los hitos del arranque de este proceso"""
+    return _startup_metrics
@@ -1,9 +1,8 @@
 from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, 
                             QPushButton, QFrame)
-from PySide6.QtSvgWidgets import QSvgWidget
 from PySide6.QtCore import Qt, QTimer
 from app.utils.print_in_debug_mode import print_in_debug_mode
-from app.utils.helpers import resource_path
+from app.utils.icon_cache import get_icon_cache
 from app.theme.dialog_theme import DialogTheme
 from app.constants.labels import APP_DESCRIPTION
 from app.constants.config import APP_DISPLAY_NAME, APP_VERSION, APP_REPOSITORY_URL, APP_TUTORIAL_URL
@@ -114,7 +113,8 @@ class AboutDialog(QDialog):
         repo_layout.setSpacing(12)
         
         # Icono del repositorio
-        self.repo_icon = QSvgWidget(resource_path("assets/icons/folder-yellow.svg"))
+        self.repo_icon = QLabel()
+        self.repo_icon.setPixmap(get_icon_cache().pixmap("assets/icons/folder-yellow.svg", 16))
         self.repo_icon.setFixedSize(16, 16)
         
         # Texto del repositorio
@@ -153,7 +153,8 @@ class AboutDialog(QDialog):
         tutorial_layout.setContentsMargins(16, 8, 16, 8)
         tutorial_layout.setSpacing(12)
         
-        self.tutorial_icon = QSvgWidget(resource_path("assets/icons/book-green.svg"))
+        self.tutorial_icon = QLabel()
+        self.tutorial_icon.setPixmap(get_icon_cache().pixmap("assets/icons/book-green.svg", 16))
         self.tutorial_icon.setFixedSize(16, 16)
 
         tutorial_text_layout = QVBoxLayout()
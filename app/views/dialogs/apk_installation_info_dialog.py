@@ -70,7 +70,12 @@ class ApkInstallationInfoDialog(QDialog):
 
         Si intentas instalar un <b style="color: #4DBD8B;">Split APK</b> en un dispositivo que no 
         coincide exactamente en todas estas características, la instalación fallará
-        o la aplicación no funcionará correctamente aunque se instale.
+        o la aplicación no funcionará correctamente aunque se instale.<br><br>
+
+        Para instalar una aplicación dividida agrega <b style="color: #4DBD8B;">todos sus archivos</b> a la vez
+        (el <b style="color: #4DBD8B;">base.apk</b> junto a sus <b style="color: #4DBD8B;">split_*.apk</b>) o directamente el archivo
+        <b style="color: #4DBD8B;">.apks</b> o <b style="color: #4DBD8B;">.xapk</b>. Se instalarán juntos en una sola operación
+        y aparecerán marcados con 🧩 en la lista.
         """
         
         split_label = QLabel(split_content)
@@ -2,29 +2,38 @@ from PySide6.QtWidgets import (QMainWindow, QVBoxLayout, QHBoxLayout,
                              QPushButton, 
                              QWidget, QMessageBox,
                              QStackedWidget)
-from PySide6.QtCore import QTimer, Qt
+from PySide6.QtCore import QTimer, Qt, Signal
 from PySide6.QtGui import QFont
-from app.core.apk_installer import APKInstaller
 from app.core.device_manager import DeviceManager
 from app.core.adb_manager import ADBManager
 from app.core.config_manager import ConfigManager
 from app.core.app_manager import AppManager
+from app.core.job_scheduler import get_job_scheduler
+from app.core.threads import StartupCacheThread
+from app.utils.icon_cache import get_icon_cache
 from app.utils.print_in_debug_mode import print_in_debug_mode
-from ..theme.app_theme import AppTheme
+from app.utils.startup_metrics import get_startup_metrics
 from app.views.ui_devices_panel import UIDevicePanel
 from app.views.ui_install_section import UIInstallSection
 from app.views.ui_apps_section import UIAppsSection
 from app.views.ui_config_section import UIConfigSection
 
 class MainWindow(QMainWindow, UIDevicePanel, UIInstallSection, UIAppsSection, UIConfigSection):
+    # Se emite una vez, con la configuración y las cachés cargadas y la primera lista
+    # de dispositivos mostrada (o ADB no disponible)
+    startup_ready = Signal()
+    # Secciones en el orden del QStackedWidget
+    SECTION_NAMES = ('install', 'apps', 'config')
     
     def __init__(self):
         super().__init__()
-        self.config_manager = ConfigManager()
+        # config.json se lee en segundo plano (StartupCacheThread) o en el primer getter
+        self.config_manager = ConfigManager(load=False)
         self.adb_manager = ADBManager(self.config_manager)
         self.device_manager = DeviceManager(self.adb_manager)
         self.app_manager = AppManager(self.adb_manager) 
-        self.apk_installer = APKInstaller(self.adb_manager)
+        # Solo lo usa la sección de instalación: se crea al construirla (build_section)
+        self.apk_installer = None
         self.selected_apks = []
         self.selected_device = None
         self.preselected_device = None
@@ -34,7 +43,6 @@ class MainWindow(QMainWindow, UIDevicePanel, UIInstallSection, UIAppsSection, UI
         self.last_section_index = None
         self.app_list_update_attempts = 0
         self.all_apps_data = []  # Almacenará todas las aplicaciones cargadas
-        self.filtered_apps_data = []  # Aplicaciones filtradas
         self.current_section = None  # Puede ser: 'install', 'apps', 'config'
         self.adb_available = False  # Variable de estado ADB
         self.devices_data = [] # Lista de dispositivos en crudo. No es la lista que se muetra en la interfaz
@@ -42,11 +50,38 @@ class MainWindow(QMainWindow, UIDevicePanel, UIInstallSection, UIAppsSection, UI
         self.active_threads = []
         self.cleaning_up = False
         self.selected_device_info = {}
-        self.init_ui()
-        # Solo al iniciar, verificar ADB y cargar dispositivos después
-        self.check_adb_availability_async(load_devices=True)
+        self._startup_pending = True
+        self._startup_waiting = {'caches', 'devices'}
+        # Configuración y cachés se cargan a la vez que se construye la interfaz
+        self.startup_cache_thread = StartupCacheThread(
+            self.config_manager, self.app_manager.inventory_store, get_icon_cache()
+        )
+        self.register_thread(self.startup_cache_thread)
+        self.startup_cache_thread.finished_signal.connect(lambda: self.notify_startup_ready("caches_ready"))
+        self.startup_cache_thread.start()
+        # Verificar ADB (y arrancar su servidor) mientras se construye la interfaz; los
+        # dispositivos se cargan en cuanto termina, sin esperas fijas
+        self.check_adb_availability_async(load_devices=True, delay_ms=0)
+        with get_startup_metrics().measure("interfaz principal"):
+            self.init_ui()
+        get_startup_metrics().mark("window_built")
+
+    def notify_startup_ready(self, milestone):
+        """
+        Registra un hito del arranque ('caches_ready' o el de la primera lista de
+        dispositivos) y avisa una sola vez, cuando ya están los dos
+        """
+        if not self._startup_pending:
+            return
+        get_startup_metrics().mark(milestone)
+        self._startup_waiting.discard('caches' if milestone == "caches_ready" else 'devices')
+        if self._startup_waiting:
+            return
+        self._startup_pending = False
+        self.startup_ready.emit()
 
     def setup_styles(self):
+        from ..theme.app_theme import AppTheme
         AppTheme.setup_app_palette(self)
         self.styles = AppTheme.get_app_styles()
         self.setStyleSheet(self.styles)
@@ -99,6 +134,19 @@ class MainWindow(QMainWindow, UIDevicePanel, UIInstallSection, UIAppsSection, UI
         
         # Detener threads de ESTA aplicación
         self.stop_all_threads()
+
+        # Cancelar los trabajos que aún esperan en la cola
+        get_job_scheduler().shutdown()
+
+        # Detener el seguimiento de dispositivos
+        self.adb_manager.device_tracker.stop()
+        self.adb_manager.device_tracker.wait(2000)
+
+        # Cerrar las sesiones de shell persistentes y sockets abiertos
+        self.adb_manager.close_connections()
+
+        # Escribir los cambios de configuración que aún no se guardaron
+        self.config_manager.flush()
         
         # Cerrar servidor ADB
         # self.adb_manager.kill_adb_server()
@@ -121,9 +169,7 @@ class MainWindow(QMainWindow, UIDevicePanel, UIInstallSection, UIAppsSection, UI
                     
                     # Esperar con timeout
                     if not thread.wait(2000):
-                        print_in_debug_mode(f"Thread {thread.__class__.__name__} no respondió, terminando...")
-                        thread.terminate()
-                        thread.wait(1000)  # Esperar después de terminar
+                        print_in_debug_mode(f"Thread {thread.__class__.__name__} no respondió a tiempo")
                         
                     self.unregister_thread(thread)  # Asegurar desregistro
                     
@@ -133,6 +179,23 @@ class MainWindow(QMainWindow, UIDevicePanel, UIInstallSection, UIAppsSection, UI
         # Limpiar cualquier thread restante
         self.active_threads.clear()
     
+    def stop_threads(self, thread_classes=None, device_id=None):
+        """
+        Cancela sin esperar los threads activos que coincidan con los tipos y/o el
+        dispositivo indicados. Sus comandos adb en curso se terminan al instante.
+        """
+        if thread_classes is not None and not isinstance(thread_classes, (list, tuple)):
+            thread_classes = [thread_classes]
+
+        for thread in self.active_threads.copy():
+            if thread_classes is not None and not isinstance(thread, tuple(thread_classes)):
+                continue
+            if device_id is not None and getattr(thread, 'device_id', None) != device_id:
+                continue
+            if thread.isRunning() and hasattr(thread, 'stop'):
+                print_in_debug_mode(f"Cancelando thread: {thread.__class__.__name__}")
+                thread.stop()
+
     def register_thread(self, thread):
         """
         Registra un thread para poder gestionarlo al cerrar
@@ -161,7 +224,7 @@ class MainWindow(QMainWindow, UIDevicePanel, UIInstallSection, UIAppsSection, UI
             # El thread ya fue eliminado por otro proceso
             pass
 
-    def is_thread_type_running(self, thread_classes, mode="or"):
+    def is_thread_type_running(self, thread_classes, mode="or", device_id=None):
         """
         Devuelve True si hay threads de los tipos indicados ejecutándose.
 
@@ -169,13 +232,19 @@ class MainWindow(QMainWindow, UIDevicePanel, UIInstallSection, UIAppsSection, UI
                             Ej: AppsLoadingThread o [AppsLoadingThread, UninstallThread]
         :param mode: "or" → devuelve True si *alguno* está corriendo (por defecto)
                     "and" → devuelve True solo si *todos* están corriendo
+        :param device_id: Si se indica, solo cuentan los threads que trabajan sobre ese
+                    dispositivo (los demás dispositivos siguen disponibles en paralelo)
         """
         if not isinstance(thread_classes, (list, tuple)):
             thread_classes = [thread_classes]
 
+        threads = self.active_threads
+        if device_id is not None:
+            threads = [thread for thread in threads if self._thread_targets_device(thread, device_id)]
+
         running_status = [
             any(isinstance(thread, cls) and thread.isRunning()
-                for thread in self.active_threads)
+                for thread in threads)
             for cls in thread_classes
         ]
 
@@ -183,6 +252,11 @@ class MainWindow(QMainWindow, UIDevicePanel, UIInstallSection, UIAppsSection, UI
             return all(running_status)
         return any(running_status)
 
+    @staticmethod
+    def _thread_targets_device(thread, device_id):
+        """True si el thread trabaja sobre el dispositivo (device_id o device_ids)"""
+        return getattr(thread, 'device_id', None) == device_id or device_id in getattr(thread, 'device_ids', ())
+
     def init_ui(self):        
         font = QFont("Segoe UI", 9)
         self.setFont(font)
@@ -195,7 +269,8 @@ class MainWindow(QMainWindow, UIDevicePanel, UIInstallSection, UIAppsSection, UI
         main_layout.setSpacing(15)
         main_layout.setContentsMargins(15, 15, 15, 15)
         
-        left_panel = self.setup_devices_panel()
+        with get_startup_metrics().measure("panel de dispositivos"):
+            left_panel = self.setup_devices_panel()
         main_layout.addWidget(left_panel)
         
         right_panel = QWidget()
@@ -230,13 +305,15 @@ class MainWindow(QMainWindow, UIDevicePanel, UIInstallSection, UIAppsSection, UI
         self.stacked_widget = QStackedWidget()
         self.stacked_widget.setObjectName("content_main_frame")
         
-        self.install_section = self.setup_install_section()
-        self.apps_section = self.setup_apps_section()
-        self.config_section = self.setup_config_section()
-        
-        self.stacked_widget.addWidget(self.install_section)
-        self.stacked_widget.addWidget(self.apps_section)
-        self.stacked_widget.addWidget(self.config_section)
+        # Solo se construye la sección que se muestra; las demás, la primera vez que se abren
+        self.section_builders = {
+            'install': self.setup_install_section,
+            'apps': self.setup_apps_section,
+            'config': self.setup_config_section,
+        }
+        self.sections = {}
+        for _ in self.SECTION_NAMES:
+            self.stacked_widget.addWidget(QWidget())
         
         right_layout.addWidget(self.stacked_widget)
         main_layout.addWidget(right_panel)
@@ -253,6 +330,7 @@ class MainWindow(QMainWindow, UIDevicePanel, UIInstallSection, UIAppsSection, UI
         if self.cleaning_up or self.property("closing"):
             return
         
+        self.build_section(index)
         self.stacked_widget.setCurrentIndex(index)
         
         # Si el ultimo indice es el mismo no hacer nada
@@ -262,8 +340,7 @@ class MainWindow(QMainWindow, UIDevicePanel, UIInstallSection, UIAppsSection, UI
         self.last_section_index = index
         
         # ACTUALIZAR LA VARIABLE DE SECCIÓN ACTUAL
-        section_map = {0: 'install', 1: 'apps', 2: 'config'}
-        self.current_section = section_map[index]
+        self.current_section = self.SECTION_NAMES[index]
 
         
         self.install_btn_nav.setChecked(index == 0)
@@ -272,6 +349,35 @@ class MainWindow(QMainWindow, UIDevicePanel, UIInstallSection, UIAppsSection, UI
         
         self.update_nav_buttons_style()
     
+    def build_section(self, index):
+        """Construye la sección (si aún no existe) en lugar de su marcador vacío"""
+        name = self.SECTION_NAMES[index]
+        if self.sections.get(name) is not None:
+            return self.sections[name]
+
+        # Se marca antes de construirla: al final, la sección ya se actualiza a sí misma
+        self.sections[name] = None
+        try:
+            with get_startup_metrics().measure(f"sección {name}"):
+                # Lo que solo usa una sección se importa al construirla, no al arrancar
+                if name == 'install' and self.apk_installer is None:
+                    from app.core.apk_installer import APKInstaller
+                    self.apk_installer = APKInstaller(self.adb_manager)
+                widget = self.section_builders[name]()
+        except Exception:
+            del self.sections[name]
+            raise
+        placeholder = self.stacked_widget.widget(index)
+        self.stacked_widget.removeWidget(placeholder)
+        placeholder.deleteLater()
+        self.stacked_widget.insertWidget(index, widget)
+        self.sections[name] = widget
+        return widget
+
+    def is_section_built(self, name):
+        """False mientras la sección no se haya abierto nunca (sus widgets no existen)"""
+        return name in self.sections
+
     def update_nav_buttons_style(self):
         buttons = [
             (self.install_btn_nav, self.install_btn_nav.isChecked(), self.install_btn_nav.isEnabled()),
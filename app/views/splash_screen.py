@@ -1,8 +1,8 @@
 from PySide6.QtWidgets import QWidget, QLabel, QVBoxLayout, QFrame, QGridLayout
 from PySide6.QtCore import Qt, QPropertyAnimation, QEasingCurve, QSize
-from PySide6.QtGui import QPixmap, QPainter, QPen, QColor
+from PySide6.QtGui import QPainter, QPen, QColor
 from PySide6.QtCore import Property
-from app.utils.helpers import resource_path
+from app.utils.icon_cache import get_icon_cache
 
 MODES = {
     "normal": {"spinner_color": QColor(66, 133, 244), "background": "#1a1a1a"},
@@ -84,17 +84,9 @@ class LoadingWidget(QWidget):
         
     def load_logo(self):
         try:
-            logo_path = resource_path("assets/logo/png/logo_512.png")
-            # Cargar logo directamente desde la carpeta assets
-            pixmap = QPixmap(logo_path)
+            # Logo ya redimensionado al tamaño fijo (de la caché si se mostró antes)
+            pixmap = get_icon_cache().pixmap("assets/logo/png/logo_512.png", self.logo_size)
             if not pixmap.isNull():
-                # Redimensionar el logo al tamaño fijo
-                pixmap = pixmap.scaled(
-                    self.logo_size, 
-                    self.logo_size, 
-                    Qt.AspectRatioMode.KeepAspectRatio, 
-                    Qt.TransformationMode.SmoothTransformation
-                )
                 self.logo_label.setPixmap(pixmap)
             else:
                 # Fallback si no encuentra el logo
@@ -2,24 +2,25 @@ from PySide6.QtWidgets import (
     QVBoxLayout,
     QHBoxLayout,
     QPushButton,
-    QListWidget,
+    QListView,
     QLabel,
     QWidget,
     QFileDialog,
     QMessageBox,
     QRadioButton,
-    QListWidgetItem,
     QSizePolicy,
     QLineEdit,
 )
-from PySide6.QtSvgWidgets import QSvgWidget
-from PySide6.QtCore import Qt, QTimer
-from PySide6.QtGui import QIcon, QPixmap
-from app.core.threads import UninstallThread, ExtractThread, AppsLoadingThread
-from app.utils.helpers import execute_after_delay, resource_path
-from app.constants.delays import GLOBAL_ACTION_DELAY, SEARCH_DEBOUNCE_DELAY
+from PySide6.QtCore import Qt, QTimer, QSize, QItemSelection, QItemSelectionModel
+from app.core.threads import UninstallThread, ExtractThread, BatchExtractThread, AppsLoadingThread, AppsSearchThread
+from app.constants.enums import ExtractFormat
+from app.utils.helpers import execute_after_delay
+from app.constants.delays import APP_DETAILS_UPDATE_DELAY, GLOBAL_ACTION_DELAY, SEARCH_DEBOUNCE_DELAY
 from app.constants.labels import OPERATION_LABELS
 from app.views.widgets.shimmer_label import ShimmerLabel
+from app.core.app_search_index import AppSearchIndex
+from app.views.widgets.apps_list_model import APP_ICON_SIZE, AppsListModel
+from app.views.widgets.detail_row import DetailRow
 
 class UIAppsSection:
 
@@ -77,7 +78,7 @@ class UIAppsSection:
         search_layout.setSpacing(8)
 
         self.search_input = QLineEdit()
-        self.search_input.setPlaceholderText("Buscar por nombre o paquete...")
+        self.search_input.setPlaceholderText("Buscar por nombre, paquete o versión...")
         self.search_input.setObjectName("text_input_default")
         self.search_input.setEnabled(False)
 
@@ -101,9 +102,27 @@ class UIAppsSection:
         self.apps_message_label.setText("Selecciona un dispositivo")
         self.apps_message_label.setVisible(True)
 
-        self.apps_list = QListWidget()
+        # Modelo/vista: solo se crean las filas visibles y la búsqueda filtra sin recrearlas
+        self.apps_model = AppsListModel(self)
+        # Se actualiza con cada inventario cargado (solo lo que cambió), en segundo plano
+        self.apps_search_index = AppSearchIndex()
+        self.apps_search_thread = None
+        self._search_id = 0
+        self._search_base_version = None
+        # Inventario que aún no llegó al índice: va con cada búsqueda hasta que una lo aplica
+        self._pending_index_apps = None
+        # Operación en curso de cada dispositivo -> mensaje de estado que se muestra
+        self.device_operations = {}
+
+        self.apps_list = QListView()
         self.apps_list.setObjectName("list_main_widget")
+        self.apps_list.setModel(self.apps_model)
+        self.apps_list.setUniformItemSizes(True)
+        self.apps_list.setIconSize(QSize(APP_ICON_SIZE, APP_ICON_SIZE))
+        self.apps_list.setEditTriggers(QListView.EditTrigger.NoEditTriggers)
         self.apps_list.setEnabled(False)
+        # Ctrl/Shift + clic para extraer varias aplicaciones a la vez
+        self.apps_list.setSelectionMode(QListView.SelectionMode.ExtendedSelection)
 
         # Configurar políticas de scroll para asegurar que siempre estén visibles
         self.apps_list.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
@@ -118,7 +137,7 @@ class UIAppsSection:
         horizontal_scrollbar = self.apps_list.horizontalScrollBar()
         horizontal_scrollbar.setObjectName("scrollbar_horizontal")
 
-        self.apps_list.itemSelectionChanged.connect(self.on_app_selected)
+        self.apps_list.selectionModel().selectionChanged.connect(lambda *_: self.on_app_selected())
         left_layout.addWidget(self.apps_list)
 
         self.right_panel = QWidget()
@@ -156,6 +175,22 @@ class UIAppsSection:
         self.app_info_layout.setSpacing(6)
         self.app_info_layout.setContentsMargins(0, 0, 0, 0)
 
+        # Las filas se crean una vez; al cambiar la selección solo se actualizan sus valores
+        self.app_detail_rows = {
+            'name': DetailRow("assets/icons/file-white.svg", "Aplicación:"),
+            'package_name': DetailRow("assets/icons/package-white.svg", "Paquete:"),
+            'version': DetailRow("assets/icons/tag-white.svg", "Versión:"),
+            'apk_path': DetailRow("assets/icons/folder-white.svg", "Ruta:"),
+        }
+        self.selected_count_row = DetailRow("assets/icons/package-white.svg", "Seleccionadas:")
+        for row in self.app_detail_rows.values():
+            self.app_info_layout.addWidget(row)
+        self.app_info_layout.addWidget(self.selected_count_row)
+
+        self.app_details_timer = QTimer()
+        self.app_details_timer.setSingleShot(True)
+        self.app_details_timer.timeout.connect(self._refresh_app_details)
+
         app_details_layout.addWidget(self.app_info_container)
 
         self.uninstall_btn = QPushButton("Desinstalar")
@@ -184,35 +219,6 @@ class UIAppsSection:
 
         return widget
     
-    def _add_detail_row(self, icon_path, title, label_text):
-        row = QWidget()
-        row.setObjectName("info_item")
-        layout = QHBoxLayout(row)
-        layout.setContentsMargins(10, 10, 10, 10)
-        layout.setSpacing(0)
-        layout.setAlignment(Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft)   
-        
-        self.icon_label = QSvgWidget(resource_path(icon_path))
-        self.icon_label.setFixedSize(16, 16)
-    
-        title_label = QLabel(title)  # Título como QLabel separado
-        title_label.setObjectName("info_item_title")
-        
-        content_edit = QLineEdit(label_text)
-        content_edit.setObjectName("info_item_content")
-        content_edit.setReadOnly(True)
-        content_edit.setCursorPosition(0)
-        content_edit.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
-        
-        # Agregar icono y contenedor de texto al layout principal
-        layout.addWidget(self.icon_label)
-        layout.addSpacing(10)
-        layout.addWidget(title_label)
-        layout.addSpacing(5)
-        layout.addWidget(content_edit)
-        
-        self.app_info_layout.addWidget(row)
-
     def handle_app_operations(self, operation, app_data=None, force_load=False):
         operations = {
             "load": lambda: self._load_apps(force_load),
@@ -222,13 +228,15 @@ class UIAppsSection:
         operations.get(operation, lambda: None)()
 
     def _load_apps(self, force_load):
+        # Una carga anterior (p. ej. de otro dispositivo) ya no es necesaria
+        self.stop_threads(AppsLoadingThread)
+
         # Asignamos el dispsotivo seleccionado actual como ultimo seleccionado
         self.last_device_selected = self.selected_device
 
         # Limpiar listas
-        self.apps_list.clear()
         self.all_apps_data = []  # Almacenará todas las aplicaciones cargadas
-        self.filtered_apps_data = []  # Aplicaciones filtradas
+        self.apps_model.set_apps([])
         # Solo limpiar si se forzó la recarga
         if force_load:
             self.search_input.clear()
@@ -264,6 +272,7 @@ class UIAppsSection:
                 self.app_manager, self.selected_device, app_type
             )
             self.register_thread(self.apps_loading_thread)
+            self.apps_loading_thread.cached_signal.connect(self.on_cached_apps_loaded)
             self.apps_loading_thread.finished_signal.connect(self.on_apps_loaded)
             self.apps_loading_thread.start()
 
@@ -272,19 +281,38 @@ class UIAppsSection:
             self.update_apps_list_display()
             self.show_apps_message("Error al obtener aplicaciones", "error")
 
+    def on_cached_apps_loaded(self, result):
+        """Muestra el inventario guardado mientras se revalida en segundo plano"""
+        if self.cleaning_up or self.property("closing"):
+            return
+
+        self.all_apps_data = result["data"]["apps"]
+        self._showing_cached_apps = True
+        self.update_apps_list_display()
+        self.apps_list.setEnabled(True)
+        self.search_input.setEnabled(bool(self.all_apps_data))
+        self.show_apps_message("Buscando cambios en las aplicaciones...", "info", shimmer_enabled=True)
+
     def on_apps_loaded(self, result):
         if self.cleaning_up or self.property("closing"):
             return
 
+        showing_cached = getattr(self, "_showing_cached_apps", False)
+        self._showing_cached_apps = False
+
         if result["success"]:
             apps = result["data"]["apps"]
+            delta = result["data"].get("delta")
             # Guardar todas las aplicaciones cargadas
             self.all_apps_data = apps
-            # Aplicar filtros iniciales - usar el método directo sin debounce
-            self._perform_filter_apps()
+            if showing_cached and delta is not None and not any(delta.values()):
+                # La caché ya estaba al día: no hace falta reconstruir la lista
+                self.update_apps_message()
+            else:
+                self.update_apps_list_display()
         else:
             self.all_apps_data = []
-            self.filtered_apps_data = []
+            self.apps_model.set_apps([])
             self.show_apps_message(f"{result['message']}", "error")
             self.search_input.setEnabled(False)
         
@@ -292,9 +320,10 @@ class UIAppsSection:
         self.set_ui_state(True)
 
     def on_app_selected(self):
-        app_data = self.get_selected_app_data()
+        selected_apps = self.get_selected_apps_data()
 
-        if not app_data:
+        if not selected_apps:
+            self.app_details_timer.stop()
             self.initial_info_label.setVisible(True)
             self.app_details_widget.setVisible(False)
             self.uninstall_btn.setEnabled(False)
@@ -304,25 +333,47 @@ class UIAppsSection:
         self.initial_info_label.setVisible(False)
         self.app_details_widget.setVisible(True)
 
-        while self.app_info_layout.count():
-            child = self.app_info_layout.takeAt(0)
-            if child.widget():
-                child.widget().deleteLater()
-
-        self._add_detail_row("assets/icons/file-white.svg", title="Aplicación:", label_text=app_data['name'])
-        self._add_detail_row("assets/icons/package-white.svg", title="Paquete:", label_text=app_data['package_name'])
-        self._add_detail_row("assets/icons/tag-white.svg", title="Versión:", label_text=app_data['version'])
-        self._add_detail_row("assets/icons/folder-white.svg", title="Ruta:", label_text=app_data['apk_path'])
-        
-        self.uninstall_btn.setEnabled(True)
+        if len(selected_apps) > 1:
+            # Selección múltiple: solo se puede extraer en lote
+            self.uninstall_btn.setEnabled(False)
+            self.extract_apk_btn.setText(f"Extraer {len(selected_apps)} aplicaciones")
+        else:
+            self.extract_apk_btn.setText("Extraer APK")
+            self.uninstall_btn.setEnabled(True)
         self.extract_apk_btn.setEnabled(True)
 
+        # Al mantener pulsada una flecha solo se muestran los datos de la última app
+        self.app_details_timer.start(APP_DETAILS_UPDATE_DELAY)
+
+    def _refresh_app_details(self):
+        """Muestra en el formulario de detalles los datos de la selección actual"""
+        selected_apps = self.get_selected_apps_data()
+        if not selected_apps:
+            return
+
+        multiple = len(selected_apps) > 1
+        self.selected_count_row.setVisible(multiple)
+        for row in self.app_detail_rows.values():
+            row.setVisible(not multiple)
+
+        if multiple:
+            self.selected_count_row.set_text(f"{len(selected_apps)} aplicaciones")
+            return
+        for field, row in self.app_detail_rows.items():
+            row.set_text(selected_apps[0][field])
+
     def get_selected_app_data(self):
-        """Obtiene los datos de la app seleccionada o None"""
-        selected_items = self.apps_list.selectedItems()
-        return (
-            selected_items[0].data(Qt.ItemDataRole.UserRole) if selected_items else None
-        )
+        """Obtiene los datos de la app seleccionada o None (también si hay varias seleccionadas)"""
+        selected_apps = self.get_selected_apps_data()
+        return selected_apps[0] if len(selected_apps) == 1 else None
+
+    def get_selected_apps_data(self):
+        """Datos de todas las apps seleccionadas, en el orden de la lista"""
+        selected_indexes = sorted(self.apps_list.selectionModel().selectedIndexes(), key=lambda index: index.row())
+        return [index.data(Qt.ItemDataRole.UserRole) for index in selected_indexes]
+
+    def _selected_apps_count(self):
+        return len(self.apps_list.selectionModel().selectedIndexes())
 
     def _schedule_filter(self):
         """Programa el filtrado con debounce"""
@@ -337,73 +388,98 @@ class UIAppsSection:
         """Ejecuta el filtrado real después del debounce"""
         if self.cleaning_up or self.property("closing"):
             return
-            
-        search_text = self.search_input.text().lower().strip()
-
-        # Obtener la app seleccionada actualmente ANTES de filtrar
-        current_selection = self.get_selected_app_data()
-        current_package = current_selection["package_name"] if current_selection else None
-
-        # Filtrado eficiente
-        self.filtered_apps_data = [
-            app
-            for app in self.all_apps_data
-            if not search_text
-            or search_text in app["name"].lower()
-            or search_text in app["package_name"].lower()
-        ]
-
-        # Actualizar la lista
-        self.update_apps_list_display()
-        
-        # Buscar y restaurar la selección si el elemento sigue en la lista filtrada
-        if current_package:
-            for index in range(self.apps_list.count()):
-                item = self.apps_list.item(index)
-                app_data = item.data(Qt.ItemDataRole.UserRole)
-                if app_data["package_name"] == current_package:
-                    item.setSelected(True)
-                    self.apps_list.scrollToItem(item)
-                    break
+
+        self._start_apps_search()
 
     def filter_apps_list(self):
         """Método mantenido por compatibilidad, ahora usa debounce"""
         self._schedule_filter()
 
     def update_apps_list_display(self):
-        """Actualiza la visualización de la lista de aplicaciones"""
-        self.apps_list.clear()
-        
+        """Carga en el modelo las aplicaciones (el filtro de búsqueda actual se mantiene)"""
         self.apps_list.setEnabled(bool(self.selected_device))
-        
+
         # Mostrar mensajes según el estado actual
         if not self.selected_device:
+            self.apps_model.set_apps([])
             self.show_apps_message("Selecciona un dispositivo", "warning")
             return
 
-        icon_size = 18  # Tamaño fijo en px
-        for app in self.filtered_apps_data:
-            item = QListWidgetItem()
-            item.setData(Qt.ItemDataRole.UserRole, app)
-
-            # Texto de la app
-            item.setText(f" {app['name']}\n {app['package_name']}")
-
-            # Cargar ícono SVG de "file" para representar la app
-            pixmap = QPixmap(resource_path("assets/icons/file-green.svg")).scaled(
-                icon_size, icon_size,
-                Qt.AspectRatioMode.KeepAspectRatio,
-                Qt.TransformationMode.SmoothTransformation
-            )
-            icon = QIcon(pixmap)
-            item.setIcon(icon)
-
-            self.apps_list.addItem(item)
+        # Con una búsqueda activa se siguen mostrando los mismos paquetes hasta
+        # que llegan los resultados sobre el inventario nuevo
+        selected_packages = [app["package_name"] for app in self.get_selected_apps_data()]
+        searching = bool(self.search_input.text().strip())
+        self.apps_model.set_apps(
+            self.all_apps_data, self.apps_model.visible_packages() if searching else None
+        )
+        self._select_packages(selected_packages)
+        self._start_apps_search(apps=self.all_apps_data)
+        self.update_apps_message()
+
+    def _start_apps_search(self, apps=None):
+        """
+        Busca en segundo plano (actualizando antes el índice con apps, si se indica);
+        el resultado se aplica a la lista en _on_apps_search_finished
+        """
+        if self.apps_search_thread is not None and self.apps_search_thread.isRunning():
+            self.apps_search_thread.stop()
+        if apps is not None:
+            self._pending_index_apps = apps
+
+        self._search_id += 1
+        self._search_base_version = self.apps_model.view_version
+        self.apps_search_thread = AppsSearchThread(
+            self._search_id,
+            self.apps_search_index,
+            self.search_input.text(),
+            self.apps_model.source_rows(),
+            self.apps_model.visible_rows(),
+            self._pending_index_apps
+        )
+        self.register_thread(self.apps_search_thread)
+        self.apps_search_thread.index_synced.connect(self._on_apps_index_synced)
+        self.apps_search_thread.finished_signal.connect(self._on_apps_search_finished)
+        self.apps_search_thread.start()
+
+    def _on_apps_index_synced(self, apps):
+        # Un inventario más nuevo que llegó mientras tanto sigue pendiente
+        if apps is self._pending_index_apps:
+            self._pending_index_apps = None
+
+    def _on_apps_search_finished(self, search_id, diff):
+        # Solo vale el resultado de la última búsqueda y si la lista no cambió desde que empezó
+        if (self.cleaning_up or self.property("closing") or search_id != self._search_id
+                or self.apps_model.view_version != self._search_base_version):
+            return
 
-        # Mostrar mensaje si no hay resultados
-        if not self.filtered_apps_data and self.all_apps_data:
+        selected_before = self._selected_apps_count()
+        self.apps_model.apply_diff(diff)
+        selected_indexes = self.apps_list.selectionModel().selectedIndexes()
+        if len(selected_indexes) != selected_before:
+            # Al reordenar no siempre se emite selectionChanged
+            self.on_app_selected()
+        if selected_indexes:
+            self.apps_list.scrollTo(min(selected_indexes, key=lambda index: index.row()))
+        self.update_apps_message()
+
+    def _select_packages(self, package_names):
+        """Selecciona las filas de esos paquetes que estén visibles"""
+        selection = QItemSelection()
+        for package_name in package_names:
+            row = self.apps_model.row_of(package_name)
+            if row is not None:
+                index = self.apps_model.index(row, 0)
+                selection.select(index, index)
+        if not selection.isEmpty():
+            self.apps_list.selectionModel().select(selection, QItemSelectionModel.SelectionFlag.Select)
+            self.apps_list.scrollTo(selection.indexes()[0])
+
+    def update_apps_message(self):
+        """Muestra u oculta el mensaje según los resultados del filtro"""
+        has_results = self.apps_model.rowCount() > 0
+        if not has_results and self.all_apps_data:
             self.show_apps_message("No se encontró alguna coincidencia", "info")
-        elif not self.filtered_apps_data:
+        elif not has_results:
             self.show_apps_message("No hay aplicaciones para mostrar", "info")
         else:
             self.hide_apps_message()
@@ -450,10 +526,18 @@ class UIAppsSection:
         self.refresh_apps_btn.setEnabled(enabled)
 
     def set_ui_state(self, enabled, operation_in_progress=False):
-        """Control centralizado del estado de la UI"""
-
-        if enabled and self.is_thread_type_running(
-            [AppsLoadingThread, UninstallThread, ExtractThread], mode="or"):
+        """
+        Control centralizado del estado de la UI. Solo cuentan las operaciones del
+        dispositivo seleccionado: las de otros dispositivos siguen en paralelo.
+        """
+        device_operation = self.device_operations.get(self.selected_device)
+        if device_operation is not None:
+            enabled = False
+            operation_in_progress = True
+            self.show_operation_status(device_operation)
+        elif enabled and self.is_thread_type_running(
+            [AppsLoadingThread, UninstallThread, ExtractThread, BatchExtractThread],
+            device_id=self.selected_device):
             enabled = False
         
         # Controles de apps
@@ -467,12 +551,13 @@ class UIAppsSection:
         self.search_input.setEnabled(enabled and has_apps)
 
         # Botones de operación
-        has_selection = enabled and bool(self.apps_list.selectedItems())
-        self.uninstall_btn.setEnabled(has_selection and not operation_in_progress)
+        has_selection = enabled and self._selected_apps_count() > 0
+        single_selection = has_selection and self._selected_apps_count() == 1
+        self.uninstall_btn.setEnabled(single_selection and not operation_in_progress)
         self.extract_apk_btn.setEnabled(has_selection and not operation_in_progress)
 
-        # Sección de dispositivos
-        self.set_devices_section_enabled(enabled)
+        # Sección de dispositivos (se puede cambiar de dispositivo durante una operación)
+        self.set_devices_section_enabled(self.adb_available)
 
         # Estado de operación
         if not operation_in_progress:
@@ -484,14 +569,30 @@ class UIAppsSection:
             if not app_data:
                 return
             
-            # Obtener el nombre o, si no existe, usar el package_name
-            app_label = app_data.get("name") or app_data.get("package_name")
+            # Obtener el nombre o, si no existe, usar el package_name (en lote, app_data es una lista)
+            app_label = (
+                f"{len(app_data)} aplicaciones" if operation_type == "batch_extract"
+                else app_data.get("name") or app_data.get("package_name")
+            )
 
             if operation_type == "uninstall" and not self._confirm_operation(
                 "uninstall", app_label
             ):
                 return
 
+            if operation_type == "batch_extract":
+                output_dir = QFileDialog.getExistingDirectory(
+                    self,
+                    "Extraer aplicaciones en",
+                    "",
+                    QFileDialog.ShowDirsOnly | QFileDialog.DontUseNativeDialog
+                )
+                if not output_dir:
+                    return
+                output_format = self._ask_extract_format()
+                if output_format is None:
+                    return
+
             if operation_type == "extract":
                 file_path, _ = QFileDialog.getSaveFileName(
                     self,
@@ -504,16 +605,25 @@ class UIAppsSection:
                     return
 
             # Configurar thread según operación
+            device_id = self.selected_device
             if operation_type == "uninstall":
                 thread = UninstallThread(
-                    self.app_manager, self.selected_device, app_data["package_name"], app_label
+                    self.app_manager, device_id, app_data["package_name"], app_label
                 )
-                self.show_operation_status("Desinstalando...")
+                self._set_device_operation(device_id, "Desinstalando...")
             elif operation_type == "extract":
                 thread = ExtractThread(
-                    self.app_manager, self.selected_device, app_data["apk_path"], app_label, file_path
+                    self.app_manager, device_id, app_data["apk_path"], app_label, file_path
+                )
+                self._set_device_operation(device_id, "Extrayendo...")
+            elif operation_type == "batch_extract":
+                thread = BatchExtractThread(
+                    self.app_manager, device_id, app_data, output_dir, output_format
+                )
+                thread.progress_update.connect(
+                    lambda message, device_id=device_id: self._set_device_operation(device_id, message)
                 )
-                self.show_operation_status("Extrayendo...")
+                self._set_device_operation(device_id, f"Extrayendo {len(app_data)} aplicaciones...")
             else:
                 return
 
@@ -521,14 +631,15 @@ class UIAppsSection:
             self.set_ui_state(False, operation_in_progress=True)
             self.register_thread(thread)
             thread.finished_signal.connect(
-                lambda success, msg: self._on_operation_finished(
-                    success, msg, operation_type
+                lambda success, msg, device_id=device_id: self._on_operation_finished(
+                    success, msg, operation_type, device_id
                 )
             )
             execute_after_delay(thread.start, GLOBAL_ACTION_DELAY)
             
         except Exception as e:
             # Restaurar estado UI
+            self.device_operations.pop(self.selected_device, None)
             self.set_ui_state(True, operation_in_progress=False)
 
             # Obtener la operación traducida (con fallback al valor original)
@@ -542,21 +653,34 @@ class UIAppsSection:
                 f"Detalle: {str(e)}"
             )  
 
-    def _on_operation_finished(self, success, message, operation_type):
+    def _set_device_operation(self, device_id, message):
+        """Guarda el estado de la operación del dispositivo y lo muestra si está seleccionado"""
+        self.device_operations[device_id] = message
+        if device_id == self.selected_device:
+            self.show_operation_status(message)
+
+    def _on_operation_finished(self, success, message, operation_type, device_id=None):
         """Maneja la finalización de operaciones"""
+        self.device_operations.pop(device_id, None)
         if self.cleaning_up or self.property("closing"):
             return
 
+        # La lista se recarga tras desinstalar solo si se sigue viendo ese dispositivo
+        reload_apps = operation_type == "uninstall" and success and device_id == self.selected_device
+
         # Desbloquear controles después de la operación
-        if operation_type == "extract" or not success:
+        if not reload_apps:
             self.set_ui_state(True)
 
         if success:
             if operation_type == "extract":
                 title = "APK extraído"
+            elif operation_type == "batch_extract":
+                title = "Aplicaciones extraídas"
             elif operation_type == "uninstall":
                 title = "Aplicación desinstalada"
-                self.handle_app_operations("load", force_load=True)
+                if reload_apps:
+                    self.handle_app_operations("load", force_load=True)
             else:
                 title = f"Operación completada"
 
@@ -564,6 +688,8 @@ class UIAppsSection:
         else:
             if operation_type == "extract":
                 title = "Error al extraer APK"
+            elif operation_type == "batch_extract":
+                title = "Error al extraer aplicaciones"
             elif operation_type == "uninstall":
                 title = "Error al desinstalar"
             else:
@@ -588,9 +714,30 @@ class UIAppsSection:
             self._execute_operation("uninstall", app_data)
 
     def extract_app_apk(self):
-        """Maneja la extracción de APK"""
+        """Maneja la extracción de APK (de varias aplicaciones si hay más de una seleccionada)"""
         if app_data := self.get_selected_app_data():
             self._execute_operation("extract", app_data)
+        elif selected_apps := self.get_selected_apps_data():
+            self._execute_operation("batch_extract", selected_apps)
+
+    def _ask_extract_format(self):
+        """Pregunta cómo guardar las aplicaciones divididas. Devuelve ExtractFormat o None si se cancela"""
+        dialog = QMessageBox(self)
+        dialog.setWindowTitle("Extraer aplicaciones")
+        dialog.setText(
+            "Las aplicaciones con un solo APK se guardan como <b>.apk</b>.<br><br>"
+            "¿Cómo quieres guardar las aplicaciones divididas (Split APKs)?"
+        )
+        directory_button = dialog.addButton("Carpeta por aplicación", QMessageBox.ButtonRole.AcceptRole)
+        apks_button = dialog.addButton("Archivo .apks", QMessageBox.ButtonRole.AcceptRole)
+        dialog.addButton("Cancelar", QMessageBox.ButtonRole.RejectRole)
+        dialog.exec()
+
+        if dialog.clickedButton() == directory_button:
+            return ExtractFormat.DIRECTORY
+        if dialog.clickedButton() == apks_button:
+            return ExtractFormat.APKS
+        return None
 
     def _confirm_operation(self, operation_name, app_name):
         """Muestra diálogo de confirmación para operaciones"""
@@ -3,14 +3,11 @@ from PySide6.QtWidgets import (QVBoxLayout, QHBoxLayout,
                              QWidget, QFileDialog, QMessageBox,
                              QFrame, QSizePolicy)
 from PySide6.QtCore import Qt, QSize
-from PySide6.QtGui import QIcon
-from app.views.dialogs.about_dialog import AboutDialog
-from app.views.dialogs.adb_help_dialog import ADBHelpDialog
-from app.views.dialogs.feedback_dialog import FeedbackDialog
-from app.views.dialogs.donation_info_dialog import DonationInfoDialog
 from app.views.widgets.info_button import InfoButton
 from app.core.threads import ADBCheckThread, CustomADBThread
-from app.utils.helpers import execute_after_delay, shorten_path, resource_path
+from app.utils.helpers import execute_after_delay, shorten_path
+from app.utils.icon_cache import get_icon_cache
+from app.utils.startup_metrics import get_startup_metrics
 from app.constants.delays import GLOBAL_ACTION_DELAY
 from pathlib import Path
 from app.views.widgets.shimmer_label import ShimmerLabel
@@ -164,7 +161,7 @@ class UIConfigSection:
         self.donation_btn = QPushButton()
         self.donation_btn.setObjectName('donation_button')
         self.donation_btn.setFixedSize(40, 32)
-        self.donation_btn.setIcon(QIcon(resource_path("assets/icons/star.svg")))
+        self.donation_btn.setIcon(get_icon_cache().icon("assets/icons/star.svg", 16))
         self.donation_btn.setIconSize(QSize(16, 16))
         self.donation_btn.clicked.connect(self.show_donation_info_dialog)
         self.donation_btn.setCursor(Qt.PointingHandCursor)
@@ -174,10 +171,24 @@ class UIConfigSection:
             
         layout.addStretch()
         
+        # La sección se construye la primera vez que se abre: mostrar el estado ya conocido
+        self._sync_adb_status_view()
+        
         return widget
 
+    def _sync_adb_status_view(self):
+        """Muestra en la sección el estado de ADB (o la verificación en curso)"""
+        verifying = self.is_thread_type_running([ADBCheckThread, CustomADBThread])
+        self._show_verifying_status(show=verifying)
+        self.set_buttons_enabled(not verifying)
+        if not verifying:
+            self._show_adb_availability()
+
     def _show_verifying_status(self, message="Verificando disponibilidad del ADB...", show=True):
         """Muestra el estado de verificación"""
+        if not self.is_section_built('config'):
+            return
+        
         self.shimmer_label.setText(message)
         self.shimmer_label.setVisible(show)
         
@@ -208,6 +219,8 @@ class UIConfigSection:
 
     def set_buttons_enabled(self, enabled):
         """Context manager para manejar estado de botones durante verificación"""
+        if not self.is_section_built('config'):
+            return
         self.update_adb_btn.setEnabled(enabled)
         self.folder_adb_btn.setEnabled(enabled)
 
@@ -274,9 +287,16 @@ class UIConfigSection:
         self.adb_available = available
         
         # Manejar mensajes de estado ADB
+        if self.adb_available and self.devices_message_label.objectName() == "status_error_message":
+            self.show_devices_message("ADB disponible. Actualiza la lista de dispositivos", "info")
+        if self.is_section_built('config'):
+            self._show_adb_availability()
+
+        self.set_devices_section_enabled(self.adb_available)
+
+    def _show_adb_availability(self):
+        """Muestra en la sección si ADB está disponible y su ruta"""
         if self.adb_available:
-            if self.devices_message_label.objectName() == "status_error_message":
-                self.show_devices_message("ADB disponible. Actualiza la lista de dispositivos", "info")
             adb_path = self.adb_manager.get_adb_path()
             self._set_adb_status("Disponible", shorten_path(adb_path), "success")
             self.adb_path_label.setToolTip(adb_path)     
@@ -284,12 +304,11 @@ class UIConfigSection:
             self._set_adb_status("No disponible", "No encontrada", "error")
             self.adb_path_label.setToolTip("Ruta no disponible")
 
-        self.set_devices_section_enabled(self.adb_available)
-
-    def check_adb_availability_async(self, load_devices=False):
+    def check_adb_availability_async(self, load_devices=False, delay_ms=GLOBAL_ACTION_DELAY):
         """
         Verifica la disponibilidad de ADB de forma asíncrona usando thread.
         load_devices: si es True, cargará la lista de dispositivos después de la verificación
+        delay_ms: espera antes de empezar (0 al arrancar la aplicación)
         """
         if self.is_thread_type_running([ADBCheckThread, CustomADBThread]):
             return
@@ -303,7 +322,10 @@ class UIConfigSection:
         self.adb_check_thread.error_signal.connect(self._on_adb_verify_error_simple)
         
         self.register_thread(self.adb_check_thread)
-        execute_after_delay(lambda: self.adb_check_thread.start(), GLOBAL_ACTION_DELAY)
+        if delay_ms:
+            execute_after_delay(lambda: self.adb_check_thread.start(), delay_ms)
+        else:
+            self.adb_check_thread.start()
 
     def _on_adb_verify_complete_simple(self, success, message, load_devices=False):
         """Callback simple que actualiza el estado deL ADB"""
@@ -312,7 +334,14 @@ class UIConfigSection:
         
         # Si es la primera verificación al inicio, cargar dispositivos
         if load_devices and success:
-            self.load_devices()
+            get_startup_metrics().mark("adb_ready")
+            self.load_devices(delay_ms=0 if self._startup_pending else GLOBAL_ACTION_DELAY)
+        elif not success:
+            self.notify_startup_ready("adb_unavailable")
+
+        # A partir de aquí los cambios de dispositivos llegan por eventos
+        if success:
+            self.start_device_tracking()
         
         # Habilitar botones
         self.set_buttons_enabled(True)
@@ -321,24 +350,29 @@ class UIConfigSection:
         """Callback simple para errores"""
         self._show_verifying_status(show=False)
         self.update_adb_availability(False)
+        self.notify_startup_ready("adb_unavailable")
         
         # Habilitar botones cuando termine (específico para la sección de configuración)
         self.set_buttons_enabled(True)
        
     def show_adb_help_dialog(self):
+        from app.views.dialogs.adb_help_dialog import ADBHelpDialog
         dialog = ADBHelpDialog(self)
         dialog.exec()
 
     def show_about_dialog(self):
+        from app.views.dialogs.about_dialog import AboutDialog
         dialog = AboutDialog(self)
         dialog.exec()
         
     def show_feedback_dialog(self):
         """Muestra el diálogo de sugerencias"""
+        from app.views.dialogs.feedback_dialog import FeedbackDialog
         dialog = FeedbackDialog(self)
         dialog.exec()
     
     def show_donation_info_dialog(self):
         """Muestra el diálogo de sugerencias"""
+        from app.views.dialogs.donation_info_dialog import DonationInfoDialog
         dialog = DonationInfoDialog(self)
         dialog.exec()
\ No newline at end of file
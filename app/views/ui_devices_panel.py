@@ -2,11 +2,10 @@ from PySide6.QtWidgets import (QVBoxLayout, QHBoxLayout,
                              QPushButton, QListWidget, QLabel, 
                              QWidget, QFrame,QGridLayout )
 from PySide6.QtCore import Qt, QSize
-from PySide6.QtGui import QIcon
-from app.core.threads import AppsLoadingThread,UninstallThread, ExtractThread, InstallationThread, DevicesScanThread, DeviceDetailsThread
-from app.views.dialogs.connection_help_dialog import ConnectionHelpDialog
+from app.core.threads import DevicesScanThread, DeviceDetailsThread
 from app.views.widgets.info_button import InfoButton
-from app.utils.helpers import execute_after_delay, resource_path
+from app.utils.helpers import execute_after_delay
+from app.utils.icon_cache import get_icon_cache
 from app.utils.print_in_debug_mode import print_in_debug_mode
 from app.constants.delays import GLOBAL_ACTION_DELAY
 from app.views.widgets.shimmer_label import ShimmerLabel
@@ -42,7 +41,7 @@ class UIDevicePanel:
         self.refresh_details_btn.setObjectName('refresh_button_icon')
         self.refresh_details_btn.setToolTip("Actualizar detalles del dispositivo")
         self.refresh_details_btn.setFixedSize(40, 40)
-        self.refresh_details_btn.setIcon(QIcon(resource_path("assets/icons/refresh_disabled.svg")))
+        self.refresh_details_btn.setIcon(get_icon_cache().icon("assets/icons/refresh_disabled.svg", 16))
         self.refresh_details_btn.setIconSize(QSize(16, 16))
         self.refresh_details_btn.clicked.connect(self._refresh_device_details)
         self.refresh_details_btn.setEnabled(False)
@@ -187,7 +186,7 @@ class UIDevicePanel:
 
         return self.details_container
         
-    def load_devices(self):
+    def load_devices(self, delay_ms=GLOBAL_ACTION_DELAY):
         """Inicia la carga de dispositivos con estado visual usando thread"""
         self.show_devices_message("Actualizando lista de dispositivos...", "info", shimmer_enabled=True)
         self.refresh_devices_btn.setEnabled(False)
@@ -205,7 +204,10 @@ class UIDevicePanel:
         self.devices_scan_thread.finished.connect(lambda: self.unregister_thread(self.devices_scan_thread))
         
         # Iniciar el thread después del delay
-        execute_after_delay(lambda: self.devices_scan_thread.start(), GLOBAL_ACTION_DELAY)
+        if delay_ms:
+            execute_after_delay(lambda: self.devices_scan_thread.start(), delay_ms)
+        else:
+            self.devices_scan_thread.start()
 
     def _handle_scan_results(self, result):
         """Procesa los resultados del escaneo de dispositivos"""
@@ -222,6 +224,40 @@ class UIDevicePanel:
                 self._handle_scan_error()      
         except Exception as e:
             print_in_debug_mode("Error en _handle_scan_results()")
+        finally:
+            self.notify_startup_ready("first_device_list")
+
+    def start_device_tracking(self):
+        """Inicia el seguimiento de dispositivos por eventos (una sola vez)"""
+        tracker = self.adb_manager.device_tracker
+        if not getattr(self, '_device_tracker_connected', False):
+            tracker.devices_changed.connect(self._handle_tracked_devices)
+            tracker.device_removed.connect(self._handle_device_removed)
+            self._device_tracker_connected = True
+        tracker.start_tracking()
+
+    def _handle_device_removed(self, device_id):
+        """Libera de inmediato las operaciones de un dispositivo desconectado"""
+        self.stop_threads(device_id=device_id)
+
+    def _handle_tracked_devices(self, devices):
+        """Actualiza la lista cuando el seguimiento notifica un cambio de dispositivos"""
+        if self.property("closing") or self.is_thread_type_running(DevicesScanThread):
+            return
+
+        # Conservar la preselección del usuario al reconstruir la lista
+        selected_items = self.device_list.selectedItems()
+        preselected_id = self._extract_device_id(selected_items[0].text()) if selected_items else None
+
+        self._handle_scan_results({'success': True, 'devices': devices})
+
+        if preselected_id:
+            for row in range(self.device_list.count()):
+                item = self.device_list.item(row)
+                if self._extract_device_id(item.text()) == preselected_id:
+                    item.setSelected(True)
+                    break
+            self.set_devices_section_enabled(self.adb_available)
 
     def _handle_scan_error(self):
         """Maneja errores durante el escaneo de dispositivos"""
@@ -259,11 +295,10 @@ class UIDevicePanel:
 
     def set_devices_section_enabled(self, enabled):
         """Habilita o deshabilita los controles de la sección de dispositivos"""
+        # Las operaciones en curso no bloquean la lista: cada sección limita sus
+        # controles según los trabajos del dispositivo seleccionado
         if not self.adb_available:
             enabled = False
-        if enabled and self.is_thread_type_running(
-            [AppsLoadingThread, UninstallThread, ExtractThread, InstallationThread], mode="or"):
-            enabled = False
         self.device_list.setEnabled(enabled)
         self.refresh_devices_btn.setEnabled(enabled and not self.is_thread_type_running(DevicesScanThread))
         self._set_refresh_button_state(enabled and bool(self.selected_device))
@@ -412,9 +447,9 @@ class UIDevicePanel:
         
         # Cambiar icono basado en el estado
         if enabled:
-            self.refresh_details_btn.setIcon(QIcon(resource_path("assets/icons/refresh_enabled.svg")))
+            self.refresh_details_btn.setIcon(get_icon_cache().icon("assets/icons/refresh_enabled.svg", 16))
         else:
-            self.refresh_details_btn.setIcon(QIcon(resource_path("assets/icons/refresh_disabled.svg")))
+            self.refresh_details_btn.setIcon(get_icon_cache().icon("assets/icons/refresh_disabled.svg", 16))
 
     def _format_device_info_for_clipboard(self):
         """Formatea la información del dispositivo para el portapapeles"""
@@ -476,6 +511,9 @@ class UIDevicePanel:
             execute_after_delay(lambda:  self._set_refresh_button_state(True), GLOBAL_ACTION_DELAY * 3)
             self._show_loading_message("El dispositivo seleccionado no está disponible", "error")
             return
+
+        # Los detalles de un dispositivo seleccionado antes ya no interesan
+        self.stop_threads(DeviceDetailsThread)
     
         self.device_details_thread = DeviceDetailsThread(self.device_manager, device_id)
         self.device_details_thread.finished_signal.connect(self._handle_device_details_loaded)
@@ -516,5 +554,6 @@ class UIDevicePanel:
             
     def show_connection_help_dialog(self):
         """Muestra el diálogo de ayuda para conexión"""
+        from app.views.dialogs.connection_help_dialog import ConnectionHelpDialog
         dialog = ConnectionHelpDialog(self)
         dialog.exec()
\ No newline at end of file
@@ -1,13 +1,14 @@
 import os
 from PySide6.QtWidgets import (QVBoxLayout, QHBoxLayout, 
                              QPushButton, QListWidget, QLabel, 
-                             QWidget, QFileDialog, QMessageBox, QListWidgetItem)
+                             QWidget, QFileDialog, QMessageBox, QListWidgetItem, QCheckBox)
 from PySide6.QtCore import Qt
-from PySide6.QtGui import QDragEnterEvent, QDropEvent, QIcon, QPixmap
-from app.utils.helpers import execute_after_delay, resource_path
+from PySide6.QtGui import QDragEnterEvent, QDropEvent
+from app.utils.helpers import execute_after_delay
+from app.utils.icon_cache import get_icon_cache
 from app.utils.print_in_debug_mode import print_in_debug_mode
-from app.core.threads import InstallationThread
-from app.views.dialogs.apk_installation_info_dialog import ApkInstallationInfoDialog
+from app.core.threads import InstallationThread, MultiDeviceInstallationThread
+from app.core.apk_bundle import group_install_units, is_installable
 from app.views.widgets.info_button import InfoButton
 from app.constants.delays import GLOBAL_ACTION_DELAY
 from app.views.widgets.shimmer_label import ShimmerLabel
@@ -92,6 +93,17 @@ class UIInstallSection:
         
         layout.addLayout(apk_buttons_layout)
         
+        self.install_all_devices_checkbox = QCheckBox("Instalar en todos los dispositivos conectados")
+        self.install_all_devices_checkbox.setObjectName('checkbox_default')
+        self.install_all_devices_checkbox.setCursor(Qt.PointingHandCursor)
+        self.install_all_devices_checkbox.toggled.connect(lambda _: self._update_ui_state())
+        layout.addWidget(self.install_all_devices_checkbox)
+        
+        self.force_reinstall_checkbox = QCheckBox("Reinstalar aunque ya tenga la misma versión")
+        self.force_reinstall_checkbox.setObjectName('checkbox_default')
+        self.force_reinstall_checkbox.setCursor(Qt.PointingHandCursor)
+        layout.addWidget(self.force_reinstall_checkbox)
+        
         self.install_btn = QPushButton("Instalar APKs")
         self.install_btn.setObjectName('button_success_default')
         self.install_btn.clicked.connect(self.install_apk)
@@ -99,12 +111,16 @@ class UIInstallSection:
         self.install_btn.setCursor(Qt.PointingHandCursor)
         layout.addWidget(self.install_btn)
         
+        # La sección se construye la primera vez que se abre: mostrar lo ya elegido
+        self._update_apk_list()
+        self._update_ui_state()
+        
         return widget
 
     def select_apk(self):
         """Seleccionar archivos APK mediante diálogo"""
         file_paths, _ = QFileDialog.getOpenFileNames(
-            self, "Seleccionar APKs", "", "APK Files (*.apk)",
+            self, "Seleccionar APKs", "", "APK Files (*.apk *.apks *.xapk)",
             options=QFileDialog.DontUseNativeDialog
         )
         if file_paths:
@@ -134,9 +150,16 @@ class UIInstallSection:
 
     def _update_ui_state(self):
         """Método único para actualizar todo el estado de la UI"""
+        if not self.is_section_built('install'):
+            return
+        # Durante una instalación la sección sigue bloqueada con su progreso, aunque
+        # se cambie de dispositivo
+        if self.is_thread_type_running([InstallationThread, MultiDeviceInstallationThread]):
+            return
+        
         # Estado actual
         has_apks = bool(self.selected_apks)
-        has_device = bool(self.selected_device)
+        has_device = bool(self._get_install_targets())
         
         # 1. Actualizar solo botones (siempre se ejecuta)
         self._update_buttons_state()
@@ -145,32 +168,45 @@ class UIInstallSection:
         self._update_status_message(has_apks, has_device)
 
     def _update_apk_list(self):
-        """Actualizar la visualización de la lista de APKs con SVG escalado a 18px"""
+        """Actualizar la visualización de la lista de APKs con SVG escalado a 16px"""
         self.apk_list.clear()
-        icon_size = 16  # tamaño fijo en pixeles
+        icon = get_icon_cache().icon("assets/icons/file-green.svg", 16)  # tamaño fijo en pixeles
+        
+        # Los splits de una aplicación y los .apks/.xapk se marcan con 🧩
+        split_paths = {
+            path for unit in group_install_units(self.selected_apks) if unit.is_split_set for path in unit.paths
+        }
         
         for apk_path in self.selected_apks:
             # Crear item con texto
-            item = QListWidgetItem(os.path.basename(apk_path))
-            
-            pixmap = QPixmap(resource_path("assets/icons/file-green.svg")).scaled(
-                icon_size, icon_size, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation
-            )
-            icon = QIcon(pixmap)
+            prefix = "🧩 " if apk_path in split_paths else ""
+            item = QListWidgetItem(f"{prefix}{os.path.basename(apk_path)}")
             item.setIcon(icon)
             
             self.apk_list.addItem(item)
 
+    def _is_multi_device_install(self):
+        return self.install_all_devices_checkbox.isChecked()
+
+    def _get_install_targets(self):
+        """Dispositivos en los que se instalará según el modo elegido"""
+        if self._is_multi_device_install():
+            return [device['device'] for device in self.devices_data if device.get('status', 'device') == 'device']
+        return [self.selected_device] if self.selected_device else []
+
     def install_apk(self):
         """Iniciar instalación de APKs"""
+        if self._is_multi_device_install():
+            self.install_apk_on_all_devices()
+            return
         
         self.apply_style_update(self.status_label, 'status_info_message')
         self.status_label.setText(f"Instalando {len(self.selected_apks)} APK(s)...")
         self.status_label.start_shimmer()
         
-        # Bloquear controles durante instalación (INSTANTÁNEO)
+        # Bloquear controles durante instalación (INSTANTÁNEO). La lista de dispositivos
+        # sigue disponible: el dispositivo de la instalación ya está decidido
         self.set_install_section_enabled(False)
-        self.set_devices_section_enabled(False)
         
         if not self.selected_apks or not self.selected_device:
             # Agregar delay antes de reactivar en caso de validación fallida
@@ -186,13 +222,39 @@ class UIInstallSection:
             return
             
         self.installation_thread = InstallationThread(
-            self.apk_installer, self.selected_apks, self.selected_device
+            self.apk_installer, self.selected_apks, self.selected_device,
+            force=self.force_reinstall_checkbox.isChecked()
         )
         self.register_thread(self.installation_thread)
         self.installation_thread.progress_update.connect(self.update_progress)
         self.installation_thread.finished_signal.connect(self.installation_finished)
         self.installation_thread.start()
 
+    def install_apk_on_all_devices(self):
+        """Iniciar la instalación de los APKs en todos los dispositivos conectados"""
+        device_ids = self._get_install_targets()
+        
+        self.apply_style_update(self.status_label, 'status_info_message')
+        self.status_label.setText(f"Instalando {len(self.selected_apks)} APK(s) en {len(device_ids)} dispositivos...")
+        self.status_label.start_shimmer()
+        
+        self.set_install_section_enabled(False)
+        
+        if not self.selected_apks or not device_ids:
+            self.status_label.stop_shimmer()
+            execute_after_delay(self._enable_controls_after_delay, GLOBAL_ACTION_DELAY)
+            return
+        
+        self.installation_thread = MultiDeviceInstallationThread(
+            self.apk_installer, self.selected_apks, device_ids,
+            force=self.force_reinstall_checkbox.isChecked()
+        )
+        self.register_thread(self.installation_thread)
+        self.installation_thread.progress_update.connect(self.update_progress)
+        # El resumen por dispositivo y APK lo compone el hilo (summarize_install_results)
+        self.installation_thread.finished_signal.connect(self.installation_finished)
+        self.installation_thread.start()
+
     def update_progress(self, message):
         """Actualizar progreso de instalación"""
         if self._is_app_closing():
@@ -222,7 +284,7 @@ class UIInstallSection:
         """Manejar arrastre sobre la sección"""
         if event.mimeData().hasUrls():
             urls = event.mimeData().urls()
-            if any(url.toLocalFile().lower().endswith('.apk') for url in urls):
+            if any(is_installable(url.toLocalFile()) for url in urls):
                 event.acceptProposedAction()
 
     def install_section_drop_event(self, event: QDropEvent):
@@ -231,7 +293,7 @@ class UIInstallSection:
             apk_files = []
             for url in event.mimeData().urls():
                 file_path = url.toLocalFile()
-                if file_path.lower().endswith('.apk'):
+                if is_installable(file_path):
                     apk_files.append(file_path)
             
             if apk_files:
@@ -245,6 +307,8 @@ class UIInstallSection:
         """Habilitar/deshabilitar toda la sección de instalación"""
         self.select_apk_btn.setEnabled(enabled)
         self.apk_list.setEnabled(enabled)
+        self.install_all_devices_checkbox.setEnabled(enabled)
+        self.force_reinstall_checkbox.setEnabled(enabled)
         self.install_section_widget.setAcceptDrops(enabled)
         
         # Solo actualizar el estado de los botones, no el mensaje
@@ -255,7 +319,7 @@ class UIInstallSection:
         is_section_enabled = self.select_apk_btn.isEnabled()
         has_apks = bool(self.selected_apks)
         has_selection = bool(self.apk_list.selectedItems())
-        has_device = bool(self.selected_device)
+        has_device = bool(self._get_install_targets())
         
         # Actualizar solo botones
         self.remove_apk_btn.setEnabled(is_section_enabled and has_selection)
@@ -267,15 +331,21 @@ class UIInstallSection:
         if has_apks is None:
             has_apks = bool(self.selected_apks)
         if has_device is None:
-            has_device = bool(self.selected_device)
+            has_device = bool(self._get_install_targets())
         
         self.apply_style_update(self.status_label, 'status_info_message')
         
         if not has_apks:
             self.status_label.setText("Selecciona al menos un APK")
         elif not has_device:
-            self.status_label.setText("Selecciona un dispositivo")
+            self.status_label.setText(
+                "No hay dispositivos conectados" if self._is_multi_device_install() else "Selecciona un dispositivo"
+            )
             self.apply_style_update(self.status_label, 'status_warning_message')
+        elif self._is_multi_device_install():
+            self.status_label.setText(
+                f"Listo para instalar {len(self.selected_apks)} APK(s) en {len(self._get_install_targets())} dispositivos"
+            )
         else:
             self.status_label.setText(f"Listo para instalar {len(self.selected_apks)} APK(s)")
 
@@ -289,7 +359,6 @@ class UIInstallSection:
             return
         
         self.set_install_section_enabled(True)
-        self.set_devices_section_enabled(True)
         self._update_ui_state()
 
     def get_operation_title(self, operation_type, success=True, app_count=1):
@@ -310,5 +379,6 @@ class UIInstallSection:
     
     def show_apk_installation_info_dialog(self):
         """Muestra el diálogo de ayuda para conexión"""
+        from app.views.dialogs.apk_installation_info_dialog import ApkInstallationInfoDialog
         dialog = ApkInstallationInfoDialog(self)
         dialog.exec()
\ No newline at end of file
@@ -0,0 +1,131 @@
+from PySide6.QtCore import QAbstractListModel, QModelIndex, Qt
+from app.utils.icon_cache import get_icon_cache
+
+APP_ICON_SIZE = 18  # Tamaño fijo en px
+
+
+class AppsListModel(QAbstractListModel):
+    """
+    Modelo de la lista de aplicaciones. Los textos se calculan una sola vez al
+    cargar las aplicaciones y todas las filas comparten el mismo ícono.
+
+    Solo se muestran las filas de la búsqueda actual, en su orden de relevancia.
+    Los resultados de una búsqueda nueva llegan como un ViewDiff que se aplica de
+    una vez: la vista conserva la selección de las filas que siguen visibles.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._apps = []
+        self._labels = []
+        self._source_rows = {}  # package_name -> posición en _apps
+        self._visible = []      # posiciones en _apps, en el orden mostrado
+        self._view_rows = None  # package_name -> fila visible (se calcula al pedirla)
+        # Cambia cada vez que cambian las filas visibles (para descartar diffs obsoletos)
+        self.view_version = 0
+        self._icon = None
+
+    def set_apps(self, apps, visible_packages=None):
+        """
+        Reemplaza las aplicaciones. visible_packages son los paquetes que se
+        muestran, en ese orden (None para mostrarlas todas).
+        """
+        self.beginResetModel()
+        self._apps = list(apps)
+        self._labels = [f" {app['name']}\n {app['package_name']}" for app in self._apps]
+        # Se crea un diccionario nuevo: el hilo de búsqueda puede seguir leyendo el anterior
+        self._source_rows = {app['package_name']: position for position, app in enumerate(self._apps)}
+        if visible_packages is None:
+            self._visible = list(range(len(self._apps)))
+        else:
+            self._visible = [
+                self._source_rows[package_name] for package_name in visible_packages
+                if package_name in self._source_rows
+            ]
+        self._view_changed()
+        self.endResetModel()
+
+    def apps(self):
+        return list(self._apps)
+
+    def source_rows(self):
+        """package_name -> posición de la aplicación en el modelo (no se modifica después)"""
+        return self._source_rows
+
+    def visible_rows(self):
+        return list(self._visible)
+
+    def visible_packages(self):
+        return [self._apps[position]['package_name'] for position in self._visible]
+
+    def row_of(self, package_name):
+        """Fila visible de un paquete o None si no se muestra"""
+        if self._view_rows is None:
+            self._view_rows = {
+                self._apps[position]['package_name']: row for row, position in enumerate(self._visible)
+            }
+        return self._view_rows.get(package_name)
+
+    def apply_diff(self, diff):
+        """Aplica un ViewDiff calculado a partir de las filas visibles actuales"""
+        if diff.is_empty():
+            return
+        if diff.reset:
+            self._relayout(diff.rows)
+            self._view_changed()
+            return
+
+        for start, count in reversed(diff.removed):
+            self.beginRemoveRows(QModelIndex(), start, start + count - 1)
+            del self._visible[start:start + count]
+            self.endRemoveRows()
+
+        if diff.kept is not None:
+            self._relayout(diff.kept)
+
+        for start, rows in diff.inserted:
+            self.beginInsertRows(QModelIndex(), start, start + len(rows) - 1)
+            self._visible[start:start] = rows
+            self.endInsertRows()
+        self._view_changed()
+
+    def _relayout(self, visible):
+        """
+        Reemplaza las filas visibles de una vez. La selección acompaña a las filas
+        que siguen (como al reordenar un QSortFilterProxyModel).
+        """
+        self.layoutAboutToBeChanged.emit()
+        new_rows = {position: row for row, position in enumerate(visible)}
+        persistent = self.persistentIndexList()
+        moved = []
+        for index in persistent:
+            row = new_rows.get(self._visible[index.row()])
+            moved.append(QModelIndex() if row is None else self.createIndex(row, 0))
+        self.changePersistentIndexList(persistent, moved)
+        self._visible = list(visible)
+        self.layoutChanged.emit()
+
+    def _view_changed(self):
+        self._view_rows = None
+        self.view_version += 1
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._visible)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self._visible):
+            return None
+        position = self._visible[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._labels[position]
+        if role == Qt.ItemDataRole.DecorationRole:
+            return self._app_icon()
+        if role == Qt.ItemDataRole.UserRole:
+            return self._apps[position]
+        return None
+
+    def _app_icon(self):
+        """Ícono SVG de "file" para representar las apps (el mismo para todas las filas)"""
+        if self._icon is None:
+            self._icon = get_icon_cache().icon("assets/icons/file-green.svg", APP_ICON_SIZE)
+        return self._icon
@@ -0,0 +1,49 @@
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import QHBoxLayout, QLabel, QLineEdit, QSizePolicy, QWidget
+from app.utils.icon_cache import get_icon_cache
+
+ICON_SIZE = 16  # Tamaño fijo en px
+
+
+class DetailRow(QWidget):
+    """
+    Fila "ícono + título + valor" del panel de detalles. Se crea una vez y solo
+    se cambia su valor.
+    """
+
+    def __init__(self, icon_path, title, parent=None):
+        super().__init__(parent)
+        self.setObjectName("info_item")
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(10, 10, 10, 10)
+        layout.setSpacing(0)
+        layout.setAlignment(Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft)
+
+        self.icon_label = QLabel()
+        self.icon_label.setFixedSize(ICON_SIZE, ICON_SIZE)
+        self.icon_label.setPixmap(get_icon_cache().pixmap(icon_path, ICON_SIZE))
+
+        title_label = QLabel(title)  # Título como QLabel separado
+        title_label.setObjectName("info_item_title")
+
+        self.content_edit = QLineEdit()
+        self.content_edit.setObjectName("info_item_content")
+        self.content_edit.setReadOnly(True)
+        self.content_edit.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
+
+        # Agregar icono y contenedor de texto al layout principal
+        layout.addWidget(self.icon_label)
+        layout.addSpacing(10)
+        layout.addWidget(title_label)
+        layout.addSpacing(5)
+        layout.addWidget(self.content_edit)
+
+    def set_text(self, text):
+        """Cambia el valor mostrado (sin tocar el widget si no cambió)"""
+        text = str(text)
+        if self.content_edit.text() != text:
+            self.content_edit.setText(text)
+            self.content_edit.setCursorPosition(0)
+
+    def text(self):
+        return self.content_edit.text()
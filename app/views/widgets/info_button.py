@@ -1,15 +1,15 @@
 from PySide6.QtWidgets import QToolButton
 from PySide6.QtCore import QSize, Qt
-from PySide6.QtGui import QIcon, QCursor
-from app.utils.helpers import resource_path
+from PySide6.QtGui import QCursor
+from app.utils.icon_cache import get_icon_cache
 
 class InfoButton(QToolButton):
     def __init__(self, parent=None):
         super().__init__(parent)
 
         # Rutas a los iconos
-        self.icon_normal = QIcon(resource_path("assets/icons/info.svg"))
-        self.icon_hover = QIcon(resource_path("assets/icons/info_hover.svg"))
+        self.icon_normal = get_icon_cache().icon("assets/icons/info.svg", 16)
+        self.icon_hover = get_icon_cache().icon("assets/icons/info_hover.svg", 16)
 
         # Icono inicial
         self.setIcon(self.icon_normal)
@@ -1,17 +1,17 @@
 import sys
 import os
 import ctypes
+from app.utils.startup_metrics import get_startup_metrics
 from PySide6.QtWidgets import QApplication
 from PySide6.QtGui import QIcon, QColor
 from app.constants.config import APP_NAME,APP_DISPLAY_NAME, APP_VERSION, APP_ID, ORGANIZATION_NAME, ORGANIZATION_DOMAIN
-from app.constants.delays import SPLASH_SCREEN_DELAY, POST_SPLASH_DELAY
+from app.constants.delays import SPLASH_SCREEN_DELAY, SPLASH_MAX_DURATION
 from app.constants.enums import Platform
 from app.utils.print_in_debug_mode import print_in_debug_mode
 from app.utils.helpers import resource_path
 from app.utils.usb_detector import is_running_from_usb
 from app.launcher.usb_launcher import copy_executable_to_temp, launch_temp_exe
 from app.utils.helpers import resource_path, execute_after_delay
-from app.views.main_window import MainWindow
 from app.views.splash_screen import SplashScreen
 
 class ApplicationLauncher:
@@ -124,31 +124,36 @@ class ApplicationLauncher:
     
     def setup_main_window(self):
         """Configura y crea la ventana principal."""
+        # Se importa con el splash ya visible: arrastra toda la interfaz y el núcleo
+        from app.views.main_window import MainWindow
         self.window = MainWindow()
         self.window.setWindowTitle(APP_DISPLAY_NAME)
         self.window.resize(1000, 650)
         self.window.setMinimumSize(800, 500)
     
     def show_main_interface(self):
-        """Muestra la interfaz principal con transición desde splash."""
+        """
+        Muestra la interfaz principal en cuanto está lista: con la primera lista de
+        dispositivos cargada (o ADB no disponible), sin esperas fijas.
+        """
         if self.splash:
-            execute_after_delay(
-                lambda: self._transition_to_main_window(), 
-                SPLASH_SCREEN_DELAY
-            )
+            self.window.startup_ready.connect(self._transition_to_main_window)
+            # Si ADB tarda demasiado en responder, no se retiene más el splash
+            execute_after_delay(self._transition_to_main_window, SPLASH_MAX_DURATION)
         else:
-            self.window.show()
+            self._transition_to_main_window()
     
     def _transition_to_main_window(self):
         """Transición desde splash screen a ventana principal."""
+        if not self.window or self.window.isVisible():
+            return
+        self.window.show()
         if self.splash:
             self.splash.close()
-        
-        def show_window():
-            if self.window:
-                self.window.show()
-        
-        execute_after_delay(show_window, POST_SPLASH_DELAY)
+            self.splash = None
+        metrics = get_startup_metrics()
+        metrics.mark("window_shown")
+        metrics.report()
     
     def _quit_application(self):
         """Cierra la aplicación de manera limpia."""
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Las pruebas importan el paquete 'app' desde la raíz del repositorio
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
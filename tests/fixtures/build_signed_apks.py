@@ -0,0 +1,134 @@
+"""
+Genera los APKs de prueba de test_apk_inspector.py a partir de signer.der:
+un manifiesto binario mínimo firmado con el esquema v2 (signed_v2.apk) y el
+mismo contenido con firma v1 / JAR (signed_v1.apk). Las firmas no son válidas
+criptográficamente: solo importan los certificados, que es lo que lee el inspector.
+
+    python tests/fixtures/build_signed_apks.py
+"""
+import io
+import struct
+import zipfile
+from pathlib import Path
+
+FIXTURES_DIR = Path(__file__).resolve().parent
+
+ATTRIBUTE_IDS = {
+    'versionCode': 0x0101021b,
+    'versionName': 0x0101021c,
+    'minSdkVersion': 0x0101020c,
+    'targetSdkVersion': 0x01010270,
+}
+TYPE_STRING, TYPE_INT_DEC = 0x03, 0x10
+APK_SIGNATURE_SCHEME_V2_ID = 0x7109871a
+
+
+def string_pool(strings):
+    offsets, data = [], b''
+    for string in strings:
+        offsets.append(len(data))
+        data += struct.pack('<H', len(string)) + string.encode('utf-16-le') + b'\0\0'
+    data += b'\0' * (-len(data) % 4)
+    strings_start = 28 + 4 * len(strings)
+    body = struct.pack(f'<{len(strings)}I', *offsets) + data
+    return struct.pack('<HHIIIIII', 0x0001, 28, 28 + len(body), len(strings), 0, 0, strings_start, 0) + body
+
+
+def start_element(strings, name, attributes):
+    body = b''
+    for key, value in attributes:
+        if isinstance(value, int):
+            body += struct.pack('<IIIHBBI', 0xFFFFFFFF, strings.index(key), 0xFFFFFFFF, 8, 0, TYPE_INT_DEC, value)
+        else:
+            index = strings.index(value)
+            body += struct.pack('<IIIHBBI', 0xFFFFFFFF, strings.index(key), index, 8, 0, TYPE_STRING, index)
+    header = struct.pack('<HHIII', 0x0102, 16, 36 + len(body), 1, 0xFFFFFFFF)
+    return header + struct.pack('<IIHHHHHH', 0xFFFFFFFF, strings.index(name), 20, 20, len(attributes), 0, 0, 0) + body
+
+
+def binary_manifest():
+    # Los atributos android:* van primero para que el mapa de recursos los identifique
+    strings = list(ATTRIBUTE_IDS) + ['package', 'manifest', 'uses-sdk', 'com.example.fixture', '1.2.3']
+    resource_map = struct.pack(f'<{len(ATTRIBUTE_IDS)}I', *ATTRIBUTE_IDS.values())
+    chunks = (
+        string_pool(strings)
+        + struct.pack('<HHI', 0x0180, 8, 8 + len(resource_map)) + resource_map
+        + start_element(strings, 'manifest', [
+            ('package', 'com.example.fixture'), ('versionCode', 42), ('versionName', '1.2.3'),
+        ])
+        + start_element(strings, 'uses-sdk', [('minSdkVersion', 24), ('targetSdkVersion', 34)])
+    )
+    return struct.pack('<HHI', 0x0003, 8, 8 + len(chunks)) + chunks
+
+
+def length_prefixed(data):
+    return struct.pack('<I', len(data)) + data
+
+
+def der(tag, content):
+    length = len(content)
+    if length < 0x80:
+        return bytes([tag, length]) + content
+    size = (length.bit_length() + 7) // 8
+    return bytes([tag, 0x80 | size]) + length.to_bytes(size, 'big') + content
+
+
+def pkcs7_with_certificate(certificate):
+    """ContentInfo de tipo signedData que solo contiene el certificado"""
+    signed_data = der(0x30, (
+        der(0x02, b'\x01')
+        + der(0x31, b'')
+        + der(0x30, der(0x06, bytes.fromhex('2a864886f70d010701')))
+        + der(0xA0, certificate)
+        + der(0x31, b'')
+    ))
+    return der(0x30, der(0x06, bytes.fromhex('2a864886f70d010702')) + der(0xA0, signed_data))
+
+
+def v2_signing_block(certificate):
+    signed_data = (
+        length_prefixed(b'')  # digests
+        + length_prefixed(length_prefixed(certificate))
+        + length_prefixed(b'')  # atributos
+    )
+    signer = length_prefixed(signed_data) + length_prefixed(b'') + length_prefixed(b'')
+    value = length_prefixed(length_prefixed(signer))
+    pair = struct.pack('<QI', 4 + len(value), APK_SIGNATURE_SCHEME_V2_ID) + value
+    block_size = len(pair) + 8 + 16
+    return struct.pack('<Q', block_size) + pair + struct.pack('<Q', block_size) + b"APK Sig Block 42"
+
+
+def zip_bytes(entries):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, data in entries:
+            info = zipfile.ZipInfo(name, date_time=(2024, 1, 1, 0, 0, 0))
+            archive.writestr(info, data, zipfile.ZIP_DEFLATED)
+    return buffer.getvalue()
+
+
+def insert_signing_block(data, block):
+    """Coloca el bloque antes del directorio central y corrige su offset en el EOCD"""
+    eocd = data.rfind(b"PK\x05\x06")
+    central_directory_offset = struct.unpack_from('<I', data, eocd + 16)[0]
+    eocd_record = bytearray(data[eocd:])
+    struct.pack_into('<I', eocd_record, 16, central_directory_offset + len(block))
+    return data[:central_directory_offset] + block + data[central_directory_offset:eocd] + bytes(eocd_record)
+
+
+def main():
+    certificate = (FIXTURES_DIR / "signer.der").read_bytes()
+    manifest = binary_manifest()
+    (FIXTURES_DIR / "signed_v2.apk").write_bytes(
+        insert_signing_block(zip_bytes([("AndroidManifest.xml", manifest)]), v2_signing_block(certificate))
+    )
+    (FIXTURES_DIR / "signed_v1.apk").write_bytes(zip_bytes([
+        ("AndroidManifest.xml", manifest),
+        ("META-INF/MANIFEST.MF", b"Manifest-Version: 1.0\r\n\r\n"),
+        ("META-INF/CERT.SF", b"Signature-Version: 1.0\r\n\r\n"),
+        ("META-INF/CERT.RSA", pkcs7_with_certificate(certificate)),
+    ]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import io
+import hashlib
+import time
+import pytest
+from app.core.adb_socket_client import ADBProtocolError, ADBSocketClient
+from app.core.mocks.fake_adb_server import FakeADBServer, FakeDevice
+
+
+class SlowDevice(FakeDevice):
+    """Dispositivo que además entiende 'sleep <segundos>' para provocar tiempos de espera"""
+
+    def _run_single(self, command):
+        if command.startswith("sleep "):
+            time.sleep(float(command.split()[1]))
+            return '', '', 0
+        return super()._run_single(command)
+
+
+@pytest.fixture
+def device():
+    return SlowDevice("fake-serial", profile={'model': 'Pixel_8'})
+
+
+@pytest.fixture
+def client(device):
+    with FakeADBServer(devices=[device]) as server:
+        client = ADBSocketClient(server.host, server.port, timeout=2)
+        yield client
+        client.close()
+
+
+def test_lists_devices_with_their_attributes(client):
+    assert client.is_server_available()
+    assert client.devices() == [{
+        'device': "fake-serial",
+        'status': "device",
+        'product': "fake",
+        'model': "Pixel_8",
+        'device_name': "fake",
+        'transport_id': "1",
+    }]
+
+
+def test_shell_v2_separates_streams_and_exit_code(client):
+    result = client.shell("fake-serial", "getprop ro.product.model")
+    assert result == {'success': True, 'stdout': "Pixel_8\n", 'stderr': '', 'returncode': 0}
+
+    result = client.shell("fake-serial", "missing-tool --version")
+    assert not result['success']
+    assert result['returncode'] == 127
+    assert result['stdout'] == ''
+    assert "missing-tool: inaccessible or not found" in result['stderr']
+
+
+def test_shell_keeps_the_exit_code_of_the_last_command(client, device):
+    device.files["/sdcard/a.apk"] = b"abc"
+    result = client.shell("fake-serial", "stat -c %s /sdcard/a.apk /sdcard/missing.apk")
+    assert result['returncode'] == 1
+    assert result['stdout'] == "3\n"
+
+
+def test_unknown_device_is_reported_by_the_server(client):
+    with pytest.raises(ADBProtocolError, match="not found"):
+        client.shell("other-serial", "true")
+
+
+def test_sync_stat_recv_and_send(client, device, tmp_path):
+    payload = bytes(range(256)) * 1024  # varios bloques DATA de 64 KiB
+    source = tmp_path / "upload.bin"
+    source.write_bytes(payload)
+    progress = []
+
+    assert client.push("fake-serial", str(source), "/data/local/tmp/upload.bin", progress.append) == len(payload)
+    assert device.files["/data/local/tmp/upload.bin"] == payload
+    assert progress[-1] == len(payload) and len(progress) == 4
+
+    mode, size, _ = client.get_sync("fake-serial").stat("/data/local/tmp/upload.bin")
+    assert mode & 0o170000 == 0o100000
+    assert size == len(payload)
+    assert client.get_sync("fake-serial").stat("/data/local/tmp/missing.bin")[0] == 0
+
+    target = tmp_path / "download.bin"
+    assert client.pull("fake-serial", "/data/local/tmp/upload.bin", str(target)) == len(payload)
+    assert target.read_bytes() == payload
+
+
+def test_sync_recv_of_a_missing_file_fails_and_drops_the_connection(client, tmp_path):
+    connection = client.get_sync("fake-serial")
+    with pytest.raises(ADBProtocolError, match="does not exist"):
+        client.pull("fake-serial", "/data/local/tmp/missing.bin", str(tmp_path / "missing.bin"))
+    assert client.get_sync("fake-serial") is not connection
+
+
+def test_execute_command_translates_pull(client, device, tmp_path):
+    device.files["/sdcard/base.apk"] = b"apk-bytes"
+    result = client.execute_command("fake-serial", ["pull", "/sdcard/base.apk", str(tmp_path)])
+    assert result['success']
+    assert result['stdout'] == "/sdcard/base.apk: 1 file pulled, 9 bytes"
+    assert (tmp_path / "base.apk").read_bytes() == b"apk-bytes"
+
+
+def test_exec_in_streams_the_input_into_an_install_session(client, device):
+    session_id = client.shell("fake-serial", "pm install-create -S 200000")['stdout'].split('[')[1].split(']')[0]
+    payload = hashlib.sha256(b"split").digest() * 6250
+
+    output = client.exec_in(
+        "fake-serial", f"pm install-write -S {len(payload)} {session_id} base.apk -", io.BytesIO(payload)
+    )
+
+    assert output == f"Success: streamed {len(payload)} bytes\n".encode()
+    assert device.install_sessions[session_id]["base.apk"] == payload
+
+
+def test_timeout_returns_a_failure_without_returncode(client):
+    started = time.monotonic()
+    result = client.execute_command("fake-serial", ["shell", "sleep", "2"], timeout=0.2)
+    assert result == {'success': False, 'error': "Tiempo de espera agotado"}
+    # Sin 'returncode' quien llama no lo repite con el binario: el comando ya se envió
+    assert time.monotonic() - started < 1.5
+
+
+def test_unreachable_server_falls_back_to_the_binary():
+    with FakeADBServer(devices=[]) as server:
+        host, port = server.host, server.port
+    client = ADBSocketClient(host, port, timeout=1)
+    assert not client.is_server_available()
+    assert client.execute_command("fake-serial", ["shell", "true"]) is None
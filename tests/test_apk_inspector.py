@@ -0,0 +1,75 @@
+import io
+import shutil
+import pytest
+from pathlib import Path
+from app.core.apk_inspector import ApkInspectionError, inspect_apk, java_array_hash, try_inspect_apk
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+# Hash de signer.der tal y como lo muestra 'dumpsys package' en "signatures:[...]"
+SIGNER_HASH = "b3e8b264"
+
+
+def java_hash_code(data):
+    """Arrays.hashCode(byte[]) con la aritmética de int de Java, mostrado con Integer.toHexString"""
+    value = 1
+    for byte in data:
+        value = 31 * value + (byte - 256 if byte > 127 else byte)
+        value = (value + 2 ** 31) % 2 ** 32 - 2 ** 31
+    return format(value & 0xFFFFFFFF, 'x')
+
+
+@pytest.mark.parametrize("data, expected", [
+    (b"", "1"),
+    (b"\x00", "1f"),
+    (b"\x01\x02\x03", "7861"),
+    # Los bytes de Java tienen signo: 0xFF es -1
+    (b"\xff", "1e"),
+    # Desborda a un int negativo (-172384639): toHexString lo muestra sin signo
+    (b"\xff" * 8, "f5b99e81"),
+])
+def test_java_array_hash_matches_arrays_hash_code(data, expected):
+    assert java_array_hash(data) == expected
+    assert java_hash_code(data) == expected
+
+
+def test_java_array_hash_of_the_signer_certificate():
+    certificate = (FIXTURES_DIR / "signer.der").read_bytes()
+    assert java_array_hash(certificate) == java_hash_code(certificate) == SIGNER_HASH
+
+
+@pytest.mark.parametrize("name", ["signed_v2.apk", "signed_v1.apk"])
+def test_reads_manifest_and_signer_of_fixture_apk(name):
+    assert inspect_apk(FIXTURES_DIR / name) == {
+        'package_name': "com.example.fixture",
+        'version_code': 42,
+        'version_name': "1.2.3",
+        'split': None,
+        'is_feature_split': False,
+        'min_sdk': 24,
+        'target_sdk': 34,
+        'abis': [],
+        'signer_hashes': [SIGNER_HASH],
+    }
+
+
+def test_inspects_an_open_stream_like_a_bundle_entry():
+    data = (FIXTURES_DIR / "signed_v2.apk").read_bytes()
+    assert inspect_apk(io.BytesIO(data))['signer_hashes'] == [SIGNER_HASH]
+
+
+def test_cached_result_is_not_shared_between_callers(tmp_path):
+    path = tmp_path / "copy.apk"
+    shutil.copy(FIXTURES_DIR / "signed_v2.apk", path)
+    first = inspect_apk(path)
+    first['signer_hashes'].append("tampered")
+    first['package_name'] = "tampered"
+    assert inspect_apk(path)['package_name'] == "com.example.fixture"
+
+
+def test_rejects_files_that_are_not_apks(tmp_path):
+    path = tmp_path / "not_an.apk"
+    path.write_bytes(b"plain text")
+    with pytest.raises(ApkInspectionError):
+        inspect_apk(path)
+    assert try_inspect_apk(path) is None
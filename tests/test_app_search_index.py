@@ -0,0 +1,157 @@
+import pytest
+from app.core.app_search_index import AppSearchIndex, normalize_text, trigrams, typo_distance
+
+
+def make_app(package_name, name, version="1.0"):
+    return {'package_name': package_name, 'name': name, 'version': version}
+
+
+APPS = [
+    make_app("com.whatsapp", "WhatsApp", "2.24.1"),
+    make_app("com.whatsapp.w4b", "WhatsApp Business", "2.24.1"),
+    make_app("org.telegram.messenger", "Telegram", "10.9.1"),
+    make_app("com.google.android.apps.maps", "Maps", "11.120"),
+    make_app("com.sec.android.app.camera", "Cámara", "14.0.01"),
+    make_app("com.spotify.music", "Spotify", "8.9.20"),
+    make_app("com.google.android.apps.messaging", "Mensajes", "20240101"),
+    make_app("org.mozilla.firefox", "Firefox", "125.0"),
+]
+
+
+@pytest.fixture
+def index():
+    index = AppSearchIndex()
+    index.sync(APPS)
+    return index
+
+
+def assert_same_index(index, apps):
+    """El índice actualizado por partes debe quedar igual que uno construido de cero"""
+    fresh = AppSearchIndex()
+    fresh.sync(apps)
+    assert index._postings == fresh._postings
+    assert index._prefixes == fresh._prefixes
+    assert index._tiebreak == fresh._tiebreak
+    assert set(index._apps) == set(fresh._apps)
+
+
+def test_normalizes_case_and_accents():
+    assert normalize_text("  Cámara ÑANDÚ ") == "camara nandu"
+    assert trigrams("maps") == {"map", "aps"}
+    assert trigrams("go") == {"go"}
+    assert trigrams("") == set()
+
+
+def test_typo_distance_counts_swaps_as_one_error():
+    assert typo_distance("whtasapp", "whatsapp", 2) == 1
+    assert typo_distance("telgram", "telegram", 1) == 1
+    assert typo_distance("abc", "xyzabc", 2) == 3
+
+
+def test_empty_query_does_not_filter(index):
+    assert index.search("   ") is None
+
+
+def test_exact_match_ranks_before_prefix_matches(index):
+    assert index.search("whatsapp") == ["com.whatsapp", "com.whatsapp.w4b"]
+
+
+def test_matches_the_start_of_any_word(index):
+    assert index.search("business") == ["com.whatsapp.w4b"]
+    # 'apps' es una palabra del paquete, no del nombre; después van las aproximadas ('app', 'whatsapp')
+    assert set(index.search("apps")[:2]) == {"com.google.android.apps.maps", "com.google.android.apps.messaging"}
+
+
+def test_name_prefix_ranks_before_package_prefix(index):
+    # 'Mensajes' empieza por 'me'; en Telegram solo coincide la palabra 'messenger' del paquete
+    results = index.search("me")
+    assert results[0] == "com.google.android.apps.messaging"
+    assert "org.telegram.messenger" in results
+
+
+def test_substring_match_in_the_middle_of_a_word(index):
+    assert index.search("gram") == ["org.telegram.messenger"]
+
+
+def test_search_ignores_accents(index):
+    assert index.search("camara") == ["com.sec.android.app.camera"]
+    assert index.search("CÁMARA") == ["com.sec.android.app.camera"]
+
+
+def test_trigram_match_tolerates_typos(index):
+    assert index.search("telegarm")[0] == "org.telegram.messenger"
+    assert index.search("spotfy") == ["com.spotify.music"]
+    # Letras intercambiadas comparten pocos trigramas pero siguen coincidiendo
+    assert "com.whatsapp" in index.search("whtasapp")
+
+
+def test_every_word_of_the_query_must_match(index):
+    assert index.search("whatsapp business") == ["com.whatsapp.w4b"]
+    assert index.search("whatsapp zzzz") == []
+
+
+def test_searches_versions(index):
+    assert index.search("125.0") == ["org.mozilla.firefox"]
+
+
+def test_limit(index):
+    assert index.search("com", limit=2) == index.search("com")[:2]
+
+
+def test_incremental_sync_adds_and_updates_only_changed_apps(index):
+    previous = {name: indexed for name, indexed in index._apps.items()}
+    apps = APPS + [make_app("com.example.notes", "Notas")]
+    apps[2] = make_app("org.telegram.messenger", "Telegram X", "11.0")
+
+    index.sync(apps)
+
+    # Las aplicaciones sin cambios conservan su entrada: no se reindexan
+    assert index._apps["com.whatsapp"] is previous["com.whatsapp"]
+    assert index._apps["org.telegram.messenger"] is not previous["org.telegram.messenger"]
+    assert index.search("notas") == ["com.example.notes"]
+    assert index.search("telegram x") == ["org.telegram.messenger"]
+    assert index.search("10.9.1") == []
+    assert_same_index(index, apps)
+
+
+def test_sync_refreshes_fields_that_are_not_searched(index):
+    apps = [dict(app) for app in APPS]
+    apps[0]['is_system'] = True
+    index.sync(apps)
+    assert index._apps["com.whatsapp"].app is apps[0]
+
+
+def test_sync_removes_uninstalled_packages(index):
+    apps = [app for app in APPS if app['package_name'] != "com.spotify.music"]
+
+    index.sync(apps)
+
+    assert "com.spotify.music" not in index
+    assert len(index) == len(APPS) - 1
+    assert index.search("spotify") == []
+    assert index.search("spotfy") == []
+    assert not any("com.spotify.music" in postings for postings in index._postings.values())
+    assert not any(key[2] == "com.spotify.music" for prefixes in index._prefixes for key in prefixes)
+    assert_same_index(index, apps)
+
+
+def test_large_changes_rebuild_the_index(index):
+    apps = APPS[:2] + [make_app(f"com.example.app{i}", f"App {i}") for i in range(10)]
+    index.sync(apps)
+    assert index.search("app 7") == ["com.example.app7"]
+    assert "org.mozilla.firefox" not in index
+    assert_same_index(index, apps)
+
+
+def test_add_replaces_and_remove_is_idempotent(index):
+    index.add(make_app("com.spotify.music", "Spotify Lite"))
+    assert index.search("lite") == ["com.spotify.music"]
+    index.remove("com.spotify.music")
+    index.remove("com.spotify.music")
+    assert "com.spotify.music" not in index
+
+
+def test_clear(index):
+    index.clear()
+    assert len(index) == 0
+    assert index.search("whatsapp") == []
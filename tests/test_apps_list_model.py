@@ -0,0 +1,160 @@
+import os
+import random
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QItemSelectionModel, Qt, qInstallMessageHandler
+from PySide6.QtGui import QIcon
+from PySide6.QtTest import QAbstractItemModelTester
+from PySide6.QtWidgets import QApplication
+from app.core.app_search_index import MAX_DIFF_RANGES, diff_view_rows
+from app.views.widgets.apps_list_model import AppsListModel
+
+APPS = [{'package_name': f"com.example.app{i:02d}", 'name': f"App {i}"} for i in range(40)]
+
+
+@pytest.fixture(scope="module")
+def qapp():
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def model(qapp):
+    model = AppsListModel()
+    # Todas las filas comparten el ícono: no hace falta rasterizar el SVG en las pruebas
+    model._icon = QIcon()
+    return model
+
+
+@pytest.fixture
+def tester(model):
+    """Comprueba la coherencia de las señales del modelo y falla con cualquier aviso del tester"""
+    warnings = []
+    previous = qInstallMessageHandler(lambda mode, context, message: warnings.append(message))
+    checker = QAbstractItemModelTester(model, QAbstractItemModelTester.FailureReportingMode.Warning)
+    yield checker
+    qInstallMessageHandler(previous)
+    assert warnings == []
+
+
+def shown_packages(model):
+    """Paquetes tal y como los devuelve el modelo, fila por fila"""
+    return [
+        model.data(model.index(row, 0), Qt.ItemDataRole.UserRole)['package_name']
+        for row in range(model.rowCount())
+    ]
+
+
+def selected_packages(model, selection):
+    return {
+        model.data(index, Qt.ItemDataRole.UserRole)['package_name'] for index in selection.selectedRows()
+    }
+
+
+def show(model, rows):
+    model.set_apps(APPS, [APPS[row]['package_name'] for row in rows])
+
+
+def record_structure_signals(model):
+    signals = []
+    model.rowsRemoved.connect(lambda parent, first, last: signals.append(('removed', first, last)))
+    model.rowsInserted.connect(lambda parent, first, last: signals.append(('inserted', first, last)))
+    model.layoutChanged.connect(lambda *args: signals.append(('layout',)))
+    model.modelReset.connect(lambda: signals.append(('reset',)))
+    return signals
+
+
+def test_set_apps_shows_the_visible_packages_in_order(model, tester):
+    model.set_apps(APPS, ["com.example.app05", "missing", "com.example.app01"])
+    assert shown_packages(model) == ["com.example.app05", "com.example.app01"]
+    assert model.visible_rows() == [5, 1]
+    assert model.row_of("com.example.app01") == 1
+    assert model.row_of("com.example.app02") is None
+    assert model.data(model.index(0, 0)) == " App 5\n com.example.app05"
+
+
+def test_removals_and_insertions_are_applied_as_ranges(model, tester):
+    show(model, [0, 1, 2, 3, 4, 5])
+    signals = record_structure_signals(model)
+
+    model.apply_diff(diff_view_rows(model.visible_rows(), [0, 7, 8, 3, 5, 9]))
+
+    assert model.visible_rows() == [0, 7, 8, 3, 5, 9]
+    assert shown_packages(model) == [APPS[row]['package_name'] for row in [0, 7, 8, 3, 5, 9]]
+    # Se quitan 1-2 y 4 (de atrás hacia delante) y se insertan 7-8 y 9; sin reordenar ni reiniciar
+    assert signals == [('removed', 4, 4), ('removed', 1, 2), ('inserted', 1, 2), ('inserted', 5, 5)]
+
+
+def test_moves_keep_the_selection(model, tester):
+    show(model, [0, 1, 2, 3, 4])
+    selection = QItemSelectionModel(model)
+    for row in (1, 3):
+        selection.select(model.index(row, 0), QItemSelectionModel.SelectionFlag.Select)
+    selection.setCurrentIndex(model.index(3, 0), QItemSelectionModel.SelectionFlag.NoUpdate)
+    signals = record_structure_signals(model)
+
+    model.apply_diff(diff_view_rows(model.visible_rows(), [4, 3, 2, 1, 0]))
+
+    assert signals == [('layout',)]
+    assert shown_packages(model) == [APPS[row]['package_name'] for row in [4, 3, 2, 1, 0]]
+    assert selected_packages(model, selection) == {"com.example.app01", "com.example.app03"}
+    assert selection.currentIndex().row() == 1
+
+
+def test_selection_of_removed_rows_is_dropped(model, tester):
+    show(model, [0, 1, 2, 3])
+    selection = QItemSelectionModel(model)
+    for row in (0, 2):
+        selection.select(model.index(row, 0), QItemSelectionModel.SelectionFlag.Select)
+
+    model.apply_diff(diff_view_rows(model.visible_rows(), [3, 0, 6, 1]))
+
+    assert shown_packages(model) == [APPS[row]['package_name'] for row in [3, 0, 6, 1]]
+    assert selected_packages(model, selection) == {"com.example.app00"}
+
+
+def test_empty_diff_does_not_touch_the_view(model, tester):
+    show(model, [2, 4, 6])
+    version = model.view_version
+    signals = record_structure_signals(model)
+    model.apply_diff(diff_view_rows([2, 4, 6], [2, 4, 6]))
+    assert signals == []
+    assert model.view_version == version
+
+
+def test_too_many_ranges_reset_the_view_in_one_relayout(model, tester):
+    apps = [{'package_name': f"com.example.big{i:03d}", 'name': f"Big {i}"} for i in range(300)]
+    model.set_apps(apps)
+    new = [row for row in range(300) if row % 3]
+    diff = diff_view_rows(model.visible_rows(), new)
+    assert len(diff.removed) > MAX_DIFF_RANGES and diff.reset
+    signals = record_structure_signals(model)
+
+    model.apply_diff(diff)
+
+    assert signals == [('layout',)]
+    assert model.visible_rows() == new
+    assert model.row_of("com.example.big004") == 2
+
+
+@pytest.mark.parametrize("seed", range(25))
+def test_random_diffs_turn_the_old_rows_into_the_new_ones(model, tester, seed):
+    generator = random.Random(seed)
+    old = generator.sample(range(len(APPS)), generator.randint(0, len(APPS)))
+    new = generator.sample(range(len(APPS)), generator.randint(0, len(APPS)))
+    show(model, old)
+    selection = QItemSelectionModel(model)
+    chosen = generator.sample(range(len(old)), len(old) // 3)
+    for row in chosen:
+        selection.select(model.index(row, 0), QItemSelectionModel.SelectionFlag.Select)
+    still_visible = {APPS[old[row]]['package_name'] for row in chosen if old[row] in new}
+    version = model.view_version
+
+    model.apply_diff(diff_view_rows(old, new))
+
+    assert model.visible_rows() == new
+    assert shown_packages(model) == [APPS[row]['package_name'] for row in new]
+    assert all(model.row_of(APPS[row]['package_name']) == position for position, row in enumerate(new))
+    assert selected_packages(model, selection) == still_visible
+    assert model.view_version == version + (old != new)
@@ -0,0 +1,104 @@
+from pathlib import Path
+from app.core.device_info_parser import (
+    SECTION_MARKER,
+    build_device_info_script,
+    parse_device_info,
+    parse_getprop,
+    split_sections,
+)
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+
+def load_sample():
+    return (FIXTURES_DIR / "device_info_script.txt").read_text(encoding="utf-8")
+
+
+def test_script_runs_every_probe_after_its_marker():
+    script = build_device_info_script()
+    assert script.startswith(f"echo {SECTION_MARKER} getprop; getprop; ")
+    for name in ("wm_size", "wm_density", "meminfo", "storage"):
+        assert f"echo {SECTION_MARKER} {name};" in script
+
+
+def test_splits_the_output_by_section():
+    sections = split_sections(load_sample())
+    assert list(sections) == ["getprop", "wm_size", "wm_density", "meminfo", "storage"]
+    assert sections["wm_size"] == "Physical size: 1080x2400\nOverride size: 720x1600"
+
+
+def test_parses_getprop_dump():
+    properties = parse_getprop(split_sections(load_sample())["getprop"])
+    assert properties["ro.product.model"] == "Pixel 7"
+    assert properties["ro.product.cpu.abilist"] == "arm64-v8a,armeabi-v7a,armeabi"
+    # Las propiedades vacías se conservan como cadena vacía
+    assert properties["sys.usb.config"] == ""
+    assert len(properties) == 12
+
+
+def test_getprop_ignores_noise_and_carriage_returns():
+    output = "\r\n".join([
+        "[ro.product.model]: [SM-S918B]",
+        "WARNING: linker: unused DT entry",
+        "  [ro.build.version.sdk]:   [34]  ",
+        "[broken.line]: [no closing bracket",
+    ])
+    assert parse_getprop(output) == {"ro.product.model": "SM-S918B", "ro.build.version.sdk": "34"}
+
+
+def test_parses_full_device_info():
+    assert parse_device_info(load_sample(), "28021FDH2000B7") == {
+        'model': "Pixel 7",
+        'brand': "google",
+        'manufacturer': "Google",
+        'android_version': "14",
+        'sdk_version': "34",
+        # Con un valor forzado se informa del físico
+        'resolution': "1080x2400",
+        'density': "420",
+        'total_ram': "7633 MB",
+        'storage': "109 GB",
+        'cpu_arch': "arm64-v8a",
+        'serial_number': "28021FDH2000B7",
+        'device_id': "28021FDH2000B7",
+    }
+
+
+def test_missing_properties_fall_back_to_unknown():
+    output = "\n".join([
+        f"{SECTION_MARKER} getprop",
+        "[ro.product.model]: [Moto G]",
+        "[ro.product.brand]: [   ]",
+        f"{SECTION_MARKER} wm_size",
+        f"{SECTION_MARKER} wm_density",
+        f"{SECTION_MARKER} meminfo",
+        "MemTotal: not-a-number kB",
+        f"{SECTION_MARKER} storage",
+        "df: /data: Permission denied",
+    ])
+    info = parse_device_info(output, "emulator-5554")
+    assert info['model'] == "Moto G"
+    assert info['brand'] == "Desconocido"
+    assert info['serial_number'] == "Desconocido"
+    assert info['resolution'] == "Desconocida"
+    assert info['density'] == "Desconocida"
+    assert info['total_ram'] == "Desconocida"
+    assert info['storage'] == "Desconocido"
+
+
+def test_truncated_output_keeps_the_sections_already_read():
+    # La conexión se cortó en mitad de la sonda de densidad
+    sample = load_sample()
+    output = sample[:sample.index("Physical density")]
+    info = parse_device_info(output, "28021FDH2000B7")
+    assert info['model'] == "Pixel 7"
+    assert info['resolution'] == "1080x2400"
+    assert info['density'] == "Desconocida"
+    assert info['total_ram'] == "Desconocida"
+    assert info['storage'] == "Desconocido"
+
+
+def test_empty_output_reports_everything_unknown():
+    info = parse_device_info("", "abc")
+    assert info['device_id'] == "abc"
+    assert {value for key, value in info.items() if key != 'device_id'} == {"Desconocido", "Desconocida"}
@@ -0,0 +1,80 @@
+from pathlib import Path
+from app.core.package_dump_parser import build_package_index, parse_package_dump
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+
+def load_sample():
+    with open(FIXTURES_DIR / "dumpsys_package.txt", encoding="utf-8") as f:
+        return build_package_index(f)
+
+
+def test_reads_only_the_packages_section():
+    index = load_sample()
+    assert list(index) == ["com.example.notes", "com.android.chrome", "com.example.bare"]
+
+
+def test_parses_versions_paths_and_installer():
+    notes = load_sample()["com.example.notes"]
+    assert notes["version_code"] == "4021"
+    assert notes["min_sdk"] == "24"
+    assert notes["target_sdk"] == "34"
+    assert notes["version_name"] == "4.2.1"
+    assert notes["code_path"] == "/data/app/~~Xa1b2c3==/com.example.notes-Zq9w8e7=="
+    assert notes["primary_cpu_abi"] == "arm64-v8a"
+    assert notes["installer"] == "com.android.vending"
+    assert notes["first_install_time"] == "2023-11-20 08:01:10"
+    assert notes["last_update_time"] == "2024-03-02 10:15:43"
+
+
+def test_parses_splits_flags_and_signatures():
+    notes = load_sample()["com.example.notes"]
+    assert notes["splits"] == ["base", "config.arm64_v8a", "config.es", "config.xxhdpi"]
+    # flags y pkgFlags repiten los mismos valores: no se duplican
+    assert notes["flags"] == ["HAS_CODE", "ALLOW_CLEAR_USER_DATA", "ALLOW_BACKUP"]
+    assert "ALLOW_AUDIO_PLAYBACK_CAPTURE" in notes["private_flags"]
+    assert notes["signatures"] == ["a1b2c3d4"]
+    assert load_sample()["com.android.chrome"]["signatures"] == ["f0e1d2c3", "0badc0de"]
+
+
+def test_hidden_system_copy_does_not_override_the_update():
+    # El paquete vuelve a aparecer (con otra codePath) en "Hidden system packages:"
+    chrome = load_sample()["com.android.chrome"]
+    assert chrome["code_path"] == "/data/app/~~Pq7r8s==/com.android.chrome-Ab1cD2=="
+    assert chrome["version_code"] == "612309833"
+    assert chrome["version_name"] == "122.0.6261.105"
+    assert "SYSTEM" in chrome["flags"]
+
+
+def test_missing_fields_stay_empty():
+    bare = load_sample()["com.example.bare"]
+    assert bare["version_name"] is None
+    assert bare["min_sdk"] is None
+    assert bare["target_sdk"] == "28"
+    assert bare["installer"] is None
+    assert bare["splits"] == []
+    assert bare["signatures"] == []
+
+
+def test_user_lines_with_installed_false_are_ignored():
+    # Las líneas "User N: ... installed=false" no son campos del paquete
+    index = load_sample()
+    assert index["com.example.bare"]["code_path"] == "/data/app/com.example.bare-1"
+    assert index["com.example.notes"]["version_code"] == "4021"
+
+
+def test_old_signature_format():
+    lines = [
+        "Packages:",
+        "  Package [com.old.app] (41b2c3):",
+        "    versionCode=3 targetSdk=19",
+        "    signatures=PackageSignatures{41e2a1 [deadbeef]}",
+    ]
+    record = next(parse_package_dump(lines))
+    assert record["signatures"] == ["deadbeef"]
+
+
+def test_accepts_crlf_lines_and_empty_input():
+    lines = ["Packages:\r\n", "  Package [com.crlf] (1):\r\n", "    versionName=1.0\r\n"]
+    assert build_package_index(lines)["com.crlf"]["version_name"] == "1.0"
+    assert build_package_index([]) == {}